@@ -0,0 +1,81 @@
+"""add_query_and_trigram_indexes
+
+Revision ID: 5d2e8a41b7c3
+Revises: c1f93c2eb9e7
+Create Date: 2026-10-18 09:12:40.118532
+
+Composite indexes for the events/animals/facilities/breeds access paths and
+GIN trigram indexes for the ``ilike '%term%'`` searches.
+
+Every index is built with CREATE INDEX CONCURRENTLY outside of a transaction
+so writes to a live events table are not blocked. If a concurrent build is
+interrupted Postgres leaves an INVALID index behind; drop it and re-run.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision = '5d2e8a41b7c3'
+down_revision = 'c1f93c2eb9e7'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns)
+BTREE_INDEXES = [
+    ('ix_events_timestamp', 'events', ['timestamp']),
+    ('ix_events_animal_id_timestamp', 'events', ['animal_id', 'timestamp']),
+    ('ix_events_facility_id_timestamp', 'events', ['facility_id', 'timestamp']),
+    ('ix_events_is_valid_timestamp', 'events', ['is_valid', 'timestamp']),
+    ('ix_events_event_type_timestamp', 'events', ['event_type', 'timestamp']),
+    ('ix_animals_facility_id', 'animals', ['facility_id']),
+    ('ix_animals_owner_id', 'animals', ['owner_id']),
+    ('ix_animals_species', 'animals', ['species']),
+    ('ix_facilities_facility_type', 'facilities', ['facility_type']),
+    ('ix_animal_breeds_specie_breed_name', 'animal_breeds', ['specie', 'breed_name']),
+    ('ix_animal_breeds_country', 'animal_breeds', ['country']),
+    ('ix_documents_animal_id', 'documents', ['animal_id']),
+]
+
+# (index name, table, column)
+TRIGRAM_INDEXES = [
+    ('ix_animals_name_trgm', 'animals', 'name'),
+    ('ix_animals_tag_id_trgm', 'animals', 'tag_id'),
+    ('ix_animals_species_trgm', 'animals', 'species'),
+    ('ix_facilities_name_trgm', 'facilities', 'name'),
+    ('ix_facilities_location_trgm', 'facilities', 'location'),
+    ('ix_animal_breeds_breed_name_trgm', 'animal_breeds', 'breed_name'),
+    ('ix_animal_breeds_description_trgm', 'animal_breeds', 'description'),
+    ('ix_animal_breeds_specie_trgm', 'animal_breeds', 'specie'),
+    ('ix_animal_breeds_country_trgm', 'animal_breeds', 'country'),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in BTREE_INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(
+                name,
+                table,
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(TRIGRAM_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+        for name, table, _ in reversed(BTREE_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,133 @@
+"""partition_events_by_month
+
+Revision ID: 8f4c2d9a6e15
+Revises: 5d2e8a41b7c3
+Create Date: 2026-10-18 11:02:17.430918
+
+Converts ``events`` into a table partitioned by RANGE (timestamp) with one
+partition per month, an ``events_default`` catch-all and partitions created
+MONTHS_AHEAD months ahead (later months are added by
+``python -m app.db.partitions ensure`` and init_db). Rows with a NULL
+timestamp get now(), since the partition key must be NOT NULL, and the
+primary key becomes (id, timestamp).
+
+The rows are copied under an ACCESS EXCLUSIVE lock on events, so schedule
+this for a maintenance window on large installations. PostgreSQL only; on
+other databases this revision is a no-op.
+
+Self-contained on purpose: app.db.partitions may change after this revision.
+"""
+from datetime import date, datetime
+
+from alembic import op
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic
+revision = '8f4c2d9a6e15'
+down_revision = '5d2e8a41b7c3'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+
+def _month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _add_months(value: date, months: int) -> date:
+    month_index = value.year * 12 + value.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _is_partitioned(conn) -> bool:
+    return conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('events'))"
+    )).scalar()
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or _is_partitioned(bind):
+        return
+
+    index_defs = bind.execute(text(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = 'events' AND indexname <> 'events_pkey'"
+    )).all()
+    foreign_keys = bind.execute(text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass('events') AND contype = 'f'"
+    )).all()
+
+    op.execute("LOCK TABLE events IN ACCESS EXCLUSIVE MODE")
+    op.execute('UPDATE events SET "timestamp" = now() WHERE "timestamp" IS NULL')
+    for name, _ in index_defs:
+        op.execute(f"DROP INDEX {name}")
+    op.execute("ALTER TABLE events RENAME TO events_legacy")
+    op.execute("ALTER TABLE events_legacy RENAME CONSTRAINT events_pkey TO events_legacy_pkey")
+    op.execute("ALTER SEQUENCE IF EXISTS events_id_seq OWNED BY NONE")
+
+    op.execute(
+        "CREATE TABLE events (LIKE events_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        'PARTITION BY RANGE ("timestamp")'
+    )
+    op.execute('ALTER TABLE events ALTER COLUMN "timestamp" SET NOT NULL')
+    op.execute("ALTER TABLE events ALTER COLUMN \"timestamp\" SET DEFAULT (now() AT TIME ZONE 'utc')")
+    op.execute('ALTER TABLE events ADD CONSTRAINT events_pkey PRIMARY KEY (id, "timestamp")')
+    for name, definition in foreign_keys:
+        op.execute(f"ALTER TABLE events ADD CONSTRAINT {name} {definition}")
+
+    oldest = bind.execute(text('SELECT min("timestamp") FROM events_legacy')).scalar()
+    current = _month_start(datetime.utcnow())
+    month = min(_month_start(oldest), current) if oldest else current
+    while month <= _add_months(current, MONTHS_AHEAD):
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS events_p{month.year:04d}{month.month:02d} PARTITION OF events "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    op.execute("CREATE TABLE IF NOT EXISTS events_default PARTITION OF events DEFAULT")
+
+    # Indexes on the parent cascade to every current and future partition. The
+    # definitions were read before the rename, so they already name events.
+    for _, definition in index_defs:
+        op.execute(definition)
+
+    op.execute("INSERT INTO events SELECT * FROM events_legacy")
+    op.execute("ALTER SEQUENCE IF EXISTS events_id_seq OWNED BY events.id")
+    op.execute("DROP TABLE events_legacy")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or not _is_partitioned(bind):
+        return
+
+    index_defs = bind.execute(text(
+        "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x "
+        "JOIN pg_class i ON i.oid = x.indexrelid "
+        "WHERE x.indrelid = to_regclass('events') AND NOT x.indisprimary"
+    )).all()
+    foreign_keys = bind.execute(text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass('events') AND contype = 'f' AND conparentid = 0"
+    )).all()
+
+    op.execute("LOCK TABLE events IN ACCESS EXCLUSIVE MODE")
+    for name, _ in index_defs:
+        op.execute(f"DROP INDEX {name}")
+    op.execute("ALTER TABLE events RENAME TO events_partitioned")
+    op.execute("ALTER TABLE events_partitioned RENAME CONSTRAINT events_pkey TO events_partitioned_pkey")
+    op.execute("ALTER SEQUENCE IF EXISTS events_id_seq OWNED BY NONE")
+    op.execute("CREATE TABLE events (LIKE events_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    op.execute("ALTER TABLE events ADD CONSTRAINT events_pkey PRIMARY KEY (id)")
+    for name, definition in foreign_keys:
+        op.execute(f"ALTER TABLE events ADD CONSTRAINT {name} {definition}")
+    op.execute("INSERT INTO events SELECT * FROM events_partitioned")
+    # Read before the rename: the definitions already name events
+    for _, definition in index_defs:
+        op.execute(definition)
+    op.execute("ALTER SEQUENCE IF EXISTS events_id_seq OWNED BY events.id")
+    op.execute("DROP TABLE events_partitioned CASCADE")
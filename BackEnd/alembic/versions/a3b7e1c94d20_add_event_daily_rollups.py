@@ -0,0 +1,61 @@
+"""add_event_daily_rollups
+
+Revision ID: a3b7e1c94d20
+Revises: 8f4c2d9a6e15
+Create Date: 2026-10-18 12:20:05.871342
+
+Per-day event counts by facility, event type and validity for the dashboard
+and facility statistics, backfilled from the existing events in one
+INSERT .. SELECT. From here on the application keeps them current on flush.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'a3b7e1c94d20'
+down_revision = '8f4c2d9a6e15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'event_daily_rollups',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('facility_id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(), nullable=False),
+        sa.Column('is_valid', sa.Boolean(), nullable=False),
+        sa.Column('event_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'facility_id', 'event_type', 'is_valid'),
+    )
+    op.create_index('ix_event_daily_rollups_facility_id_day', 'event_daily_rollups', ['facility_id', 'day'])
+
+    # events as they stand at this revision; NULL keys map to the rollup sentinels
+    # (facility 0, event type '', counted as valid)
+    events = sa.table(
+        'events',
+        sa.column('timestamp', sa.DateTime),
+        sa.column('facility_id', sa.Integer),
+        sa.column('event_type', sa.String),
+        sa.column('is_valid', sa.Boolean),
+    )
+    day = sa.func.date(events.c.timestamp)
+    facility_id = sa.func.coalesce(events.c.facility_id, 0)
+    event_type = sa.func.coalesce(events.c.event_type, '')
+    is_valid = sa.func.coalesce(events.c.is_valid, sa.true())
+    rollups = sa.table(
+        'event_daily_rollups',
+        sa.column('day'), sa.column('facility_id'), sa.column('event_type'),
+        sa.column('is_valid'), sa.column('event_count'),
+    )
+    op.execute(rollups.insert().from_select(
+        ['day', 'facility_id', 'event_type', 'is_valid', 'event_count'],
+        sa.select(day, facility_id, event_type, is_valid, sa.func.count())
+        .group_by(day, facility_id, event_type, is_valid),
+    ))
+
+
+def downgrade():
+    op.drop_index('ix_event_daily_rollups_facility_id_day', table_name='event_daily_rollups')
+    op.drop_table('event_daily_rollups')
@@ -0,0 +1,43 @@
+"""add_event_archives
+
+Revision ID: b9d4a7e2f318
+Revises: e6c1f0b83a57
+Create Date: 2026-10-18 15:06:33.512870
+
+Manifest table for events archived to Parquet files by app.db.archive.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'b9d4a7e2f318'
+down_revision = 'e6c1f0b83a57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'event_archives',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('part', sa.Integer(), nullable=False),
+        sa.Column('path', sa.String(), nullable=False),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('min_timestamp', sa.DateTime(), nullable=True),
+        sa.Column('max_timestamp', sa.DateTime(), nullable=True),
+        sa.Column('min_animal_id', sa.Integer(), nullable=True),
+        sa.Column('max_animal_id', sa.Integer(), nullable=True),
+        sa.Column('size_bytes', sa.Integer(), nullable=True),
+        sa.Column('sha256', sa.String(length=64), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('path'),
+    )
+    op.create_index('ix_event_archives_month_part', 'event_archives', ['month', 'part'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_event_archives_month_part', table_name='event_archives')
+    op.drop_table('event_archives')
@@ -0,0 +1,53 @@
+"""animal_breed_row_hash
+
+Revision ID: d2f8c5a19e64
+Revises: b9d4a7e2f318
+Create Date: 2026-10-18 16:24:10.338571
+
+Adds animal_breeds.row_hash and a unique (country, specie, breed_name) key
+for the bulk catalog loader. Duplicates left behind by the old row-by-row
+import are collapsed onto the lowest id first, repointing animals.breed_id.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'd2f8c5a19e64'
+down_revision = 'b9d4a7e2f318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('animal_breeds', sa.Column('row_hash', sa.String(length=32), nullable=True))
+
+    # The loader always writes '' for missing values; NULLs would dodge the unique key
+    for column in ('country', 'specie', 'breed_name'):
+        op.execute(f"UPDATE animal_breeds SET {column} = '' WHERE {column} IS NULL")
+
+    op.execute("""
+        CREATE TEMP TABLE breed_duplicates AS
+        SELECT id, min(id) OVER (PARTITION BY country, specie, breed_name) AS keep_id
+        FROM animal_breeds
+    """)
+    op.execute("""
+        UPDATE animals SET breed_id = d.keep_id
+        FROM breed_duplicates d
+        WHERE animals.breed_id = d.id AND d.id <> d.keep_id
+    """)
+    op.execute("""
+        DELETE FROM animal_breeds
+        WHERE id IN (SELECT id FROM breed_duplicates WHERE id <> keep_id)
+    """)
+    op.execute("DROP TABLE breed_duplicates")
+
+    op.create_index(
+        'ux_animal_breeds_country_specie_breed_name', 'animal_breeds',
+        ['country', 'specie', 'breed_name'], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index('ux_animal_breeds_country_specie_breed_name', table_name='animal_breeds')
+    op.drop_column('animal_breeds', 'row_hash')
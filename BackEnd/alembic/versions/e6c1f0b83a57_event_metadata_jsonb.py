@@ -0,0 +1,68 @@
+"""event_metadata_jsonb
+
+Revision ID: e6c1f0b83a57
+Revises: a3b7e1c94d20
+Create Date: 2026-10-18 13:41:52.096214
+
+Converts events.event_metadata from varchar to jsonb and adds a GIN
+(jsonb_path_ops) index for metadata filters. Values that parse as a JSON
+object or array become that JSON; anything else, including the free-text
+transfer notes, becomes a JSON string; empty strings become NULL.
+
+ALTER COLUMN .. TYPE rewrites every partition under an ACCESS EXCLUSIVE
+lock, so run it in a maintenance window on large installations. The GIN
+index is built in the same window; CREATE INDEX CONCURRENTLY is not
+available on a partitioned parent anyway.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision = 'e6c1f0b83a57'
+down_revision = 'a3b7e1c94d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # Session-local helper; casting invalid JSON raises, so fall back per row
+    op.execute("""
+        CREATE FUNCTION pg_temp.event_metadata_to_jsonb(value text) RETURNS jsonb
+        LANGUAGE plpgsql IMMUTABLE AS $$
+        BEGIN
+            IF value IS NULL OR btrim(value) = '' THEN
+                RETURN NULL;
+            END IF;
+            IF left(btrim(value), 1) IN ('{', '[') THEN
+                BEGIN
+                    RETURN value::jsonb;
+                EXCEPTION WHEN others THEN
+                    RETURN to_jsonb(value);
+                END;
+            END IF;
+            RETURN to_jsonb(value);
+        END
+        $$
+    """)
+    op.execute(
+        "ALTER TABLE events ALTER COLUMN event_metadata TYPE jsonb "
+        "USING pg_temp.event_metadata_to_jsonb(event_metadata)"
+    )
+    op.create_index(
+        'ix_events_event_metadata', 'events', ['event_metadata'],
+        postgresql_using='gin', postgresql_ops={'event_metadata': 'jsonb_path_ops'}
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_events_event_metadata', table_name='events')
+    # JSON strings go back to their bare text, everything else to its JSON text
+    op.execute(
+        "ALTER TABLE events ALTER COLUMN event_metadata TYPE varchar USING "
+        "CASE WHEN jsonb_typeof(event_metadata) = 'string' THEN event_metadata #>> '{}' "
+        "ELSE event_metadata::text END"
+    )
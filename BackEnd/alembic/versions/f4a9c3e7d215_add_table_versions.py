@@ -0,0 +1,33 @@
+"""add_table_versions
+
+Revision ID: f4a9c3e7d215
+Revises: d2f8c5a19e64
+Create Date: 2026-10-18 18:02:47.219604
+
+Change counters behind the ETags of the catalog and detail routes. Rows are
+created by the first bump of each dataset; until then a dataset is at
+version 0 without a Last-Modified date.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'f4a9c3e7d215'
+down_revision = 'd2f8c5a19e64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name'),
+    )
+
+
+def downgrade():
+    op.drop_table('table_versions')
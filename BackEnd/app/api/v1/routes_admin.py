@@ -0,0 +1,104 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.core.dependencies import get_current_regulator
+from app.core.middleware import compressed_cache
+from app.db.models import User
+from app.db.pool_stats import get_pool_statistics, reset_pool_statistics
+from app.db.query_budget import budget_stats
+from app.db.query_stats import route_query_stats
+from app.db.slow_queries import slow_query_log
+from app.core.responses import FastJSONRoute
+
+router = APIRouter(route_class=FastJSONRoute)
+
+
+@router.get("/db/pool")
+def get_db_pool_stats(current_user: User = Depends(get_current_regulator)):
+    """
+    Live connection pool statistics for every database engine.
+
+    Reports checked-out connections, overflow usage, checkout failures and a
+    histogram of checkout wait times for sizing workers against the database.
+    """
+    return {"pools": get_pool_statistics()}
+
+
+@router.post("/db/pool/reset")
+def reset_db_pool_stats(current_user: User = Depends(get_current_regulator)):
+    """Reset the accumulated pool counters (live pool state is unaffected)."""
+    reset_pool_statistics()
+    return {"status": "reset"}
+
+
+@router.get("/db/queries")
+def get_db_query_stats(current_user: User = Depends(get_current_regulator)):
+    """
+    SQL statements per route since the last reset.
+
+    Lists query counts and database time per route, most queries first,
+    plus the most recent requests that repeated one statement shape more
+    than N_PLUS_ONE_THRESHOLD times.
+    """
+    return route_query_stats.snapshot()
+
+
+@router.post("/db/queries/reset")
+def reset_db_query_stats(current_user: User = Depends(get_current_regulator)):
+    """Reset the per-route query counters."""
+    route_query_stats.reset()
+    return {"status": "reset"}
+
+
+@router.get("/db/budgets")
+def get_query_budget_stats(current_user: User = Depends(get_current_regulator)):
+    """
+    Requests and budget breaches per budgeted route.
+
+    ``statement_timeouts`` counts 503s from the route's statement timeout,
+    ``row_budget_exceeded`` the 413s from its row budget.
+    """
+    return budget_stats.snapshot()
+
+
+@router.post("/db/budgets/reset")
+def reset_query_budget_stats(current_user: User = Depends(get_current_regulator)):
+    """Reset the query budget counters."""
+    budget_stats.reset()
+    return {"status": "reset"}
+
+
+@router.get("/db/slow-queries")
+def get_slow_queries(
+    limit: Optional[int] = Query(None, ge=1, description="Only the most recent entries"),
+    current_user: User = Depends(get_current_regulator)
+):
+    """
+    Statements slower than SLOW_QUERY_THRESHOLD_MS, newest first.
+
+    Each entry has the statement, its parameters, duration, engine and
+    route; sampled SELECTs also carry their EXPLAIN output in ``plan``.
+    Empty unless SLOW_QUERY_LOG_ENABLED is set.
+    """
+    return slow_query_log.snapshot(limit)
+
+
+@router.post("/db/slow-queries/reset")
+def reset_slow_queries(current_user: User = Depends(get_current_regulator)):
+    """Clear the slow-query log."""
+    slow_query_log.reset()
+    return {"status": "reset"}
+
+
+@router.get("/compression/cache")
+def get_compression_cache_stats(current_user: User = Depends(get_current_regulator)):
+    """Entries, compressed bytes, hits and misses of this worker's compressed response cache."""
+    return compressed_cache.snapshot()
+
+
+@router.post("/compression/cache/reset")
+def reset_compression_cache(current_user: User = Depends(get_current_regulator)):
+    """Drop this worker's cached compressed responses."""
+    compressed_cache.clear()
+    return {"status": "reset"}
@@ -1,59 +1,102 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
-from typing import Optional
-from app.db.session import get_db
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import literal, or_, func, select
+from itertools import chain, islice
+from operator import attrgetter
+from types import SimpleNamespace
+from typing import Iterator, Optional
+import heapq
+from app.core.config import settings
+from app.db.query_budget import ensure_row_budget, query_budget
+from app.db.session import get_async_read_db, get_db, get_read_db
+from app.db.archive import load_archived_events
 from app.db.models import Animal, AnimalBreed, Event, Facility, User
+from app.db import repository
+from app.db.projection import Projection
+from app.db.streaming import stream_rows
+from app.utils.conditional import async_conditional_get
+from app.utils.pagination import apply_keyset, decode_cursor, next_cursor, split_page
+from app.utils.totals import TOTAL_MODE_DESCRIPTION, TOTAL_MODE_PATTERN, resolve_total
 from app.utils.qr_generator import generate_qr_response, generate_animal_qr_url
+from app.core.responses import FastJSONRoute, dumps
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
+
+# Events serialized per write when streaming an animal's event history
+EVENT_STREAM_FLUSH = 500
+
+# Fields of the list responses, selectable with fields=
+BREED_FIELDS = Projection(
+    id=AnimalBreed.id,
+    country=AnimalBreed.country,
+    iso3=AnimalBreed.iso3,
+    specie=AnimalBreed.specie,
+    breed_name=AnimalBreed.breed_name,
+    language=AnimalBreed.language,
+    description=AnimalBreed.description,
+    transboundary_name=AnimalBreed.transboundary_name,
+    other_name=AnimalBreed.other_name,
+)
+ANIMAL_FIELDS = Projection(
+    id=Animal.id,
+    name=Animal.name,
+    species=Animal.species,
+    tag_id=Animal.tag_id,
+    date_added=Animal.date_added,
+    facility_id=Animal.facility_id,
+    owner_id=Animal.owner_id,
+)
+
+# ETags and 304s for an animal, which is read together with its breed, facility and owner
+animal_detail = async_conditional_get(
+    Animal.__tablename__, AnimalBreed.__tablename__, Facility.__tablename__, User.__tablename__,
+    cache_control=settings.CACHE_CONTROL_DETAIL,
+)
 
 # --- Animal Breeds Endpoints (must be BEFORE /{animal_id} routes!) ---
 
 @router.get("/breeds")
 def list_animal_breeds(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=10000),
     species: Optional[str] = None,
     country: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    total_mode: str = Query("exact", pattern=TOTAL_MODE_PATTERN, description=TOTAL_MODE_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=BREED_FIELDS.description)
 ):
     """List animal breeds with optional filtering, search, and pagination"""
-    query = db.query(AnimalBreed)
+    query, names = BREED_FIELDS.select(fields)
     
     if species:
-        query = query.filter(AnimalBreed.specie.ilike(f"%{species}%"))
+        query = query.where(AnimalBreed.specie.ilike(f"%{species}%"))
     if country:
-        query = query.filter(AnimalBreed.country.ilike(f"%{country}%"))
+        query = query.where(AnimalBreed.country.ilike(f"%{country}%"))
     if search:
-        query = query.filter(
+        query = query.where(
             or_(
                 AnimalBreed.breed_name.ilike(f"%{search}%"),
                 AnimalBreed.description.ilike(f"%{search}%")
             )
         )
     
-    total = query.count()
-    breeds = query.offset(skip).limit(limit).all()
+    total, total_mode = resolve_total(db, query, total_mode, ("animal_breeds", species, country, search))
+    breeds, has_more = split_page(db.execute(query.offset(skip).limit(limit + 1)).all(), limit)
     
-    result = []
-    for b in breeds:
-        result.append({
-            "id": b.id,
-            "country": b.country,
-            "iso3": b.iso3,
-            "specie": b.specie,
-            "breed_name": b.breed_name,
-            "language": b.language,
-            "description": b.description,
-            "transboundary_name": b.transboundary_name,
-            "other_name": b.other_name
-        })
-    return {"breeds": result, "total": total, "skip": skip, "limit": limit}
+    return {
+        "breeds": BREED_FIELDS.items(breeds, names),
+        "total": total,
+        "total_mode": total_mode,
+        "has_more": has_more,
+        "skip": skip,
+        "limit": limit
+    }
 
 @router.get("/breeds/{breed_id}")
-def get_animal_breed(breed_id: int, db: Session = Depends(get_db)):
+def get_animal_breed(breed_id: int, db: Session = Depends(get_read_db)):
     """Get a specific animal breed by ID"""
     breed = db.query(AnimalBreed).filter(AnimalBreed.id == breed_id).first()
     if not breed:
@@ -71,13 +114,13 @@ def get_animal_breed(breed_id: int, db: Session = Depends(get_db)):
     }
 
 @router.get("/species")
-def list_species(db: Session = Depends(get_db)):
+def list_species(db: Session = Depends(get_read_db)):
     """Get distinct list of all animal species"""
     species = db.query(Animal.species).distinct().all()
     return {"species": [s[0] for s in species if s[0]]}
 
 @router.get("/stats")
-def get_animal_statistics(db: Session = Depends(get_db)):
+def get_animal_statistics(db: Session = Depends(get_read_db)):
     """Get overall animal statistics"""
     total_animals = db.query(func.count(Animal.id)).scalar()
     by_species = db.query(Animal.species, func.count(Animal.id)).group_by(Animal.species).all()
@@ -130,50 +173,62 @@ def create_animal(payload: dict, db: Session = Depends(get_db)):
 
 @router.get("/")
 def list_animals(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     species: Optional[str] = None,
     facility_id: Optional[int] = None,
     owner_id: Optional[int] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page (next_cursor); replaces skip"),
+    total_mode: str = Query("exact", pattern=TOTAL_MODE_PATTERN, description=TOTAL_MODE_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=ANIMAL_FIELDS.description)
 ):
     """List animals with optional filtering, search, and pagination"""
-    query = db.query(Animal)
+    query, names = ANIMAL_FIELDS.select(fields, "id")
     
     if species:
-        query = query.filter(Animal.species.ilike(f"%{species}%"))
+        query = query.where(Animal.species.ilike(f"%{species}%"))
     if facility_id:
-        query = query.filter(Animal.facility_id == facility_id)
+        query = query.where(Animal.facility_id == facility_id)
     if owner_id:
-        query = query.filter(Animal.owner_id == owner_id)
+        query = query.where(Animal.owner_id == owner_id)
     if search:
-        query = query.filter(
+        query = query.where(
             or_(
                 Animal.name.ilike(f"%{search}%"),
                 Animal.tag_id.ilike(f"%{search}%")
             )
         )
     
-    total = query.count()
-    animals = query.offset(skip).limit(limit).all()
+    total, total_mode = resolve_total(
+        db, query, total_mode, ("animals", species, facility_id, owner_id, search)
+    )
     
-    result = []
-    for a in animals:
-        result.append({
-            "id": a.id,
-            "name": a.name,
-            "species": a.species,
-            "tag_id": a.tag_id,
-            "date_added": str(a.date_added) if a.date_added else None,
-            "facility_id": a.facility_id,
-            "owner_id": a.owner_id
-        })
-    return {"animals": result, "total": total, "skip": skip, "limit": limit}
+    cursor_values = decode_cursor(cursor, int) if cursor else None
+    query = apply_keyset(query, [Animal.id], cursor_values)
+    if cursor_values is None:
+        query = query.offset(skip)
+    animals, has_more = split_page(db.execute(query.limit(limit + 1)).all(), limit)
+    
+    return {
+        "animals": ANIMAL_FIELDS.items(animals, names),
+        "total": total,
+        "total_mode": total_mode,
+        "has_more": has_more,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": next_cursor(animals, has_more, "id")
+    }
 
-@router.get("/{animal_id}")
-def get_animal(animal_id: int, db: Session = Depends(get_db)):
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+@router.get("/{animal_id}", dependencies=[Depends(animal_detail)])
+async def get_animal(animal_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    # Relationships can't lazy-load on an AsyncSession, so fetch them in the same round trip
+    animal = (await db.execute(
+        select(Animal)
+        .options(joinedload(Animal.breed), joinedload(Animal.facility), joinedload(Animal.owner))
+        .where(Animal.id == animal_id)
+    )).scalars().first()
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
     
@@ -213,7 +268,7 @@ def get_animal(animal_id: int, db: Session = Depends(get_db)):
         "breed_id": animal.breed_id,
         "breed": breed_data,
         "tag_id": animal.tag_id,
-        "date_added": str(animal.date_added) if animal.date_added else None,
+        "date_added": animal.date_added,
         "facility_id": animal.facility_id,
         "facility": facility_data,
         "owner_id": animal.owner_id,
@@ -222,7 +277,7 @@ def get_animal(animal_id: int, db: Session = Depends(get_db)):
 
 @router.put("/{animal_id}")
 def update_animal(animal_id: int, payload: dict, db: Session = Depends(get_db)):
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+    animal = repository.get_animal(db, animal_id)
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
 
@@ -253,7 +308,7 @@ def update_animal(animal_id: int, payload: dict, db: Session = Depends(get_db)):
             "species": animal.species,
             "breed_id": animal.breed_id,
             "tag_id": animal.tag_id,
-            "date_added": str(animal.date_added) if animal.date_added else None,
+            "date_added": animal.date_added,
             "facility_id": animal.facility_id,
             "owner_id": animal.owner_id
         }
@@ -261,7 +316,7 @@ def update_animal(animal_id: int, payload: dict, db: Session = Depends(get_db)):
 
 @router.delete("/{animal_id}")
 def delete_animal(animal_id: int, db: Session = Depends(get_db)):
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+    animal = repository.get_animal(db, animal_id)
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
 
@@ -270,38 +325,79 @@ def delete_animal(animal_id: int, db: Session = Depends(get_db)):
 
     return {"status": "deleted"}
 
-@router.get("/{animal_id}/events")
-def get_animal_events(animal_id: int, db: Session = Depends(get_db)):
-    """Get all events related to a specific animal"""
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+@router.get(
+    "/{animal_id}/events",
+    dependencies=[Depends(query_budget(settings.LIST_STATEMENT_TIMEOUT_MS, settings.LIST_MAX_ROWS))]
+)
+def get_animal_events(
+    animal_id: int,
+    include_archived: bool = Query(False, description="Also include events moved to the cold-storage archive"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get all events related to a specific animal, most recent first.
+
+    The body is streamed from a server-side cursor, so memory stays flat
+    however many events the animal has. The row budget is checked against
+    the animal's event count and the first EVENT_STREAM_FLUSH events are
+    fetched before the response starts, so a statement timeout or an
+    exhausted budget still becomes query_budget's 503 or 413.
+    """
+    animal = repository.get_animal(db, animal_id)
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
     
-    events = db.query(Event).filter(Event.animal_id == animal_id).order_by(Event.timestamp.desc()).all()
-    
-    result = []
+    animal_data = {
+        "id": animal.id,
+        "name": animal.name,
+        "species": animal.species,
+        "tag_id": animal.tag_id
+    }
+    ensure_row_budget(db, select(func.count(Event.id)).where(Event.animal_id == animal_id))
+    events = stream_rows(
+        db,
+        select(
+            Event.id, Event.event_type, Event.timestamp, Event.is_valid, Event.anomaly_reason,
+            Event.actor_id, Event.facility_id, Event.event_metadata, literal(False).label("archived")
+        ).where(Event.animal_id == animal_id).order_by(Event.timestamp.desc())
+    )
+    first_page = list(islice(events, EVENT_STREAM_FLUSH))
+    archived = load_archived_events(db, animal_id) if include_archived else []
+    return StreamingResponse(
+        _animal_events_body(chain(first_page, events), animal_data, archived), media_type="application/json"
+    )
+
+
+def _animal_events_body(events: Iterator, animal_data: dict, archived: list) -> Iterator[bytes]:
+    """JSON body of get_animal_events, written in chunks of EVENT_STREAM_FLUSH events."""
+    if archived:
+        archived = sorted((SimpleNamespace(**e) for e in archived), key=attrgetter("timestamp"), reverse=True)
+        events = heapq.merge(events, archived, key=attrgetter("timestamp"), reverse=True)
+
+    # Same encoding as the FastJSONResponse of the other routes
+    yield b'{"animal":' + dumps(animal_data) + b',"events":['
+    total = 0
+    chunk = []
     for e in events:
-        result.append({
+        if total:
+            chunk.append(b",")
+        chunk.append(dumps({
             "id": e.id,
             "event_type": e.event_type,
-            "timestamp": str(e.timestamp),
+            "timestamp": e.timestamp,
             "is_valid": e.is_valid,
             "anomaly_reason": e.anomaly_reason,
             "actor_id": e.actor_id,
             "facility_id": e.facility_id,
-            "metadata": e.event_metadata
-        })
-    
-    return {
-        "animal": {
-            "id": animal.id,
-            "name": animal.name,
-            "species": animal.species,
-            "tag_id": animal.tag_id
-        },
-        "events": result,
-        "total_events": len(result)
-    }
+            "metadata": e.event_metadata,
+            "archived": e.archived
+        }))
+        total += 1
+        if total % EVENT_STREAM_FLUSH == 0:
+            yield b"".join(chunk)
+            chunk = []
+    chunk.append(b'],"total_events":%d}' % total)
+    yield b"".join(chunk)
 
 
 @router.get("/{animal_id}/qr")
@@ -310,7 +406,7 @@ def get_animal_qr_code(animal_id: int, db: Session = Depends(get_db)):
     Generate QR code for animal public tracking page.
     Returns a PNG image that can be scanned to view animal traceability.
     """
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+    animal = repository.get_animal(db, animal_id)
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
     
@@ -326,7 +422,7 @@ def get_animal_tracking_url(animal_id: int, db: Session = Depends(get_db)):
     """
     Get the public tracking URL for an animal.
     """
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+    animal = repository.get_animal(db, animal_id)
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
     
@@ -354,7 +450,7 @@ def transfer_animal(
     - actor_id: ID of the user performing the transfer
     - notes: Optional notes about the transfer
     """
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+    animal = repository.get_animal(db, animal_id)
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
     
@@ -366,12 +462,12 @@ def transfer_animal(
         raise HTTPException(status_code=400, detail="to_facility_id is required")
     
     # Check if destination facility exists
-    to_facility = db.query(Facility).filter(Facility.id == to_facility_id).first()
+    to_facility = repository.get_facility(db, to_facility_id)
     if not to_facility:
         raise HTTPException(status_code=404, detail="Destination facility not found")
     
     # Get current facility name for the event metadata
-    from_facility = db.query(Facility).filter(Facility.id == animal.facility_id).first() if animal.facility_id else None
+    from_facility = repository.get_facility(db, animal.facility_id) if animal.facility_id else None
     from_facility_name = from_facility.name if from_facility else "Unknown"
     
     # Create movement event
@@ -409,19 +505,23 @@ def transfer_animal(
         "event": {
             "id": movement_event.id,
             "event_type": movement_event.event_type,
-            "timestamp": str(movement_event.timestamp),
+            "timestamp": movement_event.timestamp,
             "metadata": movement_event.event_metadata
         }
     }
 
 
 @router.get("/{animal_id}/movement-history")
-def get_animal_movement_history(animal_id: int, db: Session = Depends(get_db)):
+def get_animal_movement_history(
+    animal_id: int,
+    include_archived: bool = Query(False, description="Also include movements moved to the cold-storage archive"),
+    db: Session = Depends(get_db)
+):
     """
     Get the complete movement history of an animal across facilities.
     Returns all 'movement' events with facility details.
     """
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+    animal = repository.get_animal(db, animal_id)
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
     
@@ -430,19 +530,29 @@ def get_animal_movement_history(animal_id: int, db: Session = Depends(get_db)):
         Event.animal_id == animal_id,
         Event.event_type == "movement"
     ).order_by(Event.timestamp.desc()).all()
+    if include_archived:
+        archived = [SimpleNamespace(**row) for row in load_archived_events(db, animal_id, "movement")]
+        movement_events = sorted(movement_events + archived, key=lambda e: e.timestamp, reverse=True)
+    
+    # One lookup for the facilities of all movements, archived ones included
+    facility_ids = {e.facility_id for e in movement_events if e.facility_id}
+    facilities = {
+        f.id: f for f in db.query(Facility).filter(Facility.id.in_(facility_ids))
+    } if facility_ids else {}
     
     result = []
     for event in movement_events:
-        facility = db.query(Facility).filter(Facility.id == event.facility_id).first()
+        facility = facilities.get(event.facility_id)
         result.append({
             "id": event.id,
-            "timestamp": str(event.timestamp),
+            "timestamp": event.timestamp,
             "facility_id": event.facility_id,
             "facility_name": facility.name if facility else "Unknown",
             "facility_type": facility.facility_type if facility else None,
             "facility_location": facility.location if facility else None,
             "metadata": event.event_metadata,
-            "actor_id": event.actor_id
+            "actor_id": event.actor_id,
+            "archived": getattr(event, "archived", False)
         })
     
     return {
@@ -4,17 +4,17 @@ from pydantic import BaseModel, EmailStr, field_validator
 from typing import Optional
 from app.db.session import get_db
 from app.db.models import User
+from app.db import repository
 from app.core.security import create_access_token, verify_password, get_password_hash
 from app.core.dependencies import get_current_user
 from app.core.config import settings
+from app.core.responses import FastJSONRoute
 import secrets
 from datetime import datetime, timedelta
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
 
 from sqlalchemy.orm import Session
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 class RegisterRequest(BaseModel):
@@ -60,7 +60,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     """
     OAuth2 compatible token login. Get an access token for future requests.
     """
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = repository.get_user_by_username(db, form_data.username)
     
     if not user:
         raise HTTPException(
@@ -96,7 +96,7 @@ def register(payload: RegisterRequest, db: Session = Depends(get_db)):
     Register a new user account.
     """
     # Check if username already exists
-    existing_user = db.query(User).filter(User.username == payload.username).first()
+    existing_user = repository.get_user_by_username(db, payload.username)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -259,7 +259,7 @@ def reset_password(payload: ResetPasswordRequest, db: Session = Depends(get_db))
         )
     
     # Get user
-    user = db.query(User).filter(User.id == token_data["user_id"]).first()
+    user = repository.get_user(db, token_data["user_id"])
     
     if not user:
         raise HTTPException(
@@ -290,6 +290,10 @@ def google_auth(payload: GoogleAuthRequest, db: Session = Depends(get_db)):
     """
     Authenticate or register user with Google OAuth token.
     """
+    # google-auth (and requests) load on the first Google sign-in rather than at worker start
+    from google.oauth2 import id_token
+    from google.auth.transport import requests as google_requests
+
     try:
         # Verify the Google token
         idinfo = id_token.verify_oauth2_token(
@@ -327,7 +331,7 @@ def google_auth(payload: GoogleAuthRequest, db: Session = Depends(get_db)):
             
             # Ensure username is unique
             counter = 1
-            while db.query(User).filter(User.username == username).first():
+            while repository.get_user_by_username(db, username):
                 username = f"{username_base}{counter}"
                 counter += 1
             
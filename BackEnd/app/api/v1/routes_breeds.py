@@ -3,14 +3,36 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import Optional
 
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.db.models import AnimalBreed
+from app.db.projection import Projection
+from app.utils.conditional import conditional_get
+from app.utils.pagination import split_page
+from app.utils.totals import TOTAL_MODE_DESCRIPTION, TOTAL_MODE_PATTERN, resolve_total
+from app.core.config import settings
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
+# ETags and 304s for the catalog routes, which only read animal_breeds
+breed_catalog = conditional_get(AnimalBreed.__tablename__, cache_control=settings.CACHE_CONTROL_CATALOG)
 
-@router.get("/species")
-def get_species(db: Session = Depends(get_db)):
+# Fields of a breed list item, selectable with fields=
+BREED_FIELDS = Projection(
+    id=AnimalBreed.id,
+    breed_name=AnimalBreed.breed_name,
+    specie=AnimalBreed.specie,
+    country=AnimalBreed.country,
+    iso3=AnimalBreed.iso3,
+    description=AnimalBreed.description,
+    transboundary_name=AnimalBreed.transboundary_name,
+    other_name=AnimalBreed.other_name,
+    language=AnimalBreed.language,
+)
+
+
+@router.get("/species", dependencies=[Depends(breed_catalog)])
+def get_species(db: Session = Depends(get_read_db)):
     """Get list of all unique species from the breeds database"""
     species = db.query(AnimalBreed.specie).distinct().order_by(AnimalBreed.specie).all()
     return {
@@ -18,55 +40,48 @@ def get_species(db: Session = Depends(get_db)):
     }
 
 
-@router.get("/breeds")
+@router.get("/breeds", dependencies=[Depends(breed_catalog)])
 def get_breeds(
     species: Optional[str] = Query(None, description="Filter by species"),
     country: Optional[str] = Query(None, description="Filter by country"),
     search: Optional[str] = Query(None, description="Search in breed name"),
     limit: int = Query(100, ge=1, le=500),
     skip: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    total_mode: str = Query("exact", pattern=TOTAL_MODE_PATTERN, description=TOTAL_MODE_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=BREED_FIELDS.description),
+    db: Session = Depends(get_read_db)
 ):
     """Get list of animal breeds with optional filtering"""
-    query = db.query(AnimalBreed)
+    query, names = BREED_FIELDS.select(fields)
     
     if species:
-        query = query.filter(AnimalBreed.specie == species)
+        query = query.where(AnimalBreed.specie == species)
     
     if country:
-        query = query.filter(AnimalBreed.country == country)
+        query = query.where(AnimalBreed.country == country)
     
     if search:
-        query = query.filter(AnimalBreed.breed_name.ilike(f"%{search}%"))
+        query = query.where(AnimalBreed.breed_name.ilike(f"%{search}%"))
     
-    total = query.count()
-    breeds = query.order_by(AnimalBreed.breed_name).offset(skip).limit(limit).all()
+    total, total_mode = resolve_total(db, query, total_mode, ("breeds", species, country, search))
+    breeds, has_more = split_page(
+        db.execute(query.order_by(AnimalBreed.breed_name).offset(skip).limit(limit + 1)).all(), limit
+    )
     
     return {
-        "breeds": [
-            {
-                "id": breed.id,
-                "breed_name": breed.breed_name,
-                "specie": breed.specie,
-                "country": breed.country,
-                "iso3": breed.iso3,
-                "description": breed.description,
-                "transboundary_name": breed.transboundary_name,
-                "other_name": breed.other_name,
-                "language": breed.language
-            }
-            for breed in breeds
-        ],
+        "breeds": BREED_FIELDS.items(breeds, names),
         "total": total,
+        "total_mode": total_mode,
+        "has_more": has_more,
         "skip": skip,
         "limit": limit
     }
 
 
-@router.get("/countries")
+@router.get("/countries", dependencies=[Depends(breed_catalog)])
 def get_countries(
     species: Optional[str] = Query(None, description="Filter by species"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get list of countries with breeds, optionally filtered by species"""
     query = db.query(AnimalBreed.country, AnimalBreed.iso3).distinct()
@@ -85,7 +100,7 @@ def get_countries(
 
 
 @router.get("/breeds/{breed_id}")
-def get_breed_details(breed_id: int, db: Session = Depends(get_db)):
+def get_breed_details(breed_id: int, db: Session = Depends(get_read_db)):
     """Get detailed information about a specific breed"""
     breed = db.query(AnimalBreed).filter(AnimalBreed.id == breed_id).first()
     
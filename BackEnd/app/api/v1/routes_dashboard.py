@@ -1,31 +1,39 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, case, func, desc, select
 from datetime import datetime, timedelta
 
-from app.db.session import get_db
-from app.db.models import Animal, Event, Facility, User
+from app.db.session import get_async_read_db
+from app.db.models import Animal, Event, EventDailyRollup, Facility, User
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 @router.get("/overview")
-def get_dashboard_overview(db: Session = Depends(get_db)):
+async def get_dashboard_overview(db: AsyncSession = Depends(get_async_read_db)):
     """Get overall dashboard statistics"""
-    total_animals = db.query(func.count(Animal.id)).scalar()
-    total_facilities = db.query(func.count(Facility.id)).scalar()
-    total_users = db.query(func.count(User.id)).scalar()
-    total_events = db.query(func.count(Event.id)).scalar()
+    total_animals = (await db.execute(select(func.count(Animal.id)))).scalar()
+    total_facilities = (await db.execute(select(func.count(Facility.id)))).scalar()
+    total_users = (await db.execute(select(func.count(User.id)))).scalar()
     
-    # Events in last 7 days
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    recent_events = db.query(func.count(Event.id)).filter(Event.timestamp >= seven_days_ago).scalar()
-    
-    # Anomalies
-    total_anomalies = db.query(func.count(Event.id)).filter(Event.is_valid == False).scalar()
-    recent_anomalies = db.query(func.count(Event.id)).filter(
-        Event.is_valid == False,
-        Event.timestamp >= seven_days_ago
-    ).scalar()
+    # Event counters come from the daily rollups, so their cost doesn't grow
+    # with the event history; "last 7 days" is counted in whole UTC days
+    seven_days_ago = (datetime.utcnow() - timedelta(days=7)).date()
+    count = EventDailyRollup.event_count
+    is_anomaly = EventDailyRollup.is_valid == False
+    is_recent = EventDailyRollup.day >= seven_days_ago
+    counters = (await db.execute(
+        select(
+            func.coalesce(func.sum(count), 0).label('events'),
+            func.coalesce(func.sum(case((is_recent, count), else_=0)), 0).label('recent_events'),
+            func.coalesce(func.sum(case((is_anomaly, count), else_=0)), 0).label('anomalies'),
+            func.coalesce(func.sum(case((and_(is_anomaly, is_recent), count), else_=0)), 0).label('recent_anomalies')
+        )
+    )).one()
+    total_events = counters.events
+    recent_events = counters.recent_events
+    total_anomalies = counters.anomalies
+    recent_anomalies = counters.recent_anomalies
     
     return {
         "totals": {
@@ -45,53 +53,65 @@ def get_dashboard_overview(db: Session = Depends(get_db)):
     }
 
 @router.get("/recent-events")
-def get_recent_events(db: Session = Depends(get_db), limit: int = 10):
+async def get_recent_events(db: AsyncSession = Depends(get_async_read_db), limit: int = 10):
     """Get most recent events with related information"""
-    events = db.query(Event).order_by(desc(Event.timestamp)).limit(limit).all()
+    # Animal and facility come from the same query, not one lookup per event
+    events = (await db.execute(
+        select(
+            Event.id, Event.event_type, Event.timestamp, Event.is_valid,
+            Animal.id.label("animal_id"), Animal.name.label("animal_name"), Animal.tag_id,
+            Facility.id.label("facility_id"), Facility.name.label("facility_name")
+        ).outerjoin(
+            Animal, Animal.id == Event.animal_id
+        ).outerjoin(
+            Facility, Facility.id == Event.facility_id
+        ).order_by(desc(Event.timestamp)).limit(limit)
+    )).all()
     
     result = []
     for e in events:
-        animal = db.query(Animal).filter(Animal.id == e.animal_id).first()
-        facility = db.query(Facility).filter(Facility.id == e.facility_id).first() if e.facility_id else None
-        
         result.append({
             "id": e.id,
             "event_type": e.event_type,
-            "timestamp": str(e.timestamp),
+            "timestamp": e.timestamp,
             "is_valid": e.is_valid,
             "animal": {
-                "id": animal.id,
-                "name": animal.name,
-                "tag_id": animal.tag_id
-            } if animal else None,
+                "id": e.animal_id,
+                "name": e.animal_name,
+                "tag_id": e.tag_id
+            } if e.animal_id is not None else None,
             "facility": {
-                "id": facility.id,
-                "name": facility.name
-            } if facility else None
+                "id": e.facility_id,
+                "name": e.facility_name
+            } if e.facility_id is not None else None
         })
     
     return {"events": result}
 
 @router.get("/timeline")
-def get_event_timeline(db: Session = Depends(get_db), days: int = 30):
+async def get_event_timeline(db: AsyncSession = Depends(get_async_read_db), days: int = 30):
     """Get event counts grouped by day for the last N days"""
-    start_date = datetime.utcnow() - timedelta(days=days)
+    start_date = (datetime.utcnow() - timedelta(days=days)).date()
     
-    # Get events grouped by date
-    events_by_day = db.query(
-        func.date(Event.timestamp).label('date'),
-        func.count(Event.id).label('count'),
-        func.sum(func.cast(~Event.is_valid, func.Integer)).label('anomalies')
-    ).filter(
-        Event.timestamp >= start_date
-    ).group_by(
-        func.date(Event.timestamp)
-    ).order_by('date').all()
+    # Read the per-day counts from the rollup table instead of grouping raw events
+    events_by_day = (await db.execute(
+        select(
+            EventDailyRollup.day.label('date'),
+            func.sum(EventDailyRollup.event_count).label('count'),
+            func.sum(case((EventDailyRollup.is_valid == False, EventDailyRollup.event_count), else_=0)).label('anomalies')
+        ).where(
+            EventDailyRollup.day >= start_date
+        ).group_by(
+            EventDailyRollup.day
+        ).having(
+            func.sum(EventDailyRollup.event_count) > 0
+        ).order_by(EventDailyRollup.day)
+    )).all()
     
     timeline = []
     for day in events_by_day:
         timeline.append({
-            "date": str(day.date),
+            "date": day.date,
             "total_events": day.count,
             "anomalies": day.anomalies or 0
         })
@@ -99,21 +119,23 @@ def get_event_timeline(db: Session = Depends(get_db), days: int = 30):
     return {"timeline": timeline, "days": days}
 
 @router.get("/top-facilities")
-def get_top_facilities(db: Session = Depends(get_db), limit: int = 5):
+async def get_top_facilities(db: AsyncSession = Depends(get_async_read_db), limit: int = 5):
     """Get facilities with most animals"""
-    facilities = db.query(
-        Facility.id,
-        Facility.name,
-        Facility.location,
-        Facility.facility_type,
-        func.count(Animal.id).label('animal_count')
-    ).outerjoin(
-        Animal, Animal.facility_id == Facility.id
-    ).group_by(
-        Facility.id, Facility.name, Facility.location, Facility.facility_type
-    ).order_by(
-        desc('animal_count')
-    ).limit(limit).all()
+    facilities = (await db.execute(
+        select(
+            Facility.id,
+            Facility.name,
+            Facility.location,
+            Facility.facility_type,
+            func.count(Animal.id).label('animal_count')
+        ).outerjoin(
+            Animal, Animal.facility_id == Facility.id
+        ).group_by(
+            Facility.id, Facility.name, Facility.location, Facility.facility_type
+        ).order_by(
+            desc('animal_count')
+        ).limit(limit)
+    )).all()
     
     result = []
     for f in facilities:
@@ -128,12 +150,14 @@ def get_top_facilities(db: Session = Depends(get_db), limit: int = 5):
     return {"facilities": result}
 
 @router.get("/species-distribution")
-def get_species_distribution(db: Session = Depends(get_db)):
+async def get_species_distribution(db: AsyncSession = Depends(get_async_read_db)):
     """Get distribution of animals by species"""
-    distribution = db.query(
-        Animal.species,
-        func.count(Animal.id).label('count')
-    ).group_by(Animal.species).order_by(desc('count')).all()
+    distribution = (await db.execute(
+        select(
+            Animal.species,
+            func.count(Animal.id).label('count')
+        ).group_by(Animal.species).order_by(desc('count'))
+    )).all()
     
     total = sum(d.count for d in distribution)
     
@@ -1,14 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from typing import Optional, List
 from app.db.session import get_db
-from app.db.models import Document, Animal, User
+from app.db.models import Document, User
+from app.db import repository
 from app.core.dependencies import get_current_user
+from app.core.responses import FastJSONRoute
 import os
 from datetime import datetime
 import shutil
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 # Configure upload directory
 UPLOAD_DIR = "uploads/documents"
@@ -66,7 +68,7 @@ async def upload_document(
     Upload a document for an animal (vaccination record, certificate, etc.).
     """
     # Check if animal exists
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+    animal = repository.get_animal(db, animal_id)
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
     
@@ -123,7 +125,7 @@ async def upload_document(
         "file_name": document.file_name,
         "file_size": document.file_size,
         "description": document.description,
-        "uploaded_at": str(document.uploaded_at),
+        "uploaded_at": document.uploaded_at,
         "uploaded_by": current_user.username
     }
 
@@ -137,7 +139,7 @@ def get_animal_documents(
     """
     Get all documents for an animal, optionally filtered by type.
     """
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+    animal = repository.get_animal(db, animal_id)
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
     
@@ -146,11 +148,12 @@ def get_animal_documents(
     if document_type:
         query = query.filter(Document.document_type == document_type)
     
-    documents = query.order_by(Document.uploaded_at.desc()).all()
+    # The uploader is joined in, not looked up per document
+    documents = query.options(joinedload(Document.uploader)).order_by(Document.uploaded_at.desc()).all()
     
     result = []
     for doc in documents:
-        uploader = db.query(User).filter(User.id == doc.uploaded_by).first()
+        uploader = doc.uploader
         result.append({
             "id": doc.id,
             "document_type": doc.document_type,
@@ -158,7 +161,7 @@ def get_animal_documents(
             "file_size": doc.file_size,
             "mime_type": doc.mime_type,
             "description": doc.description,
-            "uploaded_at": str(doc.uploaded_at),
+            "uploaded_at": doc.uploaded_at,
             "uploaded_by": uploader.username if uploader else "Unknown"
         })
     
@@ -182,8 +185,8 @@ def get_document(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    uploader = db.query(User).filter(User.id == document.uploaded_by).first()
-    animal = db.query(Animal).filter(Animal.id == document.animal_id).first()
+    uploader = repository.get_user(db, document.uploaded_by)
+    animal = repository.get_animal(db, document.animal_id)
     
     return {
         "id": document.id,
@@ -194,7 +197,7 @@ def get_document(
         "file_size": document.file_size,
         "mime_type": document.mime_type,
         "description": document.description,
-        "uploaded_at": str(document.uploaded_at),
+        "uploaded_at": document.uploaded_at,
         "uploaded_by": uploader.username if uploader else "Unknown"
     }
 
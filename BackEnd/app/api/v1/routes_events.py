@@ -1,16 +1,39 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, select
+from typing import List, Optional
 from datetime import datetime
-from app.db.session import get_db
-from app.db.models import Event, Animal, Facility, User
+from app.db.session import get_async_db, get_async_read_db, get_read_db
+from app.db.models import Event, User
+from app.db import repository
+from app.db.projection import Projection
+from app.db.table_versions import EVENT_TYPES
 from app.services.plausibility_engine import validate_event
+from app.utils.conditional import conditional_get
+from app.utils.event_metadata import META_FILTER_DESCRIPTION, apply_metadata_filters, normalize_metadata
+from app.utils.pagination import apply_keyset, decode_cursor, next_cursor, split_page
+from app.utils.totals import TOTAL_MODE_DESCRIPTION, TOTAL_MODE_PATTERN, resolve_total, resolve_total_async
+from app.core.config import settings
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
+
+# Fields of an event list item, selectable with fields=
+EVENT_FIELDS = Projection(
+    id=Event.id,
+    event_type=Event.event_type,
+    animal_id=Event.animal_id,
+    actor_id=Event.actor_id,
+    facility_id=Event.facility_id,
+    timestamp=Event.timestamp,
+    is_valid=Event.is_valid,
+    anomaly_reason=Event.anomaly_reason,
+    metadata=Event.event_metadata,
+)
 
 @router.post("/", status_code=201)
-def create_event(payload: dict, db: Session = Depends(get_db)):
+async def create_event(payload: dict, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
     """Create a new event with validation and anomaly notification"""
     from app.utils.email_service import email_service
     
@@ -18,7 +41,7 @@ def create_event(payload: dict, db: Session = Depends(get_db)):
     if not animal_id:
         raise HTTPException(status_code=400, detail="animal_id is required")
     
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+    animal = await repository.get_animal_async(db, animal_id)
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
     
@@ -30,22 +53,23 @@ def create_event(payload: dict, db: Session = Depends(get_db)):
         animal_id=animal_id,
         actor_id=payload.get("actor_id"),
         facility_id=payload.get("facility_id"),
-        event_metadata=payload.get("metadata", ""),
+        event_metadata=normalize_metadata(payload.get("metadata")),
         is_valid=result["is_valid"],
         anomaly_reason=result.get("reason"),
         timestamp=datetime.utcnow()
     )
     
     db.add(event)
-    db.commit()
-    db.refresh(event)
+    await db.commit()
+    await db.refresh(event)
     
-    # If anomaly detected, send email alerts to regulators
+    # If anomaly detected, email regulators after the response is sent (SMTP is blocking)
     if not event.is_valid:
-        regulators = db.query(User).filter(User.role == "regulator").all()
+        regulators = (await db.execute(select(User).where(User.role == "regulator"))).scalars().all()
         for regulator in regulators:
             if regulator.email:
-                email_service.send_anomaly_alert_email(
+                background_tasks.add_task(
+                    email_service.send_anomaly_alert_email,
                     to_email=regulator.email,
                     username=regulator.username,
                     animal_id=animal.id,
@@ -60,7 +84,7 @@ def create_event(payload: dict, db: Session = Depends(get_db)):
             "id": event.id,
             "event_type": event.event_type,
             "animal_id": event.animal_id,
-            "timestamp": str(event.timestamp),
+            "timestamp": event.timestamp,
             "is_valid": event.is_valid,
             "anomaly_reason": event.anomaly_reason
         },
@@ -68,71 +92,86 @@ def create_event(payload: dict, db: Session = Depends(get_db)):
     }
 
 @router.post("/record")
-def record_event(event: dict, db: Session = Depends(get_db)):
+async def record_event(event: dict, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
     """Legacy endpoint - redirects to create_event"""
-    return create_event(event, db)
+    return await create_event(event, background_tasks, db)
 
 @router.get("/")
-def list_events(
-    db: Session = Depends(get_db),
+async def list_events(
+    db: AsyncSession = Depends(get_async_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page (next_cursor); replaces skip"),
+    total_mode: str = Query("exact", pattern=TOTAL_MODE_PATTERN, description=TOTAL_MODE_DESCRIPTION),
     event_type: Optional[str] = None,
     animal_id: Optional[int] = None,
     facility_id: Optional[int] = None,
-    is_valid: Optional[bool] = None
+    is_valid: Optional[bool] = None,
+    meta: Optional[List[str]] = Query(None, description=META_FILTER_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=EVENT_FIELDS.description)
 ):
     """List events with filtering and pagination"""
-    query = db.query(Event)
+    # Plain rows: a page is serialized once, identity-map tracking would be wasted
+    query, names = EVENT_FIELDS.select(fields, "timestamp", "id")
     
     if event_type:
-        query = query.filter(Event.event_type == event_type)
+        query = query.where(Event.event_type == event_type)
     if animal_id:
-        query = query.filter(Event.animal_id == animal_id)
+        query = query.where(Event.animal_id == animal_id)
     if facility_id:
-        query = query.filter(Event.facility_id == facility_id)
+        query = query.where(Event.facility_id == facility_id)
     if is_valid is not None:
-        query = query.filter(Event.is_valid == is_valid)
+        query = query.where(Event.is_valid == is_valid)
+    query = apply_metadata_filters(query, Event.event_metadata, meta, db.get_bind().dialect.name)
     
-    total = query.count()
-    events = query.order_by(desc(Event.timestamp)).offset(skip).limit(limit).all()
+    total, total_mode = await resolve_total_async(
+        db, query, total_mode, ("events", event_type, animal_id, facility_id, is_valid, tuple(meta or ()))
+    )
     
-    result = []
-    for e in events:
-        result.append({
-            "id": e.id,
-            "event_type": e.event_type,
-            "animal_id": e.animal_id,
-            "actor_id": e.actor_id,
-            "facility_id": e.facility_id,
-            "timestamp": str(e.timestamp),
-            "is_valid": e.is_valid,
-            "anomaly_reason": e.anomaly_reason,
-            "metadata": e.event_metadata
-        })
+    cursor_values = decode_cursor(cursor, datetime, int) if cursor else None
+    query = apply_keyset(query, [Event.timestamp, Event.id], cursor_values, descending=True)
+    if cursor_values is None:
+        query = query.offset(skip)
+    events, has_more = split_page((await db.execute(query.limit(limit + 1))).all(), limit)
     
-    return {"events": result, "total": total, "skip": skip, "limit": limit}
+    return {
+        "events": EVENT_FIELDS.items(events, names),
+        "total": total,
+        "total_mode": total_mode,
+        "has_more": has_more,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": next_cursor(events, has_more, "timestamp", "id")
+    }
 
-@router.get("/types")
-def list_event_types(db: Session = Depends(get_db)):
+@router.get("/types", dependencies=[Depends(conditional_get(EVENT_TYPES, cache_control=settings.CACHE_CONTROL_CATALOG))])
+def list_event_types(db: Session = Depends(get_read_db)):
     """Get distinct list of all event types"""
     types = db.query(Event.event_type).distinct().all()
     return {"event_types": [t[0] for t in types if t[0]]}
 
 @router.get("/anomalies")
 def list_anomalies(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000)
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page (next_cursor); replaces skip"),
+    total_mode: str = Query("exact", pattern=TOTAL_MODE_PATTERN, description=TOTAL_MODE_DESCRIPTION)
 ):
     """Get all events marked as anomalies"""
     query = db.query(Event).filter(Event.is_valid == False)
-    total = query.count()
-    events = query.order_by(desc(Event.timestamp)).offset(skip).limit(limit).all()
+    total, total_mode = resolve_total(db, query.statement, total_mode, ("anomalies",))
+    
+    cursor_values = decode_cursor(cursor, datetime, int) if cursor else None
+    query = apply_keyset(query, [Event.timestamp, Event.id], cursor_values, descending=True)
+    if cursor_values is None:
+        query = query.offset(skip)
+    # The animal is joined in, not looked up per anomaly
+    events, has_more = split_page(query.options(joinedload(Event.animal)).limit(limit + 1).all(), limit)
     
     result = []
     for e in events:
-        animal = db.query(Animal).filter(Animal.id == e.animal_id).first()
+        animal = e.animal
         result.append({
             "id": e.id,
             "event_type": e.event_type,
@@ -141,15 +180,21 @@ def list_anomalies(
                 "name": animal.name,
                 "tag_id": animal.tag_id
             } if animal else None,
-            "timestamp": str(e.timestamp),
+            "timestamp": e.timestamp,
             "anomaly_reason": e.anomaly_reason,
             "metadata": e.event_metadata
         })
     
-    return {"anomalies": result, "total": total}
+    return {
+        "anomalies": result,
+        "total": total,
+        "total_mode": total_mode,
+        "has_more": has_more,
+        "next_cursor": next_cursor(events, has_more, "timestamp", "id")
+    }
 
 @router.get("/stats")
-def get_event_statistics(db: Session = Depends(get_db)):
+def get_event_statistics(db: Session = Depends(get_read_db)):
     """Get event statistics"""
     total_events = db.query(func.count(Event.id)).scalar()
     valid_events = db.query(func.count(Event.id)).filter(Event.is_valid == True).scalar()
@@ -165,20 +210,20 @@ def get_event_statistics(db: Session = Depends(get_db)):
     }
 
 @router.get("/{event_id}")
-def get_event(event_id: int, db: Session = Depends(get_db)):
+def get_event(event_id: int, db: Session = Depends(get_read_db)):
     """Get a specific event with related information"""
     event = db.query(Event).filter(Event.id == event_id).first()
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    animal = db.query(Animal).filter(Animal.id == event.animal_id).first()
-    facility = db.query(Facility).filter(Facility.id == event.facility_id).first() if event.facility_id else None
-    actor = db.query(User).filter(User.id == event.actor_id).first() if event.actor_id else None
+    animal = repository.get_animal(db, event.animal_id)
+    facility = repository.get_facility(db, event.facility_id) if event.facility_id else None
+    actor = repository.get_user(db, event.actor_id) if event.actor_id else None
     
     return {
         "id": event.id,
         "event_type": event.event_type,
-        "timestamp": str(event.timestamp),
+        "timestamp": event.timestamp,
         "is_valid": event.is_valid,
         "anomaly_reason": event.anomaly_reason,
         "metadata": event.event_metadata,
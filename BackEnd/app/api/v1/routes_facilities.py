@@ -3,10 +3,16 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, or_
 from typing import Optional
 
-from app.db.session import get_db
-from app.db.models import Facility, Animal, Event
+from app.db.session import get_db, get_read_db
+from app.db.models import Facility, Animal, EventDailyRollup
+from app.db import repository
+from app.utils.conditional import conditional_get
+from app.utils.pagination import apply_keyset, decode_cursor, next_cursor, split_page
+from app.utils.totals import TOTAL_MODE_DESCRIPTION, TOTAL_MODE_PATTERN, resolve_total
+from app.core.config import settings
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.post("/", status_code=201)
@@ -26,12 +32,14 @@ def create_facility(payload: dict, db: Session = Depends(get_db)):
 
 @router.get("/")
 def list_facilities(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     facility_type: Optional[str] = None,
     location: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page (next_cursor); replaces skip"),
+    total_mode: str = Query("exact", pattern=TOTAL_MODE_PATTERN, description=TOTAL_MODE_DESCRIPTION)
 ):
     """List facilities with filtering, search, and pagination"""
     query = db.query(Facility)
@@ -48,18 +56,41 @@ def list_facilities(
             )
         )
     
-    total = query.count()
-    facilities = query.offset(skip).limit(limit).all()
+    total, total_mode = resolve_total(
+        db, query.statement, total_mode, ("facilities", facility_type, location, search)
+    )
+    
+    cursor_values = decode_cursor(cursor, int) if cursor else None
+    query = apply_keyset(query, [Facility.id], cursor_values)
+    if cursor_values is None:
+        query = query.offset(skip)
+    facilities, has_more = split_page(query.limit(limit + 1).all(), limit)
     
     result = []
     for f in facilities:
         result.append({"id": f.id, "name": f.name, "location": f.location, "facility_type": f.facility_type})
-    return {"facilities": result, "total": total, "skip": skip, "limit": limit}
+    return {
+        "facilities": result,
+        "total": total,
+        "total_mode": total_mode,
+        "has_more": has_more,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": next_cursor(facilities, has_more, "id")
+    }
+
+
+# Declared before /{facility_id}, which would otherwise match "types"
+@router.get("/types", dependencies=[Depends(conditional_get(Facility.__tablename__, cache_control=settings.CACHE_CONTROL_CATALOG))])
+def list_facility_types(db: Session = Depends(get_read_db)):
+    """Get distinct list of all facility types"""
+    types = db.query(Facility.facility_type).distinct().all()
+    return {"facility_types": [t[0] for t in types if t[0]]}
 
 
-@router.get("/{facility_id}")
-def get_facility(facility_id: int, db: Session = Depends(get_db)):
-    facility = db.query(Facility).filter(Facility.id == facility_id).first()
+@router.get("/{facility_id}", dependencies=[Depends(conditional_get(Facility.__tablename__, cache_control=settings.CACHE_CONTROL_DETAIL))])
+def get_facility(facility_id: int, db: Session = Depends(get_read_db)):
+    facility = repository.get_facility(db, facility_id)
     if not facility:
         raise HTTPException(status_code=404, detail="Facility not found")
     return {"id": facility.id, "name": facility.name, "location": facility.location, "facility_type": facility.facility_type}
@@ -67,7 +98,7 @@ def get_facility(facility_id: int, db: Session = Depends(get_db)):
 
 @router.put("/{facility_id}")
 def update_facility(facility_id: int, payload: dict, db: Session = Depends(get_db)):
-    facility = db.query(Facility).filter(Facility.id == facility_id).first()
+    facility = repository.get_facility(db, facility_id)
     if not facility:
         raise HTTPException(status_code=404, detail="Facility not found")
 
@@ -87,7 +118,7 @@ def update_facility(facility_id: int, payload: dict, db: Session = Depends(get_d
 
 @router.delete("/{facility_id}")
 def delete_facility(facility_id: int, db: Session = Depends(get_db)):
-    facility = db.query(Facility).filter(Facility.id == facility_id).first()
+    facility = repository.get_facility(db, facility_id)
     if not facility:
         raise HTTPException(status_code=404, detail="Facility not found")
 
@@ -96,27 +127,28 @@ def delete_facility(facility_id: int, db: Session = Depends(get_db)):
 
     return {"status": "deleted"}
 
-@router.get("/types")
-def list_facility_types(db: Session = Depends(get_db)):
-    """Get distinct list of all facility types"""
-    types = db.query(Facility.facility_type).distinct().all()
-    return {"facility_types": [t[0] for t in types if t[0]]}
-
 @router.get("/{facility_id}/animals")
 def get_facility_animals(
     facility_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000)
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page (next_cursor); replaces skip"),
+    total_mode: str = Query("exact", pattern=TOTAL_MODE_PATTERN, description=TOTAL_MODE_DESCRIPTION)
 ):
     """Get all animals at a specific facility"""
-    facility = db.query(Facility).filter(Facility.id == facility_id).first()
+    facility = repository.get_facility(db, facility_id)
     if not facility:
         raise HTTPException(status_code=404, detail="Facility not found")
     
     query = db.query(Animal).filter(Animal.facility_id == facility_id)
-    total = query.count()
-    animals = query.offset(skip).limit(limit).all()
+    total, total_mode = resolve_total(db, query.statement, total_mode, ("facility_animals", facility_id))
+    
+    cursor_values = decode_cursor(cursor, int) if cursor else None
+    query = apply_keyset(query, [Animal.id], cursor_values)
+    if cursor_values is None:
+        query = query.offset(skip)
+    animals, has_more = split_page(query.limit(limit + 1).all(), limit)
     
     result = []
     for a in animals:
@@ -125,7 +157,7 @@ def get_facility_animals(
             "name": a.name,
             "species": a.species,
             "tag_id": a.tag_id,
-            "date_added": str(a.date_added) if a.date_added else None
+            "date_added": a.date_added
         })
     
     return {
@@ -136,18 +168,23 @@ def get_facility_animals(
             "facility_type": facility.facility_type
         },
         "animals": result,
-        "total": total
+        "total": total,
+        "total_mode": total_mode,
+        "has_more": has_more,
+        "next_cursor": next_cursor(animals, has_more, "id")
     }
 
 @router.get("/{facility_id}/stats")
-def get_facility_stats(facility_id: int, db: Session = Depends(get_db)):
+def get_facility_stats(facility_id: int, db: Session = Depends(get_read_db)):
     """Get statistics for a specific facility"""
-    facility = db.query(Facility).filter(Facility.id == facility_id).first()
+    facility = repository.get_facility(db, facility_id)
     if not facility:
         raise HTTPException(status_code=404, detail="Facility not found")
     
     animal_count = db.query(func.count(Animal.id)).filter(Animal.facility_id == facility_id).scalar()
-    event_count = db.query(func.count(Event.id)).filter(Event.facility_id == facility_id).scalar()
+    event_count = db.query(
+        func.coalesce(func.sum(EventDailyRollup.event_count), 0)
+    ).filter(EventDailyRollup.facility_id == facility_id).scalar()
     
     animals_by_species = db.query(
         Animal.species,
@@ -1,31 +1,63 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.db.archive import archive_files_query, read_archived_events
+from app.db.session import get_async_read_db
 from app.db import models
+from app.core.responses import FastJSONRoute
 from app.core.security import get_current_user_optional
-from app.utils.pdf_generator import generate_animal_traceability_report, generate_compliance_report
+from app.utils.event_metadata import format_metadata
+from app.utils.pdf_generator import (
+    ANOMALY_ROWS, FACILITY_ROWS, TIMELINE_EVENTS, generate_animal_traceability_report, generate_compliance_report
+)
 from datetime import datetime
+from types import SimpleNamespace
+from typing import Optional
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
+
+# Most recent events listed in an audit log report
+AUDIT_LOG_ROWS = 100
+
+
+def _event_time_range(stmt, start_date: Optional[datetime], end_date: Optional[datetime]):
+    """Bound an events query by timestamp so PostgreSQL only scans the matching monthly partitions."""
+    if start_date:
+        stmt = stmt.where(models.Event.timestamp >= start_date)
+    if end_date:
+        stmt = stmt.where(models.Event.timestamp < end_date)
+    return stmt
 
 
 @router.get("/animals/{animal_id}/pdf", tags=["Reports"])
 async def export_animal_traceability_pdf(
     animal_id: int,
     request: Request,
-    db: Session = Depends(get_db),
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_user_optional)
 ):
     """
     Generate and download a PDF traceability report for an animal.
     
     - **animal_id**: ID of the animal to generate report for
+    - **include_archived**: Include events moved to the cold-storage archive (full timeline)
     
     Returns a PDF file with animal information, movement history, and event timeline.
     """
     # Get animal data
-    animal = db.query(models.Animal).filter(models.Animal.id == animal_id).first()
+    animal = (await db.execute(
+        select(models.Animal)
+        .options(
+            joinedload(models.Animal.breed),
+            joinedload(models.Animal.facility),
+            joinedload(models.Animal.owner)
+        )
+        .where(models.Animal.id == animal_id)
+    )).scalars().first()
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
     
@@ -36,7 +68,7 @@ async def export_animal_traceability_pdf(
         "tag_id": animal.tag_id,
         "species": animal.species,
         "breed": {
-            "name": animal.breed.name if animal.breed else "Unknown"
+            "name": animal.breed.breed_name if animal.breed else "Unknown"
         },
         "facility": {
             "name": animal.facility.name if animal.facility else "Unknown"
@@ -47,27 +79,64 @@ async def export_animal_traceability_pdf(
         "date_added": str(animal.date_added) if animal.date_added else None
     }
     
-    # Get movement history
-    movements = db.query(models.Movement).filter(
-        models.Movement.animal_id == animal_id
-    ).order_by(models.Movement.timestamp.desc()).all()
+    # Get movement history (movements are recorded as 'movement' events)
+    movements = (await db.execute(
+        select(models.Event.timestamp, models.Facility.name, models.Facility.facility_type, models.Facility.location)
+        .outerjoin(models.Facility, models.Facility.id == models.Event.facility_id)
+        .where(models.Event.animal_id == animal_id, models.Event.event_type == "movement")
+        .order_by(models.Event.timestamp.desc())
+    )).all()
+    
+    # Archived history lives in Parquet files; reading them is blocking IO
+    archived_events = []
+    if include_archived:
+        archive_paths = (await db.execute(archive_files_query(animal_id))).scalars().all()
+        if archive_paths:
+            archived_events = await run_in_threadpool(read_archived_events, archive_paths, animal_id)
+    archived_movements = [e for e in archived_events if e["event_type"] == "movement"]
+    if archived_movements:
+        facility_ids = {e["facility_id"] for e in archived_movements if e["facility_id"]}
+        facilities = {
+            f.id: f for f in (await db.execute(
+                select(models.Facility).where(models.Facility.id.in_(facility_ids))
+            )).scalars().all()
+        } if facility_ids else {}
+        for e in archived_movements:
+            facility = facilities.get(e["facility_id"])
+            movements.append((
+                e["timestamp"],
+                facility.name if facility else None,
+                facility.facility_type if facility else None,
+                facility.location if facility else None
+            ))
+        movements.sort(key=lambda m: m[0], reverse=True)
     
     movement_data = []
-    for movement in movements:
-        facility = db.query(models.Facility).filter(
-            models.Facility.id == movement.facility_id
-        ).first()
+    for timestamp, facility_name, facility_type, facility_location in movements:
         movement_data.append({
-            "facility_name": facility.name if facility else "Unknown",
-            "facility_type": facility.facility_type if facility else "Unknown",
-            "facility_location": facility.location if facility else "Unknown",
-            "timestamp": str(movement.timestamp)
+            "facility_name": facility_name or "Unknown",
+            "facility_type": facility_type or "Unknown",
+            "facility_location": facility_location or "Unknown",
+            "timestamp": str(timestamp)
         })
     
-    # Get event history
-    events = db.query(models.Event).filter(
-        models.Event.animal_id == animal_id
-    ).order_by(models.Event.timestamp.desc()).all()
+    # Event history: the report shows the most recent TIMELINE_EVENTS, so load
+    # only those (as plain rows) and count the rest instead of materializing them
+    total_events = (await db.execute(
+        select(func.count(models.Event.id)).where(models.Event.animal_id == animal_id)
+    )).scalar()
+    events = (await db.execute(
+        select(models.Event.timestamp, models.Event.event_type, models.Event.is_valid, models.Event.event_metadata)
+        .where(models.Event.animal_id == animal_id)
+        .order_by(models.Event.timestamp.desc())
+        .limit(TIMELINE_EVENTS)
+    )).all()
+    
+    if archived_events:
+        total_events += len(archived_events)
+        events = sorted(
+            events + [SimpleNamespace(**e) for e in archived_events], key=lambda e: e.timestamp, reverse=True
+        )[:TIMELINE_EVENTS]
     
     event_data = []
     for event in events:
@@ -75,11 +144,14 @@ async def export_animal_traceability_pdf(
             "timestamp": str(event.timestamp),
             "event_type": event.event_type,
             "is_valid": event.is_valid,
-            "event_metadata": event.event_metadata or "No details"
+            "event_metadata": format_metadata(event.event_metadata, "No details")
         })
     
     # Generate PDF
-    pdf_buffer = generate_animal_traceability_report(animal_data, event_data, movement_data)
+    # PDF rendering is CPU-bound; keep it off the event loop
+    pdf_buffer = await run_in_threadpool(
+        generate_animal_traceability_report, animal_data, event_data, movement_data, total_events
+    )
     
     # Create filename
     filename = f"animal_{animal_id}_traceability_report_{datetime.now().strftime('%Y%m%d')}.pdf"
@@ -95,12 +167,17 @@ async def export_animal_traceability_pdf(
 @router.get("/compliance/pdf", tags=["Reports"])
 async def export_compliance_pdf(
     request: Request,
-    db: Session = Depends(get_db),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_user_optional)
 ):
     """
     Generate and download a compliance report PDF (regulator access only).
     
+    - **start_date**: Only count and list events at or after this time (optional)
+    - **end_date**: Only count and list events before this time (optional)
+    
     Returns a PDF file with system statistics, anomalies, and facility information.
     """
     # Check if user is a regulator
@@ -108,10 +185,14 @@ async def export_compliance_pdf(
         raise HTTPException(status_code=403, detail="Access denied. Regulator role required.")
     
     # Get system statistics
-    total_animals = db.query(models.Animal).count()
-    total_events = db.query(models.Event).count()
-    anomalies_count = db.query(models.Event).filter(models.Event.is_valid == False).count()
-    total_facilities = db.query(models.Facility).count()
+    total_animals = (await db.execute(select(func.count(models.Animal.id)))).scalar()
+    total_events = (await db.execute(
+        _event_time_range(select(func.count(models.Event.id)), start_date, end_date)
+    )).scalar()
+    anomalies_count = (await db.execute(
+        _event_time_range(select(func.count(models.Event.id)).where(models.Event.is_valid == False), start_date, end_date)
+    )).scalar()
+    total_facilities = (await db.execute(select(func.count(models.Facility.id)))).scalar()
     
     stats = {
         "totalAnimals": total_animals,
@@ -120,10 +201,15 @@ async def export_compliance_pdf(
         "totalFacilities": total_facilities
     }
     
-    # Get recent anomalies
-    anomalies = db.query(models.Event).filter(
-        models.Event.is_valid == False
-    ).order_by(models.Event.timestamp.desc()).limit(50).all()
+    # Get recent anomalies (only the rows the report shows, as plain rows)
+    anomalies = (await db.execute(
+        _event_time_range(
+            select(models.Event.timestamp, models.Event.animal_id, models.Event.event_type, models.Event.anomaly_reason)
+            .where(models.Event.is_valid == False),
+            start_date, end_date
+        )
+        .order_by(models.Event.timestamp.desc()).limit(ANOMALY_ROWS)
+    )).all()
     
     anomaly_data = []
     for anomaly in anomalies:
@@ -131,11 +217,14 @@ async def export_compliance_pdf(
             "timestamp": str(anomaly.timestamp),
             "animal_id": anomaly.animal_id,
             "event_type": anomaly.event_type,
-            "anomaly_reason": getattr(anomaly, 'anomaly_reason', 'Validation failed')
+            "anomaly_reason": anomaly.anomaly_reason or "Validation failed"
         })
     
     # Get facilities
-    facilities = db.query(models.Facility).all()
+    facilities = (await db.execute(
+        select(models.Facility.name, models.Facility.facility_type, models.Facility.location)
+        .order_by(models.Facility.id).limit(FACILITY_ROWS)
+    )).all()
     
     facility_data = []
     for facility in facilities:
@@ -146,7 +235,7 @@ async def export_compliance_pdf(
         })
     
     # Generate PDF
-    pdf_buffer = generate_compliance_report(stats, anomaly_data, facility_data)
+    pdf_buffer = await run_in_threadpool(generate_compliance_report, stats, anomaly_data, facility_data)
     
     # Create filename
     filename = f"compliance_report_{datetime.now().strftime('%Y%m%d')}.pdf"
@@ -165,7 +254,9 @@ async def export_audit_logs_pdf(
     event_type: str = None,
     validity: str = None,
     facility_id: int = None,
-    db: Session = Depends(get_db),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_user_optional)
 ):
     """
@@ -174,6 +265,8 @@ async def export_audit_logs_pdf(
     - **event_type**: Filter by event type (optional)
     - **validity**: Filter by validity: "valid", "anomaly", or "all" (optional)
     - **facility_id**: Filter by facility ID (optional)
+    - **start_date**: Only include events at or after this time (optional)
+    - **end_date**: Only include events before this time (optional)
     
     Returns a PDF file with filtered audit logs.
     """
@@ -181,48 +274,55 @@ async def export_audit_logs_pdf(
     if current_user.role != "regulator":
         raise HTTPException(status_code=403, detail="Access denied. Regulator role required.")
     
-    # Build query
-    query = db.query(models.Event)
+    # Build query: one pass over plain rows, with animal and facility names joined in
+    query = (
+        select(
+            models.Event.timestamp, models.Event.animal_id, models.Animal.name.label("animal_name"),
+            models.Event.event_type, models.Facility.name.label("facility_name"),
+            models.Event.is_valid, models.Event.event_metadata
+        )
+        .outerjoin(models.Animal, models.Animal.id == models.Event.animal_id)
+        .outerjoin(models.Facility, models.Facility.id == models.Event.facility_id)
+    )
     
     if event_type:
-        query = query.filter(models.Event.event_type == event_type)
+        query = query.where(models.Event.event_type == event_type)
     
     if validity == "valid":
-        query = query.filter(models.Event.is_valid == True)
+        query = query.where(models.Event.is_valid == True)
     elif validity == "anomaly":
-        query = query.filter(models.Event.is_valid == False)
+        query = query.where(models.Event.is_valid == False)
     
     if facility_id:
-        query = query.filter(models.Event.facility_id == facility_id)
+        query = query.where(models.Event.facility_id == facility_id)
     
-    events = query.order_by(models.Event.timestamp.desc()).limit(100).all()
+    query = _event_time_range(query, start_date, end_date)
     
     # Prepare event data
     event_data = []
-    for event in events:
-        animal = db.query(models.Animal).filter(models.Animal.id == event.animal_id).first()
-        facility = db.query(models.Facility).filter(models.Facility.id == event.facility_id).first()
-        
+    anomalies = 0
+    for event in (await db.execute(query.order_by(models.Event.timestamp.desc()).limit(AUDIT_LOG_ROWS))).all():
+        anomalies += not event.is_valid
         event_data.append({
             "timestamp": str(event.timestamp),
             "animal_id": event.animal_id,
-            "animal_name": animal.name if animal else "Unknown",
+            "animal_name": event.animal_name or "Unknown",
             "event_type": event.event_type,
-            "facility_name": facility.name if facility else "Unknown",
+            "facility_name": event.facility_name or "Unknown",
             "is_valid": event.is_valid,
-            "event_metadata": event.event_metadata or "No details"
+            "event_metadata": format_metadata(event.event_metadata, "No details")
         })
     
     # Use compliance report generator with event data as anomalies
     stats = {
-        "totalAnimals": db.query(models.Animal).count(),
-        "totalEvents": len(events),
-        "anomalies": sum(1 for e in events if not e.is_valid),
-        "totalFacilities": db.query(models.Facility).count()
+        "totalAnimals": (await db.execute(select(func.count(models.Animal.id)))).scalar(),
+        "totalEvents": len(event_data),
+        "anomalies": anomalies,
+        "totalFacilities": (await db.execute(select(func.count(models.Facility.id)))).scalar()
     }
     
     # Generate PDF (reuse compliance report format)
-    pdf_buffer = generate_compliance_report(stats, event_data, [])
+    pdf_buffer = await run_in_threadpool(generate_compliance_report, stats, event_data, [])
     
     # Create filename
     filename = f"audit_logs_{datetime.now().strftime('%Y%m%d')}.pdf"
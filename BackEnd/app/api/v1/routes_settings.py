@@ -5,9 +5,11 @@ from typing import Optional, Union
 
 from app.db.session import get_db
 from app.db.models import User
+from app.db import repository
 from app.core.security import get_password_hash, get_current_user
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 class ProfileUpdate(BaseModel):
@@ -52,7 +54,7 @@ def get_profile(
     current_user: User = Depends(get_current_user)
 ):
     """Get user profile settings"""
-    user = db.query(User).filter(User.username == username).first()
+    user = repository.get_user_by_username(db, username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -74,13 +76,13 @@ def update_profile(
     current_user: User = Depends(get_current_user)
 ):
     """Update user profile settings"""
-    user = db.query(User).filter(User.username == username).first()
+    user = repository.get_user_by_username(db, username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Check if username is being changed and if it's already taken
     if profile.username and profile.username != user.username:
-        existing = db.query(User).filter(User.username == profile.username).first()
+        existing = repository.get_user_by_username(db, profile.username)
         if existing:
             raise HTTPException(status_code=400, detail="Username already exists")
         user.username = profile.username
@@ -119,7 +121,7 @@ def get_account(
     current_user: User = Depends(get_current_user)
 ):
     """Get user account settings"""
-    user = db.query(User).filter(User.username == username).first()
+    user = repository.get_user_by_username(db, username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -138,7 +140,7 @@ def update_account(
     current_user: User = Depends(get_current_user)
 ):
     """Update user account settings"""
-    user = db.query(User).filter(User.username == username).first()
+    user = repository.get_user_by_username(db, username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -170,7 +172,7 @@ def get_notifications(
     current_user: User = Depends(get_current_user)
 ):
     """Get user notification settings"""
-    user = db.query(User).filter(User.username == username).first()
+    user = repository.get_user_by_username(db, username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -191,7 +193,7 @@ def update_notifications(
     current_user: User = Depends(get_current_user)
 ):
     """Update user notification settings"""
-    user = db.query(User).filter(User.username == username).first()
+    user = repository.get_user_by_username(db, username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -232,7 +234,7 @@ def change_password(
     """Change user password"""
     from app.core.security import verify_password
     
-    user = db.query(User).filter(User.username == username).first()
+    user = repository.get_user_by_username(db, username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
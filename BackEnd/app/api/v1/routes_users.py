@@ -1,11 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.db.query_budget import query_budget
 from app.db.session import get_db
 from app.db.models import User
+from app.db import repository
 from app.core.security import get_password_hash
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.post("/", status_code=201)
@@ -18,7 +22,7 @@ def create_user(payload: dict, db: Session = Depends(get_db)):
     if not username or not password:
         raise HTTPException(status_code=400, detail="username and password are required")
 
-    existing = db.query(User).filter(User.username == username).first()
+    existing = repository.get_user_by_username(db, username)
     if existing:
         raise HTTPException(status_code=400, detail="username already exists")
 
@@ -31,7 +35,7 @@ def create_user(payload: dict, db: Session = Depends(get_db)):
     return {"status": "success", "user": {"id": user.id, "username": user.username, "role": user.role}}
 
 
-@router.get("/")
+@router.get("/", dependencies=[Depends(query_budget(settings.LIST_STATEMENT_TIMEOUT_MS, settings.LIST_MAX_ROWS))])
 def list_users(db: Session = Depends(get_db)):
     users = db.query(User).all()
     result = [{"id": u.id, "username": u.username, "role": u.role} for u in users]
@@ -40,7 +44,7 @@ def list_users(db: Session = Depends(get_db)):
 
 @router.get("/{user_id}")
 def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = repository.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return {"id": user.id, "username": user.username, "role": user.role}
@@ -48,7 +52,7 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
 
 @router.put("/{user_id}")
 def update_user(user_id: int, payload: dict, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = repository.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -68,7 +72,7 @@ def update_user(user_id: int, payload: dict, db: Session = Depends(get_db)):
 
 @router.delete("/{user_id}")
 def delete_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = repository.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -1,9 +1,11 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Farm Traceability System"
     DATABASE_URL: str
+    # Optional read replica; safe GET handlers read from it when set
+    REPLICA_DATABASE_URL: Optional[str] = None
     SECRET_KEY: str
     DEBUG: bool = True
     
@@ -11,6 +13,92 @@ class Settings(BaseSettings):
     GOOGLE_CLIENT_ID: Optional[str] = None
     GOOGLE_CLIENT_SECRET: Optional[str] = None
 
+    # Startup check of the Alembic revision (the schema is created by
+    # `python -m app.db.init_db`, never on boot): strict refuses to start on a
+    # mismatch, warn logs it, off skips the query
+    SCHEMA_CHECK_MODE: Literal["strict", "warn", "off"] = "strict"
+
+    # reportlab, qrcode and google-auth load on first use; prewarming imports
+    # them in a background thread after startup. Disable for short-lived
+    # workers that may never render a report
+    PREWARM_IMPORTS: bool = True
+
+    # Database connection pool settings (per worker process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 disables recycling
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a connection checkout
+    # Connections all `python -m app.serve` workers may open to one database.
+    # When set, each worker's DB_POOL_SIZE/DB_MAX_OVERFLOW are derived from it
+    # (keeping their ratio); when unset they apply per worker as above
+    DB_MAX_CONNECTIONS: Optional[int] = None
+
+    # Production server (`python -m app.serve`): WEB_WORKERS=0 runs 2 x CPUs + 1
+    # workers. A worker is replaced after WORKER_MAX_REQUESTS requests (plus up
+    # to WORKER_MAX_REQUESTS_JITTER, so they do not restart together) and gets
+    # WORKER_GRACEFUL_TIMEOUT seconds to finish its requests on shutdown
+    WEB_HOST: str = "0.0.0.0"
+    WEB_PORT: int = 8000
+    WEB_WORKERS: int = 0
+    WORKER_MAX_REQUESTS: int = 10000
+    WORKER_MAX_REQUESTS_JITTER: int = 1000
+    WORKER_TIMEOUT: int = 120
+    WORKER_GRACEFUL_TIMEOUT: int = 30
+
+    # Seconds a list endpoint total is reused when total_mode=cached
+    TOTALS_CACHE_TTL: int = 60
+
+    # Monthly events partitions kept ready ahead of the current month (PostgreSQL)
+    EVENT_PARTITION_MONTHS_AHEAD: int = 3
+
+    # Events older than the hot window are moved to Parquet files under EVENT_ARCHIVE_DIR
+    EVENT_HOT_WINDOW_DAYS: int = 730
+    EVENT_ARCHIVE_DIR: str = "archive/events"
+
+    # gzip/brotli response compression for bodies of at least COMPRESSION_MIN_SIZE
+    # bytes. GET responses under COMPRESSION_CACHE_PATHS (public reference data)
+    # are kept compressed per URL and encoding for COMPRESSION_CACHE_TTL seconds
+    # and replayed without running the route (0 disables the cache). Entries are
+    # keyed on the table_versions of COMPRESSION_CACHE_TABLES, the tables those
+    # responses are built from, so a write to them takes effect immediately
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_CACHE_PATHS: List[str] = ["/api/v1/breeds/", "/api/v1/animals/breeds"]
+    COMPRESSION_CACHE_TABLES: List[str] = ["animal_breeds"]
+    COMPRESSION_CACHE_TTL: int = 300
+
+    # ETags and conditional GETs on catalog and detail routes (app.utils.conditional),
+    # derived from the table_versions counters. Cache-Control per policy, and per
+    # route in CACHE_CONTROL_ROUTES ({"/api/v1/animals/{animal_id}": "no-store"})
+    CONDITIONAL_GET_ENABLED: bool = True
+    CACHE_CONTROL_CATALOG: str = "public, max-age=60"
+    CACHE_CONTROL_DETAIL: str = "private, no-cache"
+    CACHE_CONTROL_ROUTES: Dict[str, str] = {}
+
+    # Per-request SQL statement counting (X-DB-Query-Count / X-DB-Time-Ms headers).
+    # A statement shape repeated more than N_PLUS_ONE_THRESHOLD times in one
+    # request is logged (warn), turned into a 500 (fail) or only counted (off)
+    QUERY_STATS_ENABLED: bool = True
+    N_PLUS_ONE_THRESHOLD: int = 10
+    N_PLUS_ONE_MODE: Literal["off", "warn", "fail"] = "warn"
+
+    # Opt-in slow-query log: statements slower than the threshold are kept in a
+    # ring buffer; a sampled share of slow SELECTs gets EXPLAIN (ANALYZE, BUFFERS),
+    # which runs the statement a second time
+    SLOW_QUERY_LOG_ENABLED: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_LOG_SIZE: int = 200
+
+    # Per-route database budgets (see app.db.query_budget): statement timeout
+    # applied with SET LOCAL on PostgreSQL, and the ORM rows one request may load
+    QUERY_BUDGETS_ENABLED: bool = True
+    REPORT_STATEMENT_TIMEOUT_MS: int = 30000
+    REPORT_MAX_ROWS: int = 50000
+    LIST_STATEMENT_TIMEOUT_MS: int = 10000
+    LIST_MAX_ROWS: int = 20000
+
     class Config:
         env_file = ".env"
 
@@ -12,6 +12,7 @@ from app.core.config import settings
 from app.core.security import SECRET_KEY, ALGORITHM
 from app.db.session import get_db
 from app.db.models import User
+from app.db import repository
 
 security = HTTPBearer()
 
@@ -39,7 +40,7 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
+    user = repository.get_user_by_username(db, username)
     if user is None:
         raise credentials_exception
     
@@ -64,7 +65,7 @@ def get_current_user_optional(
         if username is None:
             return None
         
-        user = db.query(User).filter(User.username == username).first()
+        user = repository.get_user_by_username(db, username)
         return user
     except JWTError:
         return None
@@ -0,0 +1,346 @@
+"""
+ASGI middleware.
+"""
+import json
+import logging
+import threading
+import time
+import zlib
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+from app.db.query_stats import route_query_stats, start_request
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+def route_template(scope) -> str:
+    """
+    The matched route's path with its parameters as placeholders, e.g.
+    ``/api/v1/animals/{animal_id}``, so statistics don't grow per id.
+    """
+    if "route" not in scope:
+        return "<unmatched>"
+    params = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    return "/".join(
+        f"{{{params[segment]}}}" if segment in params else segment
+        for segment in scope["path"].split("/")
+    )
+
+
+class QueryCountMiddleware:
+    """
+    Count the SQL statements and database time of every HTTP request.
+
+    Adds ``X-DB-Query-Count`` and ``X-DB-Time-Ms`` response headers and
+    records per-route totals. When one statement shape runs more than
+    N_PLUS_ONE_THRESHOLD times in a request, ``N_PLUS_ONE_MODE`` decides what
+    happens: ``warn`` logs it, ``fail`` replaces the response with a 500
+    listing the repeated statements (for development and CI), and ``off``
+    only counts.
+    """
+
+    def __init__(self, app, threshold: int = None, mode: str = None):
+        self.app = app
+        self.threshold = settings.N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+        self.mode = settings.N_PLUS_ONE_MODE if mode is None else mode
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        def route_name() -> str:
+            return f"{scope['method']} {route_template(scope)}"
+
+        queries = start_request(route_name)
+        state = {"repeated": [], "replaced": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # The handler has finished by now; later statements (background tasks) are not in the headers
+                if self.mode != "off":
+                    state["repeated"] = queries.repeated(self.threshold)
+                if state["repeated"] and self.mode == "fail":
+                    state["replaced"] = True
+                    body = json.dumps({
+                        "detail": f"N+1 query pattern: a statement ran more than {self.threshold} times",
+                        "route": route_name(),
+                        "repeated": state["repeated"],
+                    }).encode()
+                    await send({
+                        "type": "http.response.start",
+                        "status": 500,
+                        "headers": [
+                            (b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode()),
+                            (b"x-db-query-count", str(queries.count).encode()),
+                            (b"x-db-time-ms", f"{queries.total_ms:.1f}".encode()),
+                        ],
+                    })
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(queries.count).encode()))
+                headers.append((b"x-db-time-ms", f"{queries.total_ms:.1f}".encode()))
+                message = {**message, "headers": headers}
+            elif state["replaced"]:
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = route_name()
+            if state["repeated"] and self.mode == "warn":
+                worst = state["repeated"][0]
+                logger.warning(
+                    f"Possible N+1 on {route}: {worst['count']} executions of "
+                    f"{worst['statement'][:200]} ({queries.count} queries total)"
+                )
+            route_query_stats.record(route, queries, state["repeated"])
+
+
+# Content types worth compressing; images, PDFs and archives already are
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+# (brotli quality, gzip level): per-request compression must stay cheap, cached
+# bodies are compressed once and served many times
+DYNAMIC_LEVELS = (4, 6)
+CACHED_LEVELS = (9, 9)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """The accepted encoding with the highest q-value, br (if available) before gzip on ties, else None."""
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        offered[coding.strip()] = quality
+    best, best_quality = None, 0.0
+    for coding in (("br", "gzip") if brotli else ("gzip",)):
+        quality = offered.get(coding, offered.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of the compressed representation: ``"abc"`` becomes ``"abc-br"``."""
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else etag
+
+
+def etag_matches(if_none_match: str, etag: str) -> Optional[str]:
+    """The tag in If-None-Match naming ``etag`` in any content coding (weak comparison), else None."""
+    variants = {etag, *(encoded_etag(etag, coding) for coding in ("br", "gzip"))}
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag in variants:
+            return tag
+    return None
+
+
+# Headers a 304 repeats from the response it stands for
+NOT_MODIFIED_HEADERS = (b"etag", b"cache-control", b"last-modified", b"vary")
+
+
+class Compressor:
+    """Incremental gzip or brotli encoder; ``compress`` flushes so streamed chunks reach the client."""
+
+    def __init__(self, encoding: str, levels: Tuple[int, int] = DYNAMIC_LEVELS):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=levels[0])
+        else:
+            self._zlib = zlib.compressobj(levels[1], zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressedResponseCache:
+    """Compressed bodies of reference-data responses per (path, query, encoding), for a TTL."""
+
+    MAX_ENTRIES = 256
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[float, int, List, bytes]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[int, List, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1:]
+            self.misses += 1
+        return None
+
+    def put(self, key: Hashable, status: int, headers: List, body: bytes, ttl: float):
+        with self._lock:
+            if len(self._entries) >= self.MAX_ENTRIES:
+                # Drop expired entries first, then the oldest ones
+                now = time.monotonic()
+                for k in [k for k, entry in self._entries.items() if entry[0] <= now]:
+                    del self._entries[k]
+                while len(self._entries) >= self.MAX_ENTRIES:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic() + ttl, status, headers, body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(len(entry[3]) for entry in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+compressed_cache = CompressedResponseCache()
+
+
+class CompressionMiddleware:
+    """
+    Content-negotiated gzip/brotli compression of response bodies.
+
+    Bodies of at least ``minimum_size`` bytes with a compressible content
+    type are encoded with the best coding in Accept-Encoding; streamed
+    bodies are compressed chunk by chunk. Every response with a compressible
+    content type carries ``Vary: Accept-Encoding``, encoded or not. GET
+    responses under ``cached_paths`` (reference data that rarely changes)
+    are compressed once at a higher level and replayed from
+    ``compressed_cache`` for ``cache_ttl`` seconds without running the
+    route, or answered with a 304 when If-None-Match names the cached ETag.
+    Only list public data there: a cached body is served to every client.
+
+    ``cache_versions`` returns the current versions of the data behind the
+    cached paths; they are part of the cache key, so a write replaces the
+    cached bodies at once instead of after the TTL.
+    """
+
+    def __init__(
+        self, app, minimum_size: int = None, cached_paths: Sequence[str] = None, cache_ttl: int = None,
+        cache_versions: Optional[Callable[[], Awaitable[Hashable]]] = None,
+    ):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.cached_paths = tuple(settings.COMPRESSION_CACHE_PATHS if cached_paths is None else cached_paths)
+        self.cache_ttl = settings.COMPRESSION_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.cache_versions = cache_versions
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+
+        cache_key = None
+        if (
+            encoding is not None and self.cache_ttl > 0
+            and scope["method"] == "GET" and scope["path"].startswith(self.cached_paths)
+        ):
+            versions = await self.cache_versions() if self.cache_versions else None
+            cache_key = (scope["path"], scope["query_string"], encoding, versions)
+            cached = compressed_cache.get(cache_key)
+            if cached:
+                status, headers, body = cached
+                etag = Headers(raw=headers).get("etag")
+                if_none_match = request_headers.get("if-none-match")
+                if etag and if_none_match and etag_matches(if_none_match, etag):
+                    await send({
+                        "type": "http.response.start",
+                        "status": 304,
+                        "headers": [(k, v) for k, v in headers if k in NOT_MODIFIED_HEADERS],
+                    })
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+                await send({"type": "http.response.start", "status": status, "headers": headers})
+                await send({"type": "http.response.body", "body": body})
+                return
+
+        start = None
+        compressor = None
+
+        async def send_wrapper(message):
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                # Held until the first body chunk shows whether it is worth compressing
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                held, start = start, None
+                headers = MutableHeaders(raw=list(held.get("headers", [])))
+                if not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES):
+                    await send(held)
+                    await send(message)
+                    return
+                # Whether this body is encoded depends on Accept-Encoding, whichever way it goes
+                headers.add_vary_header("Accept-Encoding")
+                if (
+                    encoding is None
+                    or "content-encoding" in headers
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    await send({**held, "headers": headers.raw})
+                    await send(message)
+                    return
+                headers["content-encoding"] = encoding
+                if "etag" in headers:
+                    # A strong ETag names one representation; the compressed one gets its own
+                    headers["etag"] = encoded_etag(headers["etag"], encoding)
+                cacheable = cache_key is not None and held["status"] == 200 and not more_body
+                compressor = Compressor(encoding, CACHED_LEVELS if cacheable else DYNAMIC_LEVELS)
+                if more_body:
+                    del headers["content-length"]
+                    body = compressor.compress(body)
+                else:
+                    body = compressor.finish(body)
+                    headers["content-length"] = str(len(body))
+                if cacheable:
+                    compressed_cache.put(cache_key, held["status"], headers.raw, body, self.cache_ttl)
+                await send({**held, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            if compressor is None:
+                await send(message)
+                return
+            body = compressor.compress(body) if more_body else compressor.finish(body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,90 @@
+"""
+orjson responses, the application default.
+
+FastAPI passes every result of a route without a response_model through
+``jsonable_encoder`` (a recursive pure-Python copy of the whole payload)
+before ``json.dumps``; on the 10,000-row breed list that copy alone takes
+longer than the query. Routes of an ``APIRouter(route_class=FastJSONRoute)``
+hand their dicts and lists straight to orjson instead, which serializes
+datetimes, dates, UUIDs and enums natively (ISO 8601, as before). Routes
+with a response_model keep FastAPI's pydantic serialization.
+``python -m benchmarks.serialization`` compares both paths.
+"""
+import functools
+import inspect
+from decimal import Decimal
+from typing import Any, Callable
+
+import orjson
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+
+
+def _default(value: Any) -> Any:
+    """Types orjson does not know: Decimal as a number, anything else as jsonable_encoder did."""
+    if isinstance(value, Decimal):
+        return float(value)
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# Keyword the wrapper receives FastAPI's per-request Response under
+_RESPONSE_PARAM = "_fastjson_response"
+
+
+def _respond_with(endpoint: Callable, status_code: int) -> Callable:
+    """
+    Wrap an endpoint so plain results become a FastJSONResponse.
+
+    The wrapper has the endpoint's signature plus the injected Response, so
+    headers and a status code set on it by dependencies (ETags, for one)
+    reach the response, as they do on FastAPI's own path.
+    """
+
+    def respond(result, response: Response):
+        if isinstance(result, Response):
+            return result
+        json_response = FastJSONResponse(result, status_code=response.status_code or status_code)
+        json_response.headers.raw.extend(response.headers.raw)
+        return json_response
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(**kwargs):
+            response = kwargs.pop(_RESPONSE_PARAM)
+            return respond(await endpoint(**kwargs), response)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(**kwargs):
+            response = kwargs.pop(_RESPONSE_PARAM)
+            return respond(endpoint(**kwargs), response)
+
+    signature = inspect.signature(endpoint)
+    wrapper.__signature__ = signature.replace(parameters=[
+        *signature.parameters.values(),
+        inspect.Parameter(_RESPONSE_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Response),
+    ])
+    return wrapper
+
+
+class FastJSONRoute(APIRoute):
+    """APIRoute that skips jsonable_encoder for routes without a response model."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        response_model = kwargs.get("response_model")
+        if (
+            (response_model is None or isinstance(response_model, DefaultPlaceholder))
+            and inspect.signature(endpoint).return_annotation is inspect.Signature.empty
+        ):
+            endpoint = _respond_with(endpoint, kwargs.get("status_code") or 200)
+        super().__init__(path, endpoint, **kwargs)
@@ -4,9 +4,10 @@ from passlib.context import CryptContext
 from app.core.config import settings
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.db import models
+from app.db.session import get_async_db, get_db
+from app.db import repository
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
@@ -47,7 +48,7 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(models.User).filter(models.User.username == username).first()
+    user = repository.get_user_by_username(db, username)
     if user is None:
         raise credentials_exception
     
@@ -55,7 +56,7 @@ def get_current_user(
 
 async def get_current_user_optional(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current user from JWT token in header or query param (for PDF downloads)"""
     token = None
@@ -90,7 +91,7 @@ async def get_current_user_optional(
             detail="Could not validate credentials"
         )
     
-    user = db.query(models.User).filter(models.User.username == username).first()
+    user = await repository.get_user_by_username_async(db, username)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,56 @@
+"""
+Background import of the heavy optional dependencies.
+
+reportlab (PDF reports), qrcode/PIL (QR codes) and google-auth (Google
+sign-in) are imported where they are used, so ``import app.main`` does not
+pay for them. With PREWARM_IMPORTS enabled, a daemon thread imports them
+after startup, so the first report or Google login of a long-lived worker
+does not wait for the import either. ``python -m benchmarks.imports``
+checks that none of them is loaded by ``import app.main``.
+"""
+import importlib
+import logging
+import threading
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Imported on first use by app.utils.pdf_generator, app.utils.qr_generator and routes_auth
+HEAVY_MODULES = (
+    "reportlab.platypus",
+    "reportlab.lib.styles",
+    "qrcode",
+    "qrcode.image.pil",
+    "google.oauth2.id_token",
+    "google.auth.transport.requests",
+)
+
+
+def import_heavy_modules() -> Dict[str, float]:
+    """Import HEAVY_MODULES; returns the milliseconds each took (already loaded ones cost ~0)."""
+    timings = {}
+    for name in HEAVY_MODULES:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.warning(f"Could not prewarm {name}: {e}")
+            continue
+        timings[name] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def _prewarm():
+    started = time.perf_counter()
+    timings = import_heavy_modules()
+    logger.info(
+        f"Prewarmed {len(timings)} heavy modules in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+
+
+def prewarm_imports() -> threading.Thread:
+    """Import HEAVY_MODULES in a daemon thread; startup does not wait for it."""
+    thread = threading.Thread(target=_prewarm, name="prewarm-imports", daemon=True)
+    thread.start()
+    return thread
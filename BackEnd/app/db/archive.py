@@ -0,0 +1,322 @@
+"""
+Cold-storage archival of aged events.
+
+Whole months older than EVENT_HOT_WINDOW_DAYS are written to zstd-compressed
+Parquet files under EVENT_ARCHIVE_DIR (``month=YYYY-MM/events-NNN.parquet``),
+recorded in the event_archives manifest and removed from the events table.
+On a partitioned table an archived month's partition is detached and
+dropped instead of deleting rows.
+
+Rows inside a file are sorted by (animal_id, timestamp), so per-animal reads
+only touch the row groups whose statistics cover that animal; the manifest's
+animal_id range skips whole files.
+
+The daily rollups keep counting archived events. Reconcile and backfill leave
+archived days alone.
+
+Run with:
+    python -m app.db.archive run [--older-than-days 730] [--dry-run]
+    python -m app.db.archive list
+    python -m app.db.archive verify
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, inspect, select, text
+
+from app.core.config import settings
+from app.db.models import Event, EventArchive
+from app.db.partitions import add_months, is_partitioned, month_start, partition_name
+from app.db.table_versions import EVENT_TYPES, bump_versions
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = [
+    "id", "event_type", "actor_id", "facility_id", "timestamp",
+    "event_metadata", "is_valid", "anomaly_reason", "animal_id",
+]
+BATCH_SIZE = 50000
+
+
+class ArchiveError(Exception):
+    """The events removed from the database don't match what was written to the archive."""
+
+
+def archive_root() -> Path:
+    return Path(settings.EVENT_ARCHIVE_DIR)
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.int64()),
+        ("event_type", pa.string()),
+        ("actor_id", pa.int64()),
+        ("facility_id", pa.int64()),
+        ("timestamp", pa.timestamp("us")),
+        ("event_metadata", pa.string()),  # JSON text
+        ("is_valid", pa.bool_()),
+        ("anomaly_reason", pa.string()),
+        ("animal_id", pa.int64()),
+    ])
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_parquet(rows: Iterable, path: Path) -> Dict:
+    """Stream result rows into a Parquet file and return the manifest statistics."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _schema()
+    stats = {"row_count": 0, "min_timestamp": None, "max_timestamp": None,
+             "min_animal_id": None, "max_animal_id": None}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        batch = []
+        for row in rows:
+            values = dict(zip(ARCHIVE_COLUMNS, row))
+            if values["event_metadata"] is not None:
+                values["event_metadata"] = json.dumps(values["event_metadata"])
+            batch.append(values)
+            ts, animal_id = values["timestamp"], values["animal_id"]
+            stats["min_timestamp"] = ts if stats["min_timestamp"] is None else min(stats["min_timestamp"], ts)
+            stats["max_timestamp"] = ts if stats["max_timestamp"] is None else max(stats["max_timestamp"], ts)
+            stats["min_animal_id"] = animal_id if stats["min_animal_id"] is None else min(stats["min_animal_id"], animal_id)
+            stats["max_animal_id"] = animal_id if stats["max_animal_id"] is None else max(stats["max_animal_id"], animal_id)
+            if len(batch) >= BATCH_SIZE:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                stats["row_count"] += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            stats["row_count"] += len(batch)
+    return stats
+
+
+def months_to_archive(conn, cutoff: date) -> List[date]:
+    """Months that lie entirely before ``cutoff`` (a month start) and still hold events."""
+    oldest = conn.execute(
+        select(func.min(Event.timestamp)).where(Event.timestamp < datetime.combine(cutoff, datetime.min.time()))
+    ).scalar()
+    if oldest is None:
+        return []
+    months, month = [], month_start(oldest)
+    while month < cutoff:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def _partition_exists(conn, month: date) -> bool:
+    return conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": partition_name(month)}).scalar()
+
+
+def archive_month(engine, month: date, lock_timeout: str = "5s") -> Optional[Dict]:
+    """
+    Move one month of events into a new Parquet part.
+
+    The export, manifest insert and removal run in one transaction; the file
+    is renamed into place only once the removed row count matches the
+    exported one, and the transaction is rolled back otherwise.
+    """
+    start = datetime.combine(month, datetime.min.time())
+    end = datetime.combine(add_months(month, 1), datetime.min.time())
+    columns = [getattr(Event, c) for c in ARCHIVE_COLUMNS]
+
+    with engine.connect() as conn, conn.begin():
+        part = (conn.execute(
+            select(func.max(EventArchive.part)).where(EventArchive.month == month)
+        ).scalar() or 0) + 1
+        relative = Path(f"month={month:%Y-%m}") / f"events-{part:03d}.parquet"
+        final_path = archive_root() / relative
+        tmp_path = final_path.with_suffix(".parquet.tmp")
+
+        rows = conn.execute(
+            select(*columns)
+            .where(Event.timestamp >= start, Event.timestamp < end)
+            .order_by(Event.animal_id, Event.timestamp, Event.id)
+            .execution_options(stream_results=True, yield_per=BATCH_SIZE)
+        )
+        stats = _write_parquet(rows, tmp_path)
+        if stats["row_count"] == 0:
+            tmp_path.unlink(missing_ok=True)
+            return None
+
+        try:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text(f"SET LOCAL lock_timeout = '{lock_timeout}'"))
+            if is_partitioned(conn) and _partition_exists(conn, month):
+                # The month's rows can only live in its own partition; drop it whole
+                name = partition_name(month)
+                conn.execute(text(f"ALTER TABLE events DETACH PARTITION {name}"))
+                removed = conn.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+                conn.execute(text(f"DROP TABLE {name}"))
+            else:
+                removed = conn.execute(
+                    Event.__table__.delete().where(Event.timestamp >= start, Event.timestamp < end)
+                ).rowcount
+            if removed != stats["row_count"]:
+                raise ArchiveError(
+                    f"{month:%Y-%m}: exported {stats['row_count']} events but {removed} would be removed"
+                )
+            # The month may have held the last events of a type
+            bump_versions(conn, [EVENT_TYPES])
+
+            conn.execute(EventArchive.__table__.insert().values(
+                month=month,
+                part=part,
+                path=relative.as_posix(),
+                row_count=stats["row_count"],
+                min_timestamp=stats["min_timestamp"],
+                max_timestamp=stats["max_timestamp"],
+                min_animal_id=stats["min_animal_id"],
+                max_animal_id=stats["max_animal_id"],
+                size_bytes=tmp_path.stat().st_size,
+                sha256=_sha256(tmp_path),
+                created_at=datetime.utcnow(),
+            ))
+            os.replace(tmp_path, final_path)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    logger.info(f"Archived {stats['row_count']} events for {month:%Y-%m} to {final_path}")
+    return {"month": month.isoformat(), "part": part, "path": relative.as_posix(), "row_count": stats["row_count"]}
+
+
+def archive_events(engine, older_than_days: int = None, dry_run: bool = False) -> List[Dict]:
+    """Archive every whole month that ended before the hot window."""
+    if older_than_days is None:
+        older_than_days = settings.EVENT_HOT_WINDOW_DAYS
+    cutoff = month_start(datetime.utcnow() - timedelta(days=older_than_days))
+    with engine.connect() as conn:
+        months = months_to_archive(conn, cutoff)
+    if dry_run:
+        return [{"month": m.isoformat()} for m in months]
+    results = []
+    for month in months:
+        result = archive_month(engine, month)
+        if result:
+            results.append(result)
+    return results
+
+
+def archived_through(conn) -> Optional[date]:
+    """
+    First day after the newest archived month, or None when nothing is archived
+    (or event_archives does not exist yet, as during earlier migrations).
+    """
+    if not inspect(conn).has_table(EventArchive.__tablename__):
+        return None
+    newest = conn.execute(select(func.max(EventArchive.month))).scalar()
+    return add_months(newest, 1) if newest else None
+
+
+def archive_files_query(animal_id: int):
+    """Manifest paths whose animal_id range covers ``animal_id``, oldest first."""
+    return (
+        select(EventArchive.path)
+        .where(EventArchive.min_animal_id <= animal_id, EventArchive.max_animal_id >= animal_id)
+        .order_by(EventArchive.month, EventArchive.part)
+    )
+
+
+def read_archived_events(paths: Iterable[str], animal_id: int, event_type: Optional[str] = None) -> List[Dict]:
+    """
+    Read one animal's archived events from the given manifest paths.
+
+    Blocking file IO; async callers should run it in the threadpool. Rows
+    come back as dicts keyed like Event attributes, with ``archived`` set.
+    """
+    import pyarrow.parquet as pq
+
+    filters = [("animal_id", "=", animal_id)]
+    if event_type:
+        filters.append(("event_type", "=", event_type))
+
+    events = []
+    for path in paths:
+        table = pq.read_table(archive_root() / path, filters=filters)
+        for row in table.to_pylist():
+            if row["event_metadata"] is not None:
+                row["event_metadata"] = json.loads(row["event_metadata"])
+            row["archived"] = True
+            events.append(row)
+    return events
+
+
+def load_archived_events(db, animal_id: int, event_type: Optional[str] = None) -> List[Dict]:
+    """Sync Session convenience wrapper around read_archived_events()."""
+    paths = db.execute(archive_files_query(animal_id)).scalars().all()
+    if not paths:
+        return []
+    return read_archived_events(paths, animal_id, event_type)
+
+
+def verify_archives(conn) -> List[str]:
+    """Check every manifest entry against its file; returns a list of problems."""
+    import pyarrow.parquet as pq
+
+    problems = []
+    for entry in conn.execute(select(EventArchive).order_by(EventArchive.month, EventArchive.part)):
+        path = archive_root() / entry.path
+        if not path.exists():
+            problems.append(f"{entry.path}: missing")
+            continue
+        if entry.sha256 and _sha256(path) != entry.sha256:
+            problems.append(f"{entry.path}: checksum mismatch")
+        rows = pq.ParquetFile(path).metadata.num_rows
+        if rows != entry.row_count:
+            problems.append(f"{entry.path}: {rows} rows, manifest says {entry.row_count}")
+    return problems
+
+
+def main():
+    from app.db.session import engine
+
+    parser = argparse.ArgumentParser(description="Archive aged events to Parquet files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="Archive whole months older than the hot window")
+    run.add_argument("--older-than-days", type=int, default=settings.EVENT_HOT_WINDOW_DAYS)
+    run.add_argument("--dry-run", action="store_true", help="Only list the months that would be archived")
+    sub.add_parser("list", help="List archived files")
+    sub.add_parser("verify", help="Check archived files against the manifest")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = archive_events(engine, args.older_than_days, dry_run=args.dry_run)
+        if not results:
+            print("Nothing to archive")
+        for r in results:
+            if args.dry_run:
+                print(f"Would archive {r['month'][:7]}")
+            else:
+                print(f"Archived {r['row_count']} events for {r['month'][:7]} -> {r['path']}")
+    elif args.command == "list":
+        with engine.connect() as conn:
+            for entry in conn.execute(select(EventArchive).order_by(EventArchive.month, EventArchive.part)):
+                print(f"{entry.month:%Y-%m} part {entry.part}: {entry.row_count} events, {entry.size_bytes} bytes ({entry.path})")
+    elif args.command == "verify":
+        with engine.connect() as conn:
+            problems = verify_archives(conn)
+        for problem in problems:
+            print(problem)
+        print("All archives OK" if not problems else f"{len(problems)} problem(s) found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+COPY helpers for bulk loads on PostgreSQL.
+
+Rows are encoded as UTF-8 CSV with ``\\N`` marking NULL, so empty strings
+survive as empty strings. Works with psycopg2 and psycopg 3 connections.
+"""
+import csv
+import io
+import json
+from typing import Iterable, Sequence
+
+NULL_MARKER = "\\N"
+
+
+def csv_buffer(rows: Iterable[Sequence], json_positions: Sequence[int] = ()) -> io.BytesIO:
+    """Encode rows for COPY .. FROM STDIN (FORMAT csv); values at ``json_positions`` are JSON-encoded."""
+    text_buffer = io.StringIO()
+    writer = csv.writer(text_buffer)
+    for row in rows:
+        fields = [NULL_MARKER if v is None else v for v in row]
+        for i in json_positions:
+            if row[i] is not None:
+                fields[i] = json.dumps(row[i])
+        writer.writerow(fields)
+    # Sent as UTF-8 bytes whatever the connection's client_encoding is
+    return io.BytesIO(text_buffer.getvalue().encode("utf-8"))
+
+
+def copy_rows(dbapi_conn, table: str, columns: Sequence[str], rows: Iterable[Sequence],
+              json_columns: Sequence[str] = ()):
+    """COPY ``rows`` (tuples in ``columns`` order) into ``table`` on a raw DBAPI connection."""
+    buffer = csv_buffer(rows, [columns.index(c) for c in json_columns])
+    sql = (
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN "
+        f"WITH (FORMAT csv, NULL '{NULL_MARKER}', ENCODING 'UTF8')"
+    )
+    cursor = dbapi_conn.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
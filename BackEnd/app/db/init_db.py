@@ -1,10 +1,90 @@
+"""
+Create or upgrade the database schema.
+
+Run once per deploy (the container runs it before starting the server), not
+on every worker start:
+    python -m app.db.init_db
+
+An empty database gets every table, partition and the current Alembic head
+stamped. A database that is already stamped is upgraded with the Alembic
+migrations (``alembic upgrade head``); tables are never created behind
+Alembic's back there, so later migrations find the schema they expect. A
+database with tables but no Alembic revision is left alone and the command
+fails with instructions.
+"""
+import sys
+
+from sqlalchemy import inspect, text
 from app.db.session import engine
 from app.db.base import Base
+from app.db import models  # noqa: F401  (registers the tables on Base.metadata)
+from app.db.partitions import convert_events_table, ensure_future_partitions
+from app.db.rollups import backfill_if_empty
+from app.db.schema_check import ALEMBIC_DIR, current_revisions, expected_revisions, script_directory
 
-def init_db():
+def alembic_config():
+    """Alembic configuration for this app's database (alembic.ini points at the compose host)."""
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_DIR.parent / "alembic.ini"))
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    # ConfigParser interpolation: a literal % in the password must be doubled
+    config.set_main_option("sqlalchemy.url", engine.url.render_as_string(hide_password=False).replace("%", "%%"))
+    return config
+
+def stamp_head(conn):
+    """Record the Alembic head revision as applied."""
+    from alembic.runtime.migration import MigrationContext
+
+    MigrationContext.configure(conn).stamp(script_directory(), "heads")
+
+def create_schema():
+    """Create every table of an empty database and stamp the Alembic head."""
     print("Creating all tables...")
+    if engine.dialect.name == "postgresql":
+        # Trigram search indexes need the pg_trgm extension
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     Base.metadata.create_all(bind=engine)
-    print("All tables created successfully!")
+    if engine.dialect.name == "postgresql":
+        # The new events table is empty; partition it right away
+        with engine.begin() as conn:
+            convert_events_table(conn)
+    with engine.begin() as conn:
+        stamp_head(conn)
+    print(f"Stamped Alembic revision {', '.join(expected_revisions())}")
+
+def upgrade_schema(current):
+    """Apply the migrations between the stamped revision and the head."""
+    from alembic import command
+
+    expected = expected_revisions()
+    if current == expected:
+        print(f"Schema is at the Alembic head {', '.join(expected)}")
+        return
+    print(f"Upgrading schema from {', '.join(current)} to {', '.join(expected)}...")
+    command.upgrade(alembic_config(), "heads")
+
+def init_db():
+    with engine.connect() as conn:
+        empty_database = not inspect(conn).get_table_names()
+    if empty_database:
+        create_schema()
+    else:
+        current = current_revisions(engine)
+        if not current:
+            sys.exit(
+                "The database has tables but no Alembic revision. Find the revision its schema matches, "
+                "record it with `alembic stamp <revision>`, then rerun `python -m app.db.init_db` "
+                "(or `alembic upgrade head`)."
+            )
+        upgrade_schema(current)
+    if engine.dialect.name == "postgresql":
+        ensure_future_partitions(engine)
+    with engine.begin() as conn:
+        if backfill_if_empty(conn):
+            print("Backfilled event_daily_rollups from existing events")
+    print("Database schema is ready")
 
 if __name__ == "__main__":
     init_db()
@@ -1,8 +1,16 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Float, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Boolean, Float, Text, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 from datetime import datetime
 
+
+def trigram_index(name, column):
+    """GIN trigram index backing ``ilike '%term%'`` searches (PostgreSQL + pg_trgm only)."""
+    return Index(
+        name, column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}
+    ).ddl_if(dialect="postgresql")
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
@@ -36,6 +44,12 @@ class Facility(Base):
     location = Column(String)
     facility_type = Column(String)  # farm, processor, retailer
 
+    __table_args__ = (
+        Index("ix_facilities_facility_type", "facility_type"),
+        trigram_index("ix_facilities_name_trgm", "name"),
+        trigram_index("ix_facilities_location_trgm", "location"),
+    )
+
 class Animal(Base):
     __tablename__ = "animals"
     id = Column(Integer, primary_key=True, index=True)
@@ -52,6 +66,15 @@ class Animal(Base):
     breed = relationship("AnimalBreed")
     events = relationship("Event", back_populates="animal", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_animals_facility_id", "facility_id"),
+        Index("ix_animals_owner_id", "owner_id"),
+        Index("ix_animals_species", "species"),
+        trigram_index("ix_animals_name_trgm", "name"),
+        trigram_index("ix_animals_tag_id_trgm", "tag_id"),
+        trigram_index("ix_animals_species_trgm", "species"),
+    )
+
 class AnimalBreed(Base):
     __tablename__ = "animal_breeds"
 
@@ -64,6 +87,18 @@ class AnimalBreed(Base):
     description = Column(Text)
     transboundary_name = Column(String(200))
     other_name = Column(String(500))  # Increased to handle longer alternative names
+    # md5 of the catalog fields; lets the bulk loader skip unchanged rows
+    row_hash = Column(String(32))
+
+    __table_args__ = (
+        Index("ux_animal_breeds_country_specie_breed_name", "country", "specie", "breed_name", unique=True),
+        Index("ix_animal_breeds_specie_breed_name", "specie", "breed_name"),
+        Index("ix_animal_breeds_country", "country"),
+        trigram_index("ix_animal_breeds_breed_name_trgm", "breed_name"),
+        trigram_index("ix_animal_breeds_description_trgm", "description"),
+        trigram_index("ix_animal_breeds_specie_trgm", "specie"),
+        trigram_index("ix_animal_breeds_country_trgm", "country"),
+    )
 
 class Event(Base):
     __tablename__ = "events"
@@ -71,13 +106,91 @@ class Event(Base):
     event_type = Column(String)
     actor_id = Column(Integer, ForeignKey("users.id"))
     facility_id = Column(Integer, ForeignKey("facilities.id"))
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    event_metadata = Column(String)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # JSON object for structured payloads, JSON string for free-text notes
+    event_metadata = Column(JSON().with_variant(JSONB, "postgresql"))
     is_valid = Column(Boolean, default=True)
     anomaly_reason = Column(String, nullable=True)
     animal_id = Column(Integer, ForeignKey("animals.id"), nullable=False)
     animal = relationship("Animal", back_populates="events")
 
+    # Composite indexes matching the filter + "ORDER BY timestamp" access paths.
+    # On PostgreSQL the table is range-partitioned by month on timestamp (see
+    # app.db.partitions); the indexes are created on every partition.
+    __table_args__ = (
+        Index("ix_events_timestamp", "timestamp"),
+        Index("ix_events_animal_id_timestamp", "animal_id", "timestamp"),
+        Index("ix_events_facility_id_timestamp", "facility_id", "timestamp"),
+        Index("ix_events_is_valid_timestamp", "is_valid", "timestamp"),
+        Index("ix_events_event_type_timestamp", "event_type", "timestamp"),
+        # Containment / jsonpath lookups on metadata (meta filters on list_events)
+        Index(
+            "ix_events_event_metadata", "event_metadata",
+            postgresql_using="gin", postgresql_ops={"event_metadata": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+
+class EventDailyRollup(Base):
+    """
+    Event counts per UTC day, facility, event type and validity.
+
+    Kept in step with events by app.db.rollups on every ORM flush; rows
+    written outside the ORM are picked up by ``python -m app.db.rollups reconcile``.
+    Events without a facility are counted under facility_id 0 and events
+    without a type under an empty event_type, so every key column is non-null.
+    """
+    __tablename__ = "event_daily_rollups"
+    day = Column(Date, primary_key=True)
+    facility_id = Column(Integer, primary_key=True)
+    event_type = Column(String, primary_key=True)
+    is_valid = Column(Boolean, primary_key=True)
+    event_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_event_daily_rollups_facility_id_day", "facility_id", "day"),
+    )
+
+class EventArchive(Base):
+    """
+    Manifest of events moved out of the database into Parquet files.
+
+    One row per file; a month gets another part if late events for it are
+    archived after the first run. Paths are relative to EVENT_ARCHIVE_DIR.
+    """
+    __tablename__ = "event_archives"
+    id = Column(Integer, primary_key=True)
+    month = Column(Date, nullable=False)
+    part = Column(Integer, nullable=False, default=1)
+    path = Column(String, nullable=False, unique=True)
+    row_count = Column(Integer, nullable=False)
+    min_timestamp = Column(DateTime)
+    max_timestamp = Column(DateTime)
+    min_animal_id = Column(Integer)
+    max_animal_id = Column(Integer)
+    size_bytes = Column(Integer)
+    sha256 = Column(String(64))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_event_archives_month_part", "month", "part", unique=True),
+    )
+
+class TableVersion(Base):
+    """
+    Change counter per versioned dataset, the source of the ETags of the
+    catalog and detail GET routes.
+
+    Bumped by app.db.table_versions in the transaction of every ORM commit
+    that changes a versioned table; bulk loaders writing outside the ORM
+    bump it themselves. ``event_types`` versions the set of event types
+    rather than the events table, so event ingestion does not contend on
+    one counter row.
+    """
+    __tablename__ = "table_versions"
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
 class Document(Base):
     __tablename__ = "documents"
     id = Column(Integer, primary_key=True, index=True)
@@ -92,4 +205,8 @@ class Document(Base):
     uploaded_at = Column(DateTime, default=datetime.utcnow)
     
     animal = relationship("Animal")
-    uploader = relationship("User")
\ No newline at end of file
+    uploader = relationship("User")
+
+    __table_args__ = (
+        Index("ix_documents_animal_id", "animal_id"),
+    )
\ No newline at end of file
@@ -0,0 +1,255 @@
+"""
+Monthly range partitioning of the events table (PostgreSQL only).
+
+``events`` is partitioned by ``RANGE (timestamp)`` with one partition per
+month named ``events_pYYYYMM`` plus an ``events_default`` catch-all. Queries
+that bound ``Event.timestamp`` (dashboard timeline, recent-activity counts,
+dated report filters) only touch the matching partitions, and old months can
+be detached or dropped without rewriting the indexes of the live ones.
+
+Run with:
+    python -m app.db.partitions ensure [--months-ahead 3]
+    python -m app.db.partitions list
+    python -m app.db.partitions detach --before 2024-01 [--drop]
+"""
+import argparse
+import logging
+from datetime import date, datetime
+from typing import List
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "events"
+DEFAULT_PARTITION = "events_default"
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    month_index = value.year * 12 + value.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month.year:04d}{month.month:02d}"
+
+
+def is_partitioned(conn) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t))"
+    ), {"t": PARENT_TABLE}).scalar()
+
+
+def create_month_partition(conn, month: date):
+    month = month_start(month)
+    conn.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT_TABLE} '
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    ))
+
+
+def ensure_partitions(conn, start: date, end: date):
+    """Create monthly partitions covering [start, end] (both inclusive, by month)."""
+    month = month_start(start)
+    while month <= month_start(end):
+        create_month_partition(conn, month)
+        month = add_months(month, 1)
+
+
+def list_partitions(conn) -> List[str]:
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:t) ORDER BY c.relname"
+    ), {"t": PARENT_TABLE})
+    return [r[0] for r in rows]
+
+
+def convert_events_table(conn, months_ahead: int = None):
+    """
+    Rebuild a plain ``events`` table as a monthly partitioned table.
+
+    Columns, defaults and NOT NULL/CHECK constraints are copied with LIKE and
+    the existing secondary indexes are recreated on the parent, so the
+    conversion follows whatever the table looks like at the time. The primary
+    key becomes (id, timestamp) because a partitioned table's unique
+    constraints must include the partition key.
+
+    Holds an ACCESS EXCLUSIVE lock on events while rows are copied; run it in
+    a maintenance window on large tables.
+    """
+    if months_ahead is None:
+        months_ahead = settings.EVENT_PARTITION_MONTHS_AHEAD
+    if is_partitioned(conn):
+        logger.info("events is already partitioned")
+        return
+
+    index_defs = conn.execute(text(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = :t AND indexname <> :pk"
+    ), {"t": PARENT_TABLE, "pk": f"{PARENT_TABLE}_pkey"}).all()
+    foreign_keys = conn.execute(text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(:t) AND contype = 'f'"
+    ), {"t": PARENT_TABLE}).all()
+
+    conn.execute(text(f"LOCK TABLE {PARENT_TABLE} IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text(f'UPDATE {PARENT_TABLE} SET "timestamp" = now() WHERE "timestamp" IS NULL'))
+    for name, _ in index_defs:
+        conn.execute(text(f"DROP INDEX {name}"))
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {PARENT_TABLE}_legacy"))
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE}_legacy RENAME CONSTRAINT {PARENT_TABLE}_pkey TO {PARENT_TABLE}_legacy_pkey"))
+    conn.execute(text(f"ALTER SEQUENCE IF EXISTS {PARENT_TABLE}_id_seq OWNED BY NONE"))
+
+    conn.execute(text(
+        f"CREATE TABLE {PARENT_TABLE} (LIKE {PARENT_TABLE}_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f'PARTITION BY RANGE ("timestamp")'
+    ))
+    conn.execute(text(f'ALTER TABLE {PARENT_TABLE} ALTER COLUMN "timestamp" SET NOT NULL'))
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ALTER COLUMN \"timestamp\" SET DEFAULT (now() AT TIME ZONE 'utc')"))
+    conn.execute(text(f'ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT {PARENT_TABLE}_pkey PRIMARY KEY (id, "timestamp")'))
+    for name, definition in foreign_keys:
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT {name} {definition}"))
+
+    bounds = conn.execute(text(f'SELECT min("timestamp") FROM {PARENT_TABLE}_legacy')).scalar()
+    current = month_start(datetime.utcnow())
+    ensure_partitions(conn, min(month_start(bounds), current) if bounds else current, add_months(current, months_ahead))
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+    # Indexes on the parent cascade to every current and future partition. The
+    # definitions were read before the rename, so they already name events.
+    for _, definition in index_defs:
+        conn.execute(text(definition))
+
+    conn.execute(text(f"INSERT INTO {PARENT_TABLE} SELECT * FROM {PARENT_TABLE}_legacy"))
+    conn.execute(text(f"ALTER SEQUENCE IF EXISTS {PARENT_TABLE}_id_seq OWNED BY {PARENT_TABLE}.id"))
+    conn.execute(text(f"DROP TABLE {PARENT_TABLE}_legacy"))
+    logger.info("events converted to a monthly partitioned table")
+
+
+def revert_events_table(conn):
+    """Inverse of convert_events_table(): fold all partitions back into a plain table."""
+    if not is_partitioned(conn):
+        return
+
+    index_defs = conn.execute(text(
+        "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x "
+        "JOIN pg_class i ON i.oid = x.indexrelid "
+        "WHERE x.indrelid = to_regclass(:t) AND NOT x.indisprimary"
+    ), {"t": PARENT_TABLE}).all()
+    foreign_keys = conn.execute(text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(:t) AND contype = 'f' AND conparentid = 0"
+    ), {"t": PARENT_TABLE}).all()
+
+    conn.execute(text(f"LOCK TABLE {PARENT_TABLE} IN ACCESS EXCLUSIVE MODE"))
+    for name, _ in index_defs:
+        conn.execute(text(f"DROP INDEX {name}"))
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {PARENT_TABLE}_partitioned"))
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE}_partitioned RENAME CONSTRAINT {PARENT_TABLE}_pkey TO {PARENT_TABLE}_partitioned_pkey"))
+    conn.execute(text(f"ALTER SEQUENCE IF EXISTS {PARENT_TABLE}_id_seq OWNED BY NONE"))
+    conn.execute(text(
+        f"CREATE TABLE {PARENT_TABLE} (LIKE {PARENT_TABLE}_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT {PARENT_TABLE}_pkey PRIMARY KEY (id)"))
+    for name, definition in foreign_keys:
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT {name} {definition}"))
+    conn.execute(text(f"INSERT INTO {PARENT_TABLE} SELECT * FROM {PARENT_TABLE}_partitioned"))
+    # Read before the rename: the definitions already name events
+    for _, definition in index_defs:
+        conn.execute(text(definition))
+    conn.execute(text(f"ALTER SEQUENCE IF EXISTS {PARENT_TABLE}_id_seq OWNED BY {PARENT_TABLE}.id"))
+    conn.execute(text(f"DROP TABLE {PARENT_TABLE}_partitioned CASCADE"))
+
+
+def ensure_future_partitions(engine, months_ahead: int = None) -> bool:
+    """
+    Make sure partitions exist from the current month through ``months_ahead``.
+
+    Cheap and idempotent; called on startup and meant to be run from cron.
+    Returns False when events is not partitioned (or not on PostgreSQL).
+    """
+    if months_ahead is None:
+        months_ahead = settings.EVENT_PARTITION_MONTHS_AHEAD
+    if engine.dialect.name != "postgresql":
+        return False
+    try:
+        with engine.begin() as conn:
+            if not is_partitioned(conn):
+                return False
+            current = month_start(datetime.utcnow())
+            ensure_partitions(conn, current, add_months(current, months_ahead))
+        return True
+    except Exception as e:
+        # Another worker creating the same partition, or rows already sitting in
+        # events_default for that month; never block startup on it.
+        logger.warning(f"Could not create future event partitions: {e}")
+        return False
+
+
+def detach_partitions_before(engine, before: date, drop: bool = False, lock_timeout: str = "5s") -> List[str]:
+    """
+    Detach (and optionally drop) monthly partitions that end on or before ``before``.
+
+    DETACH only rewrites catalog entries, so it is quick regardless of the
+    partition size. CONCURRENTLY is not available while events_default
+    exists, so each partition is detached in its own short transaction with a
+    lock_timeout rather than queueing behind long-running queries.
+    """
+    before = month_start(before)
+    prefix = f"{PARENT_TABLE}_p"
+    with engine.connect() as conn:
+        names = [n for n in list_partitions(conn) if n.startswith(prefix)]
+
+    detached = []
+    for name in names:
+        suffix = name[len(prefix):]
+        month = date(int(suffix[:4]), int(suffix[4:6]), 1)
+        if add_months(month, 1) > before:
+            continue
+        with engine.begin() as conn:
+            conn.execute(text(f"SET LOCAL lock_timeout = '{lock_timeout}'"))
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            if drop:
+                conn.execute(text(f"DROP TABLE {name}"))
+        detached.append(name)
+    return detached
+
+
+def main():
+    from app.db.session import engine
+
+    parser = argparse.ArgumentParser(description="Manage monthly partitions of the events table")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ensure = sub.add_parser("ensure", help="Create partitions for upcoming months")
+    ensure.add_argument("--months-ahead", type=int, default=settings.EVENT_PARTITION_MONTHS_AHEAD)
+    sub.add_parser("list", help="List existing partitions")
+    detach = sub.add_parser("detach", help="Detach partitions older than a month")
+    detach.add_argument("--before", required=True, help="YYYY-MM; partitions ending on or before this month")
+    detach.add_argument("--drop", action="store_true", help="Drop the detached tables as well")
+    args = parser.parse_args()
+
+    if args.command == "ensure":
+        if ensure_future_partitions(engine, args.months_ahead):
+            print(f"Partitions ensured through {args.months_ahead} months ahead")
+        else:
+            print("events is not partitioned; nothing to do")
+    elif args.command == "list":
+        with engine.connect() as conn:
+            for name in list_partitions(conn):
+                print(name)
+    elif args.command == "detach":
+        before = datetime.strptime(args.before, "%Y-%m").date()
+        for name in detach_partitions_before(engine, before, drop=args.drop):
+            print(f"{'Dropped' if args.drop else 'Detached'} {name}")
+
+
+if __name__ == "__main__":
+    main()
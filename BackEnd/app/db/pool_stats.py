@@ -0,0 +1,138 @@
+"""
+Connection pool instrumentation.
+
+The application engines use a QueuePool subclass that times every checkout,
+so pool saturation (waits, timeouts, failed connects) is visible before
+requests start failing. Statistics are exposed through the admin routes.
+"""
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+# Upper bounds (in milliseconds) of the checkout wait time histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolStats:
+    """Thread-safe counters for a single engine's connection pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.connect_errors = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_wait(self, elapsed_ms: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total_ms += elapsed_ms
+            self.wait_max_ms = max(self.wait_max_ms, elapsed_ms)
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+            else:
+                self.wait_buckets[-1] += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect_error(self):
+        with self._lock:
+            self.connect_errors += 1
+
+    def snapshot(self, pool) -> Dict:
+        """Combine the recorded counters with the pool's live state."""
+        with self._lock:
+            histogram = [
+                {"le_ms": bound, "count": count}
+                for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)
+            ]
+            histogram.append({"le_ms": "+Inf", "count": self.wait_buckets[-1]})
+            result = {
+                "name": self.name,
+                "checkouts_total": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "connect_errors": self.connect_errors,
+                "wait_avg_ms": round(self.wait_total_ms / max(self.checkouts, 1), 3),
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "wait_histogram": histogram,
+            }
+
+        if isinstance(pool, QueuePool):
+            result.update({
+                "pool_class": type(pool).__name__,
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            })
+        else:
+            result["pool_class"] = type(pool).__name__
+        return result
+
+
+def instrumented_pool_class(stats: PoolStats, base=QueuePool):
+    """
+    Build a pool class that reports checkout timings to ``stats``.
+
+    The stats object is bound on the class rather than the instance so it
+    survives ``Pool.recreate()`` (engine.dispose()).
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            entry = base._do_get(self)
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        except Exception:
+            # raw DBAPI errors raised while opening a new connection
+            self.stats.record_connect_error()
+            raise
+        self.stats.record_wait((time.perf_counter() - start) * 1000)
+        return entry
+
+    return type(f"Instrumented{base.__name__}", (base,), {"stats": stats, "_do_get": _do_get})
+
+
+_registry: Dict[str, tuple] = {}
+
+
+def register_engine(name: str, engine, stats: PoolStats):
+    """Make an engine's pool visible to get_pool_statistics()."""
+    _registry[name] = (engine, stats)
+
+
+def get_pool_statistics() -> List[Dict]:
+    return [stats.snapshot(engine.pool) for engine, stats in _registry.values()]
+
+
+def reset_pool_statistics():
+    for _, stats in _registry.values():
+        stats.reset()
+
+
+def discard_inherited_connections():
+    """
+    Replace every registered engine's pool after a fork.
+
+    Connections the parent process opened stay with the parent (close=False),
+    so a forked worker never shares a socket with it.
+    """
+    for engine, _ in _registry.values():
+        engine.dispose(close=False)
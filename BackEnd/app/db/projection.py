@@ -0,0 +1,55 @@
+"""
+Column-projected reads for list endpoints.
+
+A ``Projection`` names the fields of one list response and the column each
+is read from. The route selects only the columns of the fields the client
+asked for (``fields=id,breed_name``; all of them by default) as plain rows
+and zips each row into the response item, so no ORM object is built,
+identity-mapped or instrumented, and an unrequested text column such as
+AnimalBreed.description never leaves the database.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Select, select
+
+
+class Projection:
+    """The response fields of a list endpoint, in response order, and their columns."""
+
+    def __init__(self, **columns):
+        self.columns: Dict = columns
+
+    @property
+    def description(self) -> str:
+        return f"Comma-separated fields to return (default: all): {', '.join(self.columns)}"
+
+    def parse(self, fields: Optional[str]) -> List[str]:
+        """Requested field names in response order; 400 for unknown ones."""
+        if not fields:
+            return list(self.columns)
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = sorted(requested - self.columns.keys())
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown) or '(none given)'}; available: {', '.join(self.columns)}",
+            )
+        return [name for name in self.columns if name in requested]
+
+    def select(self, fields: Optional[str], *keys: str) -> Tuple[Select, List[str]]:
+        """
+        Build the select for a ``fields=`` value.
+
+        Returns ``(statement, names)``. The statement selects the requested
+        columns labeled with their field names, followed by any of ``keys``
+        (sort keys the cursor needs) the client did not request.
+        """
+        names = self.parse(fields)
+        extra = [key for key in keys if key not in names]
+        return select(*[self.columns[name].label(name) for name in names + extra]), names
+
+    @staticmethod
+    def items(rows: Sequence, names: List[str]) -> List[dict]:
+        """Response items of the selected rows; extra key columns are left out."""
+        return [dict(zip(names, row)) for row in rows]
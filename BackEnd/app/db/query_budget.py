@@ -0,0 +1,188 @@
+"""
+Per-route statement timeouts and row budgets.
+
+Routes (or whole routers) declare a budget with
+``dependencies=[Depends(query_budget(timeout_ms=..., max_rows=...))]``.
+Every transaction a session opens while serving the request starts with
+``SET LOCAL statement_timeout`` (PostgreSQL only), and every row a select
+returns through the session counts against the row budget: ORM entities as
+they are loaded, column and Core rows as they are fetched. A cancelled statement becomes
+a 503 and an exhausted row budget a 413, so one heavy report releases its
+connection instead of starving event ingestion. Breaches are counted per
+route and exposed through the admin routes.
+"""
+import threading
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request
+from sqlalchemy.engine import IteratorResult
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.core.middleware import route_template
+
+# PostgreSQL "query_canceled", raised when statement_timeout fires
+QUERY_CANCELED = "57014"
+
+
+class RowBudgetExceeded(Exception):
+    def __init__(self, max_rows: int):
+        super().__init__(f"More than {max_rows} rows loaded")
+        self.max_rows = max_rows
+
+
+class RequestBudget:
+    """The budget of one request and the rows it has loaded so far."""
+
+    def __init__(self, timeout_ms: Optional[int], max_rows: Optional[int]):
+        self.timeout_ms = timeout_ms
+        self.max_rows = max_rows
+        self.rows = 0
+
+
+_current: ContextVar[Optional[RequestBudget]] = ContextVar("query_budget", default=None)
+
+
+def apply_statement_timeout(session, transaction, connection):
+    """Session ``after_begin`` hook: bound every statement of the transaction."""
+    budget = _current.get()
+    if budget is None or not budget.timeout_ms or connection.dialect.name != "postgresql":
+        return
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(budget.timeout_ms)}")
+
+
+def _charge(budget: RequestBudget):
+    budget.rows += 1
+    if budget.rows > budget.max_rows:
+        raise RowBudgetExceeded(budget.max_rows)
+
+
+def count_loaded_row(target, context):
+    """Mapper ``load`` hook: charge each materialized ORM row to the request's row budget."""
+    budget = _current.get()
+    if budget is None or not budget.max_rows:
+        return
+    _charge(budget)
+
+
+def _charged_rows(result, budget: RequestBudget):
+    for row in result:
+        _charge(budget)
+        yield row
+
+
+def count_result_rows(orm_execute_state):
+    """
+    Session ``do_orm_execute`` hook: charge the rows of column and Core selects.
+
+    Entity rows are charged by ``count_loaded_row``; the rows of any other
+    select are counted as they are fetched, streamed results included.
+    """
+    budget = _current.get()
+    if budget is None or not budget.max_rows or not orm_execute_state.is_select:
+        return None
+    if orm_execute_state.is_column_load or orm_execute_state.is_relationship_load:
+        return None
+    descriptions = getattr(orm_execute_state.statement, "column_descriptions", ())
+    if any(d.get("entity") is not None and d["expr"] is d["entity"] for d in descriptions):
+        return None
+    result = orm_execute_state.invoke_statement()
+    return IteratorResult(
+        result._metadata, _charged_rows(result, budget), raw=getattr(result, "raw", result)
+    )
+
+
+def ensure_row_budget(db, count_stmt):
+    """
+    Raise RowBudgetExceeded now if the rows counted by ``count_stmt`` would
+    exhaust the request's budget.
+
+    For streamed responses, which can no longer become a 413 once the body
+    has started. The count runs only while a row budget is active.
+    """
+    budget = _current.get()
+    if budget is None or not budget.max_rows:
+        return
+    if budget.rows + db.scalar(count_stmt) > budget.max_rows:
+        raise RowBudgetExceeded(budget.max_rows)
+
+
+def is_statement_timeout(error: DBAPIError) -> bool:
+    code = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None)
+    return code == QUERY_CANCELED
+
+
+class BudgetStats:
+    """Thread-safe per-route counts of budgeted requests and breaches."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.routes: Dict[str, Dict] = {}
+
+    def _route(self, route: str, budget: RequestBudget) -> Dict:
+        return self.routes.setdefault(route, {
+            "timeout_ms": budget.timeout_ms, "max_rows": budget.max_rows,
+            "requests": 0, "statement_timeouts": 0, "row_budget_exceeded": 0, "rows_max": 0,
+        })
+
+    def record(self, route: str, budget: RequestBudget, breach: Optional[str] = None):
+        with self._lock:
+            stats = self._route(route, budget)
+            stats["requests"] += 1
+            stats["rows_max"] = max(stats["rows_max"], budget.rows)
+            if breach:
+                stats[breach] += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {"routes": [{"route": route, **stats} for route, stats in sorted(self.routes.items())]}
+
+
+budget_stats = BudgetStats()
+
+
+def query_budget(timeout_ms: Optional[int] = None, max_rows: Optional[int] = None):
+    """
+    Dependency factory bounding the database work of a route or router.
+
+    ``timeout_ms`` is applied with SET LOCAL statement_timeout to every
+    transaction of the request; ``max_rows`` caps the rows its selects may return.
+    """
+
+    async def dependency(request: Request):
+        if not settings.QUERY_BUDGETS_ENABLED:
+            yield
+            return
+        # Set in an async dependency so the value reaches the handler, sync or async
+        budget = RequestBudget(timeout_ms, max_rows)
+        _current.set(budget)
+        route = f"{request.method} {route_template(request.scope)}"
+        try:
+            yield budget
+        except RowBudgetExceeded as e:
+            budget_stats.record(route, budget, "row_budget_exceeded")
+            raise HTTPException(
+                status_code=413,
+                detail=f"This request would load more than {e.max_rows} rows; narrow the filters or paginate",
+            )
+        except DBAPIError as e:
+            if not is_statement_timeout(e):
+                budget_stats.record(route, budget)
+                raise
+            budget_stats.record(route, budget, "statement_timeouts")
+            raise HTTPException(
+                status_code=503,
+                detail=f"The database query exceeded this route's {timeout_ms} ms time budget; try a narrower request",
+                headers={"Retry-After": "30"},
+            )
+        else:
+            budget_stats.record(route, budget)
+        finally:
+            _current.set(None)
+
+    return dependency
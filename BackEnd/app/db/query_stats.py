@@ -0,0 +1,155 @@
+"""
+Per-request SQL statement accounting.
+
+Every application engine reports the statements it executes to the
+``RequestQueries`` of the current request (a ContextVar set by
+QueryCountMiddleware). The middleware turns it into response headers and
+per-route statistics, and flags routes that run the same statement shape
+over and over, the usual sign of an N+1 loop. Statistics are exposed
+through the admin routes.
+"""
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event
+
+# Placeholder lists such as "IN (?, ?, ?)" or "(%(id_1)s, %(id_2)s)" collapse to one shape
+_PLACEHOLDER = r"(?:\?|%s|%\([^)]+\)s|\$\d+|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+RECENT_VIOLATIONS = 50
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so repeated executions with different parameters compare equal."""
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class RequestQueries:
+    """Statements executed while serving one request."""
+
+    def __init__(self, route: Optional[Callable[[], str]] = None):
+        self._lock = threading.Lock()
+        self._route = route
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed_ms: float):
+        # Sync handlers run in the threadpool; background work may overlap the handler
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.shapes[statement_shape(statement)] += 1
+
+    @property
+    def route(self) -> Optional[str]:
+        """The request's route template (resolved lazily: routing happens after the middleware starts)."""
+        return self._route() if self._route is not None else None
+
+    def repeated(self, threshold: int) -> List[Dict]:
+        """Statement shapes executed more than ``threshold`` times, most frequent first."""
+        with self._lock:
+            return [
+                {"statement": shape, "count": count}
+                for shape, count in self.shapes.most_common()
+                if count > threshold
+            ]
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def start_request(route: Optional[Callable[[], str]] = None) -> RequestQueries:
+    queries = RequestQueries(route)
+    _current.set(queries)
+    return queries
+
+
+def current_request() -> Optional[RequestQueries]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _current.get()
+    if queries is None:
+        return
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    queries.record(statement, (time.perf_counter() - starts.pop()) * 1000)
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine):
+    """Count the statements a (sync) engine executes; pass ``async_engine.sync_engine`` for async engines."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class RouteQueryStats:
+    """Thread-safe per-route totals across requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.routes: Dict[str, Dict] = {}
+            self.violations = deque(maxlen=RECENT_VIOLATIONS)
+
+    def record(self, route: str, queries: RequestQueries, repeated: List[Dict]):
+        with self._lock:
+            stats = self.routes.setdefault(route, {
+                "requests": 0, "queries_total": 0, "queries_max": 0,
+                "db_time_total_ms": 0.0, "db_time_max_ms": 0.0, "n_plus_one": 0,
+            })
+            stats["requests"] += 1
+            stats["queries_total"] += queries.count
+            stats["queries_max"] = max(stats["queries_max"], queries.count)
+            stats["db_time_total_ms"] += queries.total_ms
+            stats["db_time_max_ms"] = max(stats["db_time_max_ms"], queries.total_ms)
+            if repeated:
+                stats["n_plus_one"] += 1
+                self.violations.append({
+                    "route": route,
+                    "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    "queries": queries.count,
+                    "repeated": repeated[:3],
+                })
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            routes = [
+                {
+                    "route": route,
+                    **stats,
+                    "queries_avg": round(stats["queries_total"] / stats["requests"], 2),
+                    "db_time_avg_ms": round(stats["db_time_total_ms"] / stats["requests"], 3),
+                    "db_time_total_ms": round(stats["db_time_total_ms"], 3),
+                    "db_time_max_ms": round(stats["db_time_max_ms"], 3),
+                }
+                for route, stats in self.routes.items()
+            ]
+            routes.sort(key=lambda r: r["queries_total"], reverse=True)
+            return {"routes": routes, "recent_n_plus_one": list(self.violations)}
+
+
+route_query_stats = RouteQueryStats()
@@ -0,0 +1,226 @@
+"""
+Daily event rollups (event_daily_rollups).
+
+Every ORM flush that inserts, updates or deletes events applies the matching
++1/-1 deltas to the rollup rows in the same transaction, so dashboard
+counters read a table whose size grows with days x facilities x event types
+instead of with the raw event history.
+
+Events written outside the ORM (raw SQL, COPY, bulk deletes) are not seen by
+the flush hook; recompute those days with:
+    python -m app.db.rollups reconcile [--days 7]
+    python -m app.db.rollups backfill
+"""
+import argparse
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, event, func, inspect, select, true, tuple_
+
+from app.db.archive import archived_through
+from app.db.models import Event, EventDailyRollup
+
+NO_FACILITY = 0
+NO_EVENT_TYPE = ""
+
+TRACKED_ATTRS = ("timestamp", "facility_id", "event_type", "is_valid")
+
+RollupKey = Tuple[date, int, str, bool]
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    pass
+
+
+# Load the old value when a tracked attribute is assigned on an expired
+# instance, so the flush hook can decrement the rollup the event moves out of
+for _attr in TRACKED_ATTRS:
+    event.listen(getattr(Event, _attr), "set", _load_previous_value, active_history=True)
+
+
+def rollup_key(timestamp, facility_id, event_type, is_valid) -> RollupKey:
+    """Rollup primary key for an event; NULLs map to the sentinels, NULL validity counts as valid."""
+    return (
+        timestamp.date(),
+        facility_id or NO_FACILITY,
+        event_type or NO_EVENT_TYPE,
+        is_valid is not False,
+    )
+
+
+def _current_key(event) -> RollupKey:
+    return rollup_key(event.timestamp, event.facility_id, event.event_type, event.is_valid)
+
+
+def _previous_key(state) -> RollupKey:
+    """Key from the values as they were loaded from the database."""
+    values = []
+    for attr in TRACKED_ATTRS:
+        history = state.attrs[attr].history
+        if history.deleted:
+            values.append(history.deleted[0])
+        else:
+            values.append(getattr(state.obj(), attr))
+    return rollup_key(*values)
+
+
+def track_event_rollups(session, flush_context):
+    """after_flush hook: fold the flushed event changes into the rollup table."""
+    deltas = Counter()
+    for obj in session.new:
+        if isinstance(obj, Event):
+            deltas[_current_key(obj)] += 1
+    for obj in session.dirty:
+        if isinstance(obj, Event):
+            state = inspect(obj)
+            if any(state.attrs[attr].history.has_changes() for attr in TRACKED_ATTRS):
+                deltas[_previous_key(state)] -= 1
+                deltas[_current_key(obj)] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Event):
+            deltas[_previous_key(inspect(obj))] -= 1
+
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def _upsert(conn, rows, increment: bool):
+    """INSERT .. ON CONFLICT on the rollup key, adding to or replacing event_count."""
+    table = EventDailyRollup.__table__
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif conn.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Event rollups are not supported on {conn.dialect.name}")
+
+    stmt = insert(table)
+    new_count = stmt.excluded.event_count
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[c.name for c in table.primary_key.columns],
+        set_={"event_count": table.c.event_count + new_count if increment else new_count},
+    )
+    conn.execute(stmt, rows)
+
+
+def _rows(counts: Dict[RollupKey, int]):
+    # Sorted so concurrent transactions lock rollup rows in the same order
+    return [
+        {"day": day, "facility_id": facility_id, "event_type": event_type, "is_valid": is_valid, "event_count": count}
+        for (day, facility_id, event_type, is_valid), count in sorted(counts.items())
+    ]
+
+
+def apply_deltas(conn, deltas: Dict[RollupKey, int]):
+    _upsert(conn, _rows(deltas), increment=True)
+
+
+def _as_date(value) -> date:
+    # func.date() returns a string on SQLite
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _source_query():
+    day = func.date(Event.timestamp)
+    facility_id = func.coalesce(Event.facility_id, NO_FACILITY)
+    event_type = func.coalesce(Event.event_type, NO_EVENT_TYPE)
+    is_valid = func.coalesce(Event.is_valid, true())
+    return select(day, facility_id, event_type, is_valid, func.count()).group_by(day, facility_id, event_type, is_valid)
+
+
+def backfill(conn):
+    """
+    Rebuild the rollup table from events with a single INSERT .. SELECT.
+
+    Days already moved to the Parquet archive keep their rollups.
+    """
+    table = EventDailyRollup.__table__
+    source = _source_query()
+    clear = delete(table)
+    horizon = archived_through(conn)
+    if horizon is not None:
+        source = source.where(Event.timestamp >= datetime.combine(horizon, time.min))
+        clear = clear.where(table.c.day >= horizon)
+    conn.execute(clear)
+    conn.execute(table.insert().from_select(
+        ["day", "facility_id", "event_type", "is_valid", "event_count"], source
+    ))
+    return conn.execute(select(func.count()).select_from(table)).scalar()
+
+
+def backfill_if_empty(conn) -> bool:
+    """Populate the rollups the first time they are deployed against existing events."""
+    if conn.execute(select(EventDailyRollup.day).limit(1)).first() is not None:
+        return False
+    if conn.execute(select(Event.id).limit(1)).first() is None:
+        return False
+    backfill(conn)
+    return True
+
+
+def reconcile(conn, since: Optional[date] = None) -> Dict[str, int]:
+    """
+    Compare the rollups with a fresh aggregate of events (from ``since`` on)
+    and fix the rows that differ.
+
+    Run it for days that are no longer receiving writes, or repeat it: events
+    flushed while it runs may be counted against the old totals. Archived
+    days are skipped since their events are no longer in the table.
+    """
+    horizon = archived_through(conn)
+    if horizon is not None and (since is None or since < horizon):
+        since = horizon
+    source = _source_query()
+    stored_query = select(
+        EventDailyRollup.day, EventDailyRollup.facility_id, EventDailyRollup.event_type,
+        EventDailyRollup.is_valid, EventDailyRollup.event_count
+    )
+    if since is not None:
+        source = source.where(Event.timestamp >= datetime.combine(since, time.min))
+        stored_query = stored_query.where(EventDailyRollup.day >= since)
+
+    actual = {
+        (_as_date(day), facility_id, event_type, bool(is_valid)): count
+        for day, facility_id, event_type, is_valid, count in conn.execute(source)
+    }
+    stored = {
+        (day, facility_id, event_type, is_valid): count
+        for day, facility_id, event_type, is_valid, count in conn.execute(stored_query)
+    }
+
+    changed = {key: count for key, count in actual.items() if stored.get(key) != count}
+    stale = [key for key, count in stored.items() if key not in actual and count != 0]
+
+    if changed:
+        _upsert(conn, _rows(changed), increment=False)
+    if stale:
+        conn.execute(delete(EventDailyRollup).where(tuple_(
+            EventDailyRollup.day, EventDailyRollup.facility_id,
+            EventDailyRollup.event_type, EventDailyRollup.is_valid
+        ).in_(stale)))
+    return {"checked": len(actual), "updated": len(changed), "removed": len(stale)}
+
+
+def main():
+    from app.db.session import engine
+
+    parser = argparse.ArgumentParser(description="Maintain the daily event rollup table")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backfill", help="Rebuild all rollups from the events table")
+    rec = sub.add_parser("reconcile", help="Fix rollups that drifted from the events table")
+    rec.add_argument("--days", type=int, default=None, help="Only check the last N days (default: all)")
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        if args.command == "backfill":
+            print(f"Rebuilt {backfill(conn)} rollup rows")
+        else:
+            since = datetime.utcnow().date() - timedelta(days=args.days) if args.days is not None else None
+            result = reconcile(conn, since)
+            print(f"Checked {result['checked']} rollup rows: {result['updated']} updated, {result['removed']} removed")
+
+
+if __name__ == "__main__":
+    main()
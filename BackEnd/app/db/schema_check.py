@@ -0,0 +1,64 @@
+"""
+Startup check of the database schema revision.
+
+Workers no longer create tables on boot. They compare the revision stamped
+in ``alembic_version`` (one query) with the head of ``alembic/versions``
+and, depending on SCHEMA_CHECK_MODE, refuse to start (``strict``), log a
+warning (``warn``) or skip the check (``off``). The schema itself is
+created with ``python -m app.db.init_db`` and upgraded with
+``alembic upgrade head``.
+"""
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+
+class SchemaVersionMismatch(RuntimeError):
+    pass
+
+
+def script_directory():
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory(str(ALEMBIC_DIR))
+
+
+def expected_revisions() -> List[str]:
+    """Head revision(s) of the migrations shipped with this code."""
+    return sorted(script_directory().get_heads())
+
+
+def current_revisions(engine) -> Optional[List[str]]:
+    """Revision(s) stamped in the database, or None if it was never stamped."""
+    try:
+        with engine.connect() as conn:
+            return sorted(row[0] for row in conn.execute(text("SELECT version_num FROM alembic_version")))
+    except DBAPIError:
+        return None
+
+
+def check_schema_version(engine, mode: str):
+    if mode == "off":
+        return
+    expected = expected_revisions()
+    current = current_revisions(engine)
+    if current == expected:
+        return
+
+    if current is None:
+        problem = "the database has no alembic_version table; create it with `python -m app.db.init_db`"
+    else:
+        problem = (
+            f"the database is at revision {', '.join(current) or '(none)'} but this code expects "
+            f"{', '.join(expected)}; run `alembic upgrade head`"
+        )
+    if mode == "strict":
+        raise SchemaVersionMismatch(f"Refusing to start: {problem} (or set SCHEMA_CHECK_MODE=warn)")
+    logger.warning(f"Database schema mismatch: {problem}")
@@ -4,12 +4,11 @@ Run with: python -m app.db.seed_data
 """
 from datetime import datetime, timedelta
 import random
-import csv
 import os
-from pathlib import Path
 from app.db.session import SessionLocal
-from app.db.models import User, Facility, Animal, AnimalBreed, Event
+from app.db.models import User, Facility, Animal, Event
 from app.core.security import get_password_hash
+from app.scripts.import_animal_breeds import DEFAULT_CSV, load_breeds
 
 def seed_users(db):
     """Create sample users"""
@@ -73,73 +72,15 @@ def seed_facilities(db):
     return facilities
 
 def seed_animal_breeds(db):
-    """Create animal breeds from CSV file"""
-    # Get the CSV file path (data folder is at app/data)
-    current_dir = Path(__file__).parent.parent  # Go up to app/ directory
-    csv_path = current_dir / "data" / "animal_breeds.csv"
-    
-    if not csv_path.exists():
-        print(f"Warning: CSV file not found at {csv_path}")
+    """Load animal breeds from the CSV catalog with the bulk loader"""
+    if not DEFAULT_CSV.exists():
+        print(f"Warning: CSV file not found at {DEFAULT_CSV}")
         print("Skipping breed seeding...")
-        return []
-    
-    breeds = []
-    breeds_added = 0
-    breeds_skipped = 0
-    
-    print(f"Loading breeds from: {csv_path}")
-    
-    try:
-        with open(csv_path, 'r', encoding='utf-8') as file:
-            csv_reader = csv.DictReader(file)
-            
-            for row in csv_reader:
-                # Map CSV columns to database fields
-                breed_data = {
-                    "country": row.get("Country", "").strip(),
-                    "iso3": row.get("ISO3", "").strip(),
-                    "specie": row.get("Specie", "").strip(),
-                    "breed_name": row.get("Breed/Most common name", "").strip(),
-                    "language": row.get("Language", "").strip(),
-                    "description": row.get("Description", "").strip(),
-                    "transboundary_name": row.get("Transboundary name", "").strip(),
-                    "other_name": row.get("Other name", "").strip()
-                }
-                
-                # Skip if essential fields are missing
-                if not breed_data["breed_name"] or not breed_data["specie"]:
-                    continue
-                
-                # Check if breed already exists
-                existing = db.query(AnimalBreed).filter(
-                    AnimalBreed.breed_name == breed_data["breed_name"],
-                    AnimalBreed.specie == breed_data["specie"],
-                    AnimalBreed.country == breed_data["country"]
-                ).first()
-                
-                if not existing:
-                    breed = AnimalBreed(**breed_data)
-                    db.add(breed)
-                    breeds.append(breed)
-                    breeds_added += 1
-                    
-                    # Commit in batches of 100 to improve performance
-                    if breeds_added % 100 == 0:
-                        db.commit()
-                        print(f"  Processed {breeds_added} breeds...")
-                else:
-                    breeds.append(existing)
-                    breeds_skipped += 1
-    
-    except Exception as e:
-        print(f"Error reading CSV file: {e}")
-        db.rollback()
-        return []
+        return {"total": 0}
     
-    # Final commit
+    # The loader runs its own transaction; flush anything pending first
     db.commit()
-    print(f"Breed seeding complete: {breeds_added} added, {breeds_skipped} skipped")
-    return breeds
+    return load_breeds(db.get_bind(), DEFAULT_CSV)
 
 def seed_animals(db, facilities, users):
     """Create sample animals"""
@@ -236,7 +177,7 @@ def seed_events(db, animals, facilities, users):
             actor_id=random.choice(users).id,
             facility_id=random.choice(facilities).id,
             timestamp=timestamp,
-            event_metadata=f"{{\"notes\": \"Sample {event_type} event\"}}",
+            event_metadata={"notes": f"Sample {event_type} event"},
             is_valid=is_valid,
             anomaly_reason=anomaly_reason
         )
@@ -275,7 +216,7 @@ def main():
         print("Database seeding completed successfully!")
         print(f"Total users: {len(users)}")
         print(f"Total facilities: {len(facilities)}")
-        print(f"Total breeds: {len(breeds)}")
+        print(f"Total breeds: {breeds['total']}")
         print(f"Total animals: {len(animals)}")
         print(f"Total events: {len(events)}")
         print("=" * 60)
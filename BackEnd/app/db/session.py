@@ -1,10 +1,157 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.sql.dml import UpdateBase
 from app.core.config import settings
+from app.db import slow_queries
 from app.db.base import Base
+from app.db.pool_stats import PoolStats, instrumented_pool_class, register_engine
+from app.db.query_budget import apply_statement_timeout, count_loaded_row, count_result_rows
+from app.db.query_stats import instrument_engine
+from app.db.rollups import track_event_rollups
+from app.db import table_versions
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the sync DBAPI driver in a database URL for its asyncio counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def engine_options(url: str, stats: PoolStats, pool_class=QueuePool) -> dict:
+    """Build create_engine() pool arguments from the settings."""
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite uses a SingletonThreadPool which takes no sizing options
+        return options
+    options.update(
+        poolclass=instrumented_pool_class(stats, base=pool_class),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the replica when it is marked read-only.
+
+    Everything stays on the primary once the session has written (flushed or
+    executed DML), so a request always sees its own writes.
+    """
+
+    def __init__(self, *args, replica_bind=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica_bind = replica_bind
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self.replica_bind is not None
+            and self.info.get("read_only")
+            and not self.info.get("has_written")
+            and not self._flushing
+            and not isinstance(clause, UpdateBase)
+        ):
+            return self.replica_bind
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_written_on_flush(session, flush_context):
+    session.info["has_written"] = True
+
+
+# Keep event_daily_rollups in step with every flushed event insert/update/delete
+event.listen(RoutingSession, "after_flush", track_event_rollups)
+
+# Bump table_versions (the ETags of cacheable GET routes) in every transaction that changes them
+event.listen(RoutingSession, "after_flush", table_versions.track_flushed_tables)
+event.listen(RoutingSession, "do_orm_execute", table_versions.track_dml_tables)
+event.listen(RoutingSession, "before_commit", table_versions.bump_changed_tables)
+event.listen(RoutingSession, "after_commit", table_versions.remember_event_types)
+event.listen(RoutingSession, "after_transaction_end", table_versions.forget_changes)
+
+# Per-route query budgets: statement timeout per transaction, row budget per loaded ORM entity
+# and per fetched column/Core row
+event.listen(RoutingSession, "after_begin", apply_statement_timeout)
+event.listen(Base, "load", count_loaded_row, propagate=True)
+event.listen(RoutingSession, "do_orm_execute", count_result_rows)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_written_on_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_written"] = True
+
+
+primary_pool_stats = PoolStats("primary")
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, primary_pool_stats))
+register_engine("primary", engine, primary_pool_stats)
+instrument_engine(engine)
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_queries.instrument_engine(engine, "primary")
+
+replica_engine = None
+if settings.REPLICA_DATABASE_URL:
+    replica_pool_stats = PoolStats("replica")
+    replica_engine = create_engine(
+        settings.REPLICA_DATABASE_URL,
+        **engine_options(settings.REPLICA_DATABASE_URL, replica_pool_stats)
+    )
+    register_engine("replica", replica_engine, replica_pool_stats)
+    instrument_engine(replica_engine)
+    if settings.SLOW_QUERY_LOG_ENABLED:
+        slow_queries.instrument_engine(replica_engine, "replica")
+
+# Async engines share the pool settings; each holds its own connections
+async_pool_stats = PoolStats("primary_async")
+async_engine = create_async_engine(
+    to_async_url(settings.DATABASE_URL),
+    **engine_options(settings.DATABASE_URL, async_pool_stats, AsyncAdaptedQueuePool)
+)
+register_engine("primary_async", async_engine.sync_engine, async_pool_stats)
+instrument_engine(async_engine.sync_engine)
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_queries.instrument_engine(async_engine.sync_engine, "primary_async")
+
+async_replica_engine = None
+if settings.REPLICA_DATABASE_URL:
+    async_replica_pool_stats = PoolStats("replica_async")
+    async_replica_engine = create_async_engine(
+        to_async_url(settings.REPLICA_DATABASE_URL),
+        **engine_options(settings.REPLICA_DATABASE_URL, async_replica_pool_stats, AsyncAdaptedQueuePool)
+    )
+    register_engine("replica_async", async_replica_engine.sync_engine, async_replica_pool_stats)
+    instrument_engine(async_replica_engine.sync_engine)
+    if settings.SLOW_QUERY_LOG_ENABLED:
+        slow_queries.instrument_engine(async_replica_engine.sync_engine, "replica_async")
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    replica_bind=replica_engine
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+    replica_bind=async_replica_engine.sync_engine if async_replica_engine is not None else None
+)
 
 def get_db():
     db = SessionLocal()
@@ -12,3 +159,31 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """
+    Session for read-mostly GET handlers.
+
+    Queries go to the read replica when one is configured; any write made
+    through the session pins the rest of the request to the primary.
+    """
+    db = SessionLocal(info={"read_only": True})
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """
+    AsyncSession dependency for high-concurrency routes.
+
+    Unlike get_db it does not occupy a threadpool slot while waiting on the
+    database. Relationships are not lazy-loadable, so load them explicitly.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    """Async counterpart of get_read_db (replica reads when configured)."""
+    async with AsyncSessionLocal(info={"read_only": True}) as db:
+        yield db
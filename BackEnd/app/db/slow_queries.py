@@ -0,0 +1,177 @@
+"""
+Slow-query log.
+
+Statements that take longer than SLOW_QUERY_THRESHOLD_MS are kept in a
+bounded ring buffer with their parameters, duration, engine and the route
+that ran them (known while QUERY_STATS_ENABLED sets up the request
+context). A sampled share of slow SELECTs is re-run under ``EXPLAIN
+(ANALYZE, BUFFERS)`` (``EXPLAIN QUERY PLAN`` on SQLite) on the same
+connection, so the plan reflects the request's own transaction. Entries
+are exposed through the admin routes.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db.query_stats import current_request
+
+logger = logging.getLogger(__name__)
+
+MAX_STATEMENT_CHARS = 10_000
+MAX_PARAMETER_CHARS = 200
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+
+def _format_parameters(parameters, executemany: bool):
+    """JSON-friendly, truncated copy of the bound parameters."""
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+
+    def short(value):
+        text = value if isinstance(value, (int, float, bool)) or value is None else repr(value)
+        if isinstance(text, str) and len(text) > MAX_PARAMETER_CHARS:
+            text = text[:MAX_PARAMETER_CHARS] + "..."
+        return text
+
+    if isinstance(parameters, dict):
+        return {key: short(value) for key, value in parameters.items()}
+    return [short(value) for value in parameters or ()]
+
+
+def _is_explainable(statement: str) -> bool:
+    # EXPLAIN ANALYZE executes the statement again; never do that for writes
+    head = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return head == "SELECT"
+
+
+def explain(conn, statement: str, parameters) -> str:
+    """Plan of an already executed statement, run on the same DBAPI connection."""
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+    elif dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        raise NotImplementedError(f"EXPLAIN capture is not supported on {dialect}")
+
+    explain_cursor = conn.connection.cursor()
+    # A failing EXPLAIN must not abort the request's PostgreSQL transaction
+    savepoint = dialect == "postgresql" and conn.in_transaction()
+    try:
+        if savepoint:
+            explain_cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        try:
+            explain_cursor.execute(prefix + statement, parameters)
+            rows = explain_cursor.fetchall()
+        except Exception:
+            if savepoint:
+                explain_cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            raise
+        if savepoint:
+            explain_cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+    finally:
+        explain_cursor.close()
+
+    if dialect == "sqlite":
+        # (id, parent, notused, detail)
+        return "\n".join(str(row[-1]) for row in rows)
+    return "\n".join(str(row[0]) for row in rows)
+
+
+class SlowQueryLog:
+    """Thread-safe ring buffer of slow statements."""
+
+    def __init__(self, threshold_ms: float, explain_sample_rate: float, size: int):
+        self._lock = threading.Lock()
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self._random = random.Random()
+        self.entries = deque(maxlen=size)
+        self.recorded = 0
+
+    def reset(self):
+        with self._lock:
+            self.entries.clear()
+            self.recorded = 0
+
+    def should_explain(self, statement: str, executemany: bool) -> bool:
+        if executemany or not _is_explainable(statement):
+            return False
+        with self._lock:
+            return self._random.random() < self.explain_sample_rate
+
+    def record(self, entry: Dict):
+        with self._lock:
+            self.recorded += 1
+            self.entries.append(entry)
+
+    def snapshot(self, limit: Optional[int] = None) -> Dict:
+        with self._lock:
+            entries: List[Dict] = list(self.entries)
+            recorded = self.recorded
+        entries.reverse()  # newest first
+        return {
+            "enabled": settings.SLOW_QUERY_LOG_ENABLED,
+            "threshold_ms": self.threshold_ms,
+            "explain_sample_rate": self.explain_sample_rate,
+            "capacity": self.entries.maxlen,
+            "recorded_total": recorded,
+            "entries": entries[:limit] if limit is not None else entries,
+        }
+
+
+slow_query_log = SlowQueryLog(
+    settings.SLOW_QUERY_THRESHOLD_MS, settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE, settings.SLOW_QUERY_LOG_SIZE
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("slow_query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine, name: str):
+    """Log the slow statements of a (sync) engine; pass ``async_engine.sync_engine`` for async engines."""
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("slow_query_start")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        log = slow_query_log
+        if elapsed_ms < log.threshold_ms:
+            return
+
+        queries = current_request()
+        entry = {
+            "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "engine": name,
+            "route": queries.route if queries is not None else None,
+            "duration_ms": round(elapsed_ms, 3),
+            "statement": statement[:MAX_STATEMENT_CHARS],
+            "parameters": _format_parameters(parameters, executemany),
+            "executemany": executemany,
+            "plan": None,
+        }
+        if log.should_explain(statement, executemany):
+            try:
+                entry["plan"] = explain(conn, statement, parameters)
+            except Exception as e:
+                entry["plan_error"] = f"{type(e).__name__}: {e}"
+                logger.warning(f"EXPLAIN of a slow statement failed: {e}")
+        log.record(entry)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,24 @@
+"""
+Chunked row streaming for report and export queries.
+
+``stream_rows`` executes a statement with ``yield_per``, which opens a
+server-side cursor (psycopg2 named cursor) and fetches
+STREAM_CHUNK_ROWS rows at a time, so memory stays flat however many rows
+match. Pass column selects rather than entities: plain Row tuples skip the
+identity map and attribute instrumentation.
+"""
+from typing import Iterator
+
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+STREAM_CHUNK_ROWS = 1000
+
+
+def stream_rows(db: Session, stmt, chunk_size: int = STREAM_CHUNK_ROWS) -> Iterator[Row]:
+    result = db.execute(stmt.execution_options(yield_per=chunk_size))
+    try:
+        yield from result
+    finally:
+        result.close()
+
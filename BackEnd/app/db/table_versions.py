@@ -0,0 +1,179 @@
+"""
+Version counters of the datasets behind cacheable GET routes (table_versions).
+
+Every ORM flush and DML statement notes the versioned tables it changed;
+just before the session commits, their counters are incremented in the same
+transaction, so a version never becomes visible without its data or the
+other way round. The bumps run at commit time and in name order, so the
+counter rows stay locked only for the commit itself and are always locked in
+the same order.
+
+Events are versioned as ``event_types``, the set of types /events/types
+lists: an event insert bumps it only when this process has not committed an
+event of that type before, so ingestion does not serialize on one counter
+row. Event updates and deletes always bump it. The types a process knows are
+tied to the ``event_types`` version it last saw; a commit that inserts only
+known types reads the current version (a plain read, no lock) and, if any
+writer bumped it since (a delete, the archiver), forgets them and bumps.
+
+Writes outside a Session (COPY, Core statements on a Connection) call
+``bump_versions`` themselves.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case, inspect, select
+
+from app.db.models import Animal, AnimalBreed, Event, Facility, TableVersion, User
+
+VERSIONED_TABLES = frozenset(model.__tablename__ for model in (Animal, AnimalBreed, Facility, User))
+EVENT_TYPES = "event_types"
+
+# session.info keys
+CHANGED = "changed_tables"
+NEW_EVENT_TYPES = "new_event_types"
+REMOVED_EVENT_TYPES = "removed_event_types"
+EVENT_TYPES_VERSION = "event_types_version"
+
+
+class KnownEventTypes:
+    """Event types this process has committed events of, valid at ``version`` of event_types."""
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.types = set()
+
+
+_known = KnownEventTypes()
+
+
+def _dataset(obj) -> Optional[str]:
+    if isinstance(obj, Event):
+        return EVENT_TYPES
+    name = obj.__tablename__
+    return name if name in VERSIONED_TABLES else None
+
+
+def track_flushed_tables(session, flush_context):
+    """after_flush hook: note the versioned tables the flush inserted into, updated or deleted from."""
+    changed = session.info.setdefault(CHANGED, set())
+    for obj in session.new:
+        if isinstance(obj, Event):
+            session.info.setdefault(NEW_EVENT_TYPES, set()).add(obj.event_type)
+            if obj.event_type not in _known.types:
+                changed.add(EVENT_TYPES)
+        elif _dataset(obj):
+            changed.add(_dataset(obj))
+    for obj in session.dirty:
+        if isinstance(obj, Event):
+            if inspect(obj).attrs.event_type.history.has_changes():
+                changed.add(EVENT_TYPES)
+                session.info[REMOVED_EVENT_TYPES] = True
+        elif _dataset(obj) and session.is_modified(obj, include_collections=False):
+            changed.add(_dataset(obj))
+    for obj in session.deleted:
+        if _dataset(obj):
+            changed.add(_dataset(obj))
+            if isinstance(obj, Event):
+                session.info[REMOVED_EVENT_TYPES] = True
+
+
+def track_dml_tables(orm_execute_state):
+    """do_orm_execute hook: note the versioned table of an ORM insert/update/delete statement."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    name = orm_execute_state.statement.table.name
+    if name == Event.__tablename__:
+        name = EVENT_TYPES
+        # Which types a bulk statement touched is unknown: forget them all
+        orm_execute_state.session.info[REMOVED_EVENT_TYPES] = True
+    if name == EVENT_TYPES or name in VERSIONED_TABLES:
+        orm_execute_state.session.info.setdefault(CHANGED, set()).add(name)
+
+
+def _event_types_version(session) -> int:
+    return read_versions(session, [EVENT_TYPES])[EVENT_TYPES][0]
+
+
+def bump_changed_tables(session):
+    """before_commit hook: flush, then bump the versions of every table the transaction changed."""
+    session.flush()
+    changed = session.info.pop(CHANGED, set())
+    known_version = _known.version
+    if EVENT_TYPES not in changed and session.info.get(NEW_EVENT_TYPES):
+        # Only known types inserted: they still need no bump unless another writer changed the set
+        version = _event_types_version(session)
+        if version != known_version:
+            changed.add(EVENT_TYPES)
+            session.info[REMOVED_EVENT_TYPES] = True
+        session.info[EVENT_TYPES_VERSION] = version
+    if not changed:
+        return
+    bump_versions(session.connection(), changed)
+    if EVENT_TYPES in changed:
+        # Read back under the counter row's lock: exactly the version this commit creates
+        version = _event_types_version(session)
+        if known_version is None or version != known_version + 1:
+            session.info[REMOVED_EVENT_TYPES] = True
+        session.info[EVENT_TYPES_VERSION] = version
+
+
+def remember_event_types(session):
+    """after_commit hook: note the committed event types and the event_types version they are valid at."""
+    new_types = session.info.pop(NEW_EVENT_TYPES, ())
+    if EVENT_TYPES_VERSION not in session.info:
+        return
+    if session.info.pop(REMOVED_EVENT_TYPES, False):
+        _known.types = set()
+    _known.types.update(new_types)
+    _known.version = session.info.pop(EVENT_TYPES_VERSION)
+
+
+def forget_changes(session, transaction):
+    """after_transaction_end hook: drop what a rolled back transaction noted."""
+    if transaction.parent is None:
+        for key in (CHANGED, NEW_EVENT_TYPES, REMOVED_EVENT_TYPES, EVENT_TYPES_VERSION):
+            session.info.pop(key, None)
+
+
+def bump_versions(conn, tables: Iterable[str]):
+    """Increment the versions of ``tables`` (creating missing rows) in the connection's transaction."""
+    table = TableVersion.__table__
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif conn.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Table versions are not supported on {conn.dialect.name}")
+
+    now = datetime.utcnow()
+    # Sorted so concurrent transactions lock the counter rows in the same order
+    rows = [{"table_name": name, "version": 1, "updated_at": now} for name in sorted(set(tables))]
+    if not rows:
+        return
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["table_name"],
+        set_={
+            "version": table.c.version + 1,
+            # Never move backwards, whatever the clocks of the writing servers say
+            "updated_at": case(
+                (stmt.excluded.updated_at > table.c.updated_at, stmt.excluded.updated_at),
+                else_=table.c.updated_at,
+            ),
+        },
+    )
+    conn.execute(stmt, rows)
+
+
+def read_versions(session, tables: Iterable[str]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    """``{table: (version, updated_at)}``; tables never bumped are at ``(0, None)``."""
+    tables = list(tables)
+    versions = {name: (0, None) for name in tables}
+    rows = session.execute(
+        select(TableVersion.table_name, TableVersion.version, TableVersion.updated_at)
+        .where(TableVersion.table_name.in_(tables))
+    )
+    for name, version, updated_at in rows:
+        versions[name] = (version, updated_at)
+    return versions
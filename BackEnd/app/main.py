@@ -1,10 +1,20 @@
-from fastapi import FastAPI
+from functools import partial
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1 import routes_auth, routes_events, routes_facilities, routes_users, routes_animals, routes_dashboard, routes_settings, routes_breeds, routes_documents, routes_reports
-from app.db.init_db import init_db
+from app.api.v1 import routes_auth, routes_events, routes_facilities, routes_users, routes_animals, routes_dashboard, routes_settings, routes_breeds, routes_documents, routes_reports, routes_admin
+from app.core.config import settings
+from app.core.middleware import CompressionMiddleware, QueryCountMiddleware
+from app.core.responses import FastJSONResponse
+from app.core.warmup import prewarm_imports
+from app.db.schema_check import check_schema_version
+from app.db.session import engine
+from app.db.query_budget import query_budget
+from app.utils.conditional import current_versions
 
 app = FastAPI(
     title="FarmTrack API",
+    default_response_class=FastJSONResponse,
     description="""
     ## Farm Traceability System API
     
@@ -85,10 +95,21 @@ app = FastAPI(
         {
             "name": "Reports",
             "description": "PDF export for traceability reports and audit logs"
+        },
+        {
+            "name": "Admin",
+            "description": "Operational diagnostics such as database pool statistics"
         }
     ]
 )
 
+# gzip/brotli responses; added first so it runs inside CORS and the query
+# counter, which then also apply to responses replayed from its cache
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware, cache_versions=partial(current_versions, settings.COMPRESSION_CACHE_TABLES)
+    )
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -101,12 +122,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Query-Count", "X-DB-Time-Ms"],
 )
 
-# Initialize database tables on startup
+# SQL statement counts per request, N+1 detection
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryCountMiddleware)
+
+# Verify the schema revision on startup (tables are created by `python -m app.db.init_db`),
+# then load the heavy report/QR/Google modules in the background
 @app.on_event("startup")
 def on_startup():
-    init_db()
+    check_schema_version(engine, settings.SCHEMA_CHECK_MODE)
+    if settings.PREWARM_IMPORTS:
+        prewarm_imports()
 
 # Routers
 app.include_router(routes_auth.router, prefix="/api/v1/auth", tags=["Auth"])
@@ -118,7 +147,13 @@ app.include_router(routes_dashboard.router, prefix="/api/v1/dashboard", tags=["D
 app.include_router(routes_settings.router, prefix="/api/v1/settings", tags=["Settings"])
 app.include_router(routes_breeds.router, prefix="/api/v1/breeds", tags=["Breeds"])
 app.include_router(routes_documents.router, prefix="/api/v1", tags=["Documents"])
-app.include_router(routes_reports.router, prefix="/api/v1/reports", tags=["Reports"])
+app.include_router(
+    routes_reports.router,
+    prefix="/api/v1/reports",
+    tags=["Reports"],
+    dependencies=[Depends(query_budget(settings.REPORT_STATEMENT_TIMEOUT_MS, settings.REPORT_MAX_ROWS))],
+)
+app.include_router(routes_admin.router, prefix="/api/v1/admin", tags=["Admin"])
 
 @app.get("/", tags=["Root"])
 def root():
@@ -0,0 +1,453 @@
+"""
+Deterministic synthetic data generator for benchmarking.
+
+Builds production-sized datasets: users, facilities of skewed (Zipf) size,
+animals, and their event histories. Each animal is born on a farm, gets
+routine events there, and may move on to another farm, a processor
+(slaughter) and a retailer (sale). A configurable share of events is
+flagged as anomalies.
+
+The output depends only on --seed, the volumes, --days/--end and the ids
+already in the database, never on --workers. Every chunk of animals draws
+from its own seeded RNG, and event ids are derived from the chunk position.
+
+On PostgreSQL the chunks are generated and COPY'd by parallel worker
+processes, each committing its own chunk. Other databases insert the rows
+from a single process. Afterwards the id sequences are moved past the new
+ids, the rollups are rebuilt and the tables are analyzed.
+
+Run with:
+    python -m app.scripts.generate_data --facilities 10000 --animals 5000000 \\
+        --events 200000000 --workers 8 --seed 42
+"""
+import argparse
+import math
+import multiprocessing
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import JSON, create_engine, func, select, text
+from sqlalchemy.pool import NullPool
+
+from app.core.security import get_password_hash
+from app.db.bulk import copy_rows
+from app.db.models import Animal, AnimalBreed, Event, Facility, User
+from app.db.partitions import ensure_partitions, is_partitioned
+from app.db.rollups import backfill
+from app.db.table_versions import EVENT_TYPES, bump_versions
+
+USER_COLUMNS = [
+    "id", "username", "password_hash", "role", "auth_provider", "language",
+    "marketing_emails", "social_emails", "security_emails", "communication_emails", "mobile_notifications",
+]
+FACILITY_COLUMNS = ["id", "name", "location", "facility_type"]
+ANIMAL_COLUMNS = ["id", "name", "species", "breed_id", "tag_id", "date_added", "facility_id", "owner_id"]
+EVENT_COLUMNS = [
+    "id", "event_type", "actor_id", "facility_id", "timestamp",
+    "event_metadata", "is_valid", "anomaly_reason", "animal_id",
+]
+
+SYNTHETIC_PASSWORD = "pass123"
+USER_ROLES = [("farmer", 0.60), ("processor", 0.25), ("regulator", 0.15)]
+FACILITY_KINDS = [("farm", 0.70), ("processor", 0.15), ("retailer", 0.15)]
+# Facility size skew: the n-th largest facility of a kind gets weight 1 / n**FACILITY_ZIPF
+FACILITY_ZIPF = 1.1
+FACILITY_SUFFIXES = {
+    "farm": ["Farm", "Ranch", "Dairy", "Livestock", "Pastures"],
+    "processor": ["Meats", "Processing", "Packers", "Abattoir"],
+    "retailer": ["Market", "Butcher", "Foods", "Grocers"],
+}
+FACILITY_PREFIXES = [
+    "Green Valley", "Sunny Meadows", "Highland", "Prairie View", "Mountain Peak", "River Bend",
+    "Oak Hill", "Cedar Creek", "Golden Plains", "Willow Brook", "Maple Ridge", "Stone Bridge",
+]
+LOCATIONS = [
+    "Vermont", "Texas", "Scotland", "Wisconsin", "Colorado", "Iowa", "California", "New York",
+    "Oregon", "Maine", "Nebraska", "Kansas", "Ireland", "Wales", "Bavaria", "Normandy",
+]
+
+SPECIES = {
+    # species: (share of animals, adult weight range in kg, names)
+    "Cattle": (0.40, (300, 750), ["Bessie", "Daisy", "Buttercup", "Molly", "Belle", "Rosie", "Luna"]),
+    "Sheep": (0.20, (40, 120), ["Dolly", "Woolly", "Cotton", "Cloud", "Snowball", "Misty"]),
+    "Pig": (0.20, (60, 300), ["Wilbur", "Babe", "Porky", "Hamlet", "Peppa", "Piglet"]),
+    "Goat": (0.10, (30, 90), ["Billy", "Gruff", "Nanny", "Capri", "Heidi", "Clover"]),
+    "Chicken": (0.10, (1.5, 4.5), ["Henny", "Clucky", "Nugget", "Pepper", "Goldie"]),
+}
+ROUTINE_EVENTS = [("weighing", 0.30), ("health_check", 0.20), ("feeding", 0.20),
+                  ("vaccination", 0.15), ("medication", 0.10), ("breeding", 0.05)]
+# Where an animal ends up: (share, facility kinds it moves through after its origin farm)
+FATES = [(0.55, []), (0.10, ["farm"]), (0.20, ["processor"]), (0.15, ["processor", "retailer"])]
+TERMINAL_EVENTS = {"processor": "slaughter", "retailer": "sale"}
+ACTOR_ROLES = {"farm": "farmer", "processor": "processor", "retailer": "processor"}
+ANOMALY_REASONS = [
+    "Weight change too rapid", "Event timing inconsistent", "Location mismatch",
+    "Duplicate event detected", "Missing required metadata",
+]
+MOVEMENT_ANOMALY_REASONS = ["Unrealistic travel speed", "Location mismatch"]
+VACCINES = ["FMD", "Brucellosis", "Clostridial", "BVD", "Newcastle"]
+DRUGS = ["Oxytetracycline", "Penicillin", "Ivermectin", "Meloxicam"]
+FEEDS = ["hay", "silage", "grain", "pellets", "pasture"]
+
+# The plan built by the parent process; workers receive it through the pool initializer
+_plan = None
+_engine = None
+
+
+def _cumulative(weights) -> List[float]:
+    total, cum = 0.0, []
+    for w in weights:
+        total += w
+        cum.append(total)
+    return cum
+
+
+def _pick(rng: random.Random, options):
+    """Pick from [(value, share), ...]."""
+    return rng.choices([o[0] for o in options], weights=[o[1] for o in options])[0]
+
+
+def build_users(seed: int, count: int, first_id: int, password_hash: str) -> List[tuple]:
+    rng = random.Random(f"{seed}:users")
+    rows = []
+    for i in range(count):
+        # The first few users cover every role, so small runs still have actors for all facilities
+        role = USER_ROLES[i][0] if i < len(USER_ROLES) else _pick(rng, USER_ROLES)
+        user_id = first_id + i
+        rows.append((user_id, f"synth_user_{user_id}", password_hash, role, "credentials", "en",
+                     True, True, True, False, False))
+    return rows
+
+
+def build_facilities(seed: int, count: int, first_id: int) -> List[tuple]:
+    rng = random.Random(f"{seed}:facilities")
+    rows = []
+    for i in range(count):
+        kind = FACILITY_KINDS[i][0] if i < len(FACILITY_KINDS) else _pick(rng, FACILITY_KINDS)
+        facility_id = first_id + i
+        name = f"{rng.choice(FACILITY_PREFIXES)} {rng.choice(FACILITY_SUFFIXES[kind])} {facility_id}"
+        rows.append((facility_id, name, rng.choice(LOCATIONS), kind))
+    return rows
+
+
+def facility_weights(seed: int, facilities: List[tuple]) -> Dict[str, tuple]:
+    """Per kind: (facility ids, cumulative Zipf weights over a seeded size ranking)."""
+    rng = random.Random(f"{seed}:facility-sizes")
+    by_kind = {}
+    for kind, _ in FACILITY_KINDS:
+        ids = [f[0] for f in facilities if f[3] == kind]
+        rng.shuffle(ids)
+        by_kind[kind] = (ids, _cumulative(1 / (rank + 1) ** FACILITY_ZIPF for rank in range(len(ids))))
+    return by_kind
+
+
+def plan_chunks(animals: int, events: int, chunk_events: int, first_animal_id: int, first_event_id: int) -> List[Dict]:
+    """Split the animals into chunks of roughly ``chunk_events`` events; each chunk owns a fixed id range."""
+    if animals == 0:
+        return []
+    per_chunk = max(1, min(animals, 100_000, math.ceil(animals * chunk_events / max(events, 1))))
+    chunks = []
+    for index, start in enumerate(range(0, animals, per_chunk)):
+        end = min(animals, start + per_chunk)
+        event_start = events * start // animals
+        chunks.append({
+            "index": index,
+            "first_animal_id": first_animal_id + start,
+            "animals": end - start,
+            "first_event_id": first_event_id + event_start,
+            "events": events * end // animals - event_start,
+        })
+    return chunks
+
+
+def _metadata(rng: random.Random, event_type: str, species: str, src_name: str, dst_name: str):
+    low, high = SPECIES[species][1]
+    if event_type == "movement":
+        return f"Transferred from {src_name} to {dst_name}"
+    if event_type == "birth":
+        return {"birth_weight": round(low * rng.uniform(0.05, 0.1), 1), "unit": "kg"}
+    if event_type == "weighing":
+        return {"weight": round(rng.uniform(low, high), 1), "unit": "kg"}
+    if event_type == "vaccination":
+        return {"vaccine": rng.choice(VACCINES), "vaccine_batch": f"B{rng.randint(1, 500)}"}
+    if event_type == "medication":
+        return {"drug": rng.choice(DRUGS), "dose_ml": round(rng.uniform(1, 20), 1)}
+    if event_type == "health_check":
+        return {"result": rng.choices(["healthy", "observation", "treated"], weights=[85, 10, 5])[0]}
+    if event_type == "feeding":
+        return {"feed": rng.choice(FEEDS), "quantity_kg": round(rng.uniform(0.1, 0.03 * high), 1)}
+    if event_type == "breeding":
+        return {"method": rng.choice(["natural", "ai"])}
+    if event_type == "slaughter":
+        return {"carcass_weight": round(rng.uniform(low, high) * 0.6, 1), "unit": "kg"}
+    if event_type == "sale":
+        return {"price": round(rng.uniform(low, high) * rng.uniform(3, 9), 2), "currency": "USD"}
+    return None
+
+
+def generate_chunk(plan: Dict, chunk: Dict):
+    """Rows for one chunk of animals and their events (tuples in ANIMAL_COLUMNS / EVENT_COLUMNS order)."""
+    rng = random.Random(f"{plan['seed']}:chunk:{chunk['index']}")
+    end = plan["end"]
+    span_seconds = plan["days"] * 86400
+    names = plan["facility_names"]
+    kinds = plan["facility_kinds"]
+    weights = plan["facility_weights"]
+    users = plan["users_by_role"]
+    species_names = list(SPECIES)
+    species_cum = _cumulative(s[0] for s in SPECIES.values())
+    routine_names = [r[0] for r in ROUTINE_EVENTS]
+    routine_cum = _cumulative(r[1] for r in ROUTINE_EVENTS)
+    fate_cum = _cumulative(f[0] for f in FATES)
+
+    def facility_of(kind):
+        ids, cum = weights[kind]
+        return rng.choices(ids, cum_weights=cum)[0] if ids else None
+
+    counts = [0] * chunk["animals"]
+    for _ in range(chunk["events"]):
+        counts[rng.randrange(chunk["animals"])] += 1
+
+    animals, events = [], []
+    event_id = chunk["first_event_id"]
+    for offset, count in enumerate(counts):
+        animal_id = chunk["first_animal_id"] + offset
+        species = rng.choices(species_names, cum_weights=species_cum)[0]
+        breeds = plan["breeds"].get(species) or [None]
+        breed_id = breeds[int(rng.random() * len(breeds))]
+        born = end - timedelta(seconds=rng.random() * span_seconds)
+        origin = facility_of("farm")
+
+        # Birth, then routine events; a farm-to-farm move lands somewhere among
+        # them and the processor/retailer steps close the history
+        path = [k for k in FATES[rng.choices(range(len(FATES)), cum_weights=fate_cum)[0]][1] if weights[k][0]]
+        routine = max(0, count - 1)
+        steps = [("birth", None)]
+        terminal = []
+        for kind in path:
+            if kind == "farm":
+                continue
+            dest = facility_of(kind)
+            terminal.append(("movement", dest))
+            terminal.append((TERMINAL_EVENTS[kind], dest))
+        terminal = terminal[:routine]
+        routine -= len(terminal)
+        transfer_at = rng.randint(0, routine) if "farm" in path and len(weights["farm"][0]) > 1 else None
+        for i in range(routine):
+            if i == transfer_at:
+                dest = facility_of("farm")
+                while dest == origin:
+                    dest = facility_of("farm")
+                steps.append(("movement", dest))
+            else:
+                steps.append((rng.choices(routine_names, cum_weights=routine_cum)[0], None))
+        steps.extend(terminal)
+        steps = steps[:count]
+
+        times = sorted(born + timedelta(seconds=rng.random() * (end - born).total_seconds()) for _ in steps[1:])
+        location = origin
+        for (event_type, dest), timestamp in zip(steps, [born] + times):
+            source = location
+            if event_type == "movement":
+                location = dest
+            is_valid = rng.random() >= plan["anomaly_rate"]
+            reason = None
+            if not is_valid:
+                reason = rng.choice(MOVEMENT_ANOMALY_REASONS if event_type == "movement" else ANOMALY_REASONS)
+            events.append((
+                event_id, event_type, rng.choice(users[ACTOR_ROLES[kinds[location]]]), location, timestamp,
+                _metadata(rng, event_type, species, names[source], names[location]), is_valid, reason, animal_id,
+            ))
+            event_id += 1
+
+        name = f"{rng.choice(SPECIES[species][2])}-{animal_id}"
+        animals.append((animal_id, name, species, breed_id, f"SYN{animal_id:010d}", born, location,
+                        rng.choice(users["farmer"])))
+    return animals, events
+
+
+def _init_worker(plan: Dict):
+    global _plan, _engine
+    _plan = plan
+    _engine = create_engine(plan["database_url"], poolclass=NullPool)
+
+
+def _load_chunk(chunk: Dict) -> Dict:
+    """Worker task: generate one chunk and COPY it in its own transaction."""
+    animals, events = generate_chunk(_plan, chunk)
+    conn = _engine.raw_connection()
+    try:
+        copy_rows(conn.dbapi_connection, "animals", ANIMAL_COLUMNS, animals)
+        copy_rows(conn.dbapi_connection, "events", EVENT_COLUMNS, events, json_columns=["event_metadata"])
+        conn.commit()
+    finally:
+        conn.close()
+    return {"animals": len(animals), "events": len(events)}
+
+
+def _insert(conn, table, columns: List[str], rows: List[tuple]):
+    if not rows:
+        return
+    if conn.dialect.name == "postgresql":
+        json_columns = [c for c in columns if isinstance(table.c[c].type, JSON)]
+        copy_rows(conn.connection.dbapi_connection, table.name, columns, rows, json_columns)
+    else:
+        conn.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+
+
+def drop_secondary_indexes(conn, tables: List[str]) -> List[tuple]:
+    """
+    Drop the indexes on ``tables`` that don't back a constraint and return
+    their definitions. A partitioned parent's indexes cascade to its partitions.
+    """
+    index_defs = conn.execute(text(
+        "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x "
+        "JOIN pg_class i ON i.oid = x.indexrelid "
+        "WHERE x.indrelid = ANY(CAST(:tables AS regclass[])) "
+        "AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.oid)"
+    ), {"tables": tables}).all()
+    for name, _ in index_defs:
+        conn.execute(text(f"DROP INDEX {name}"))
+    return index_defs
+
+
+def create_indexes(conn, index_defs: List[tuple]):
+    conn.execute(text("SET LOCAL maintenance_work_mem = '512MB'"))
+    for _, definition in index_defs:
+        # Partitioned parents report "ON ONLY"; recreate the index on every partition too
+        conn.execute(text(definition.replace(" ON ONLY ", " ON ")))
+
+
+def _next_id(conn, model) -> int:
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def generate(engine, seed: int = 42, users: int = 200, facilities: int = 100, animals: int = 10_000,
+             events: int = 200_000, days: int = 730, end: date = None, anomaly_rate: float = 0.02,
+             workers: int = 1, chunk_events: int = 200_000, defer_indexes: bool = False) -> Dict[str, int]:
+    """
+    Generate and load a synthetic dataset; returns the number of rows written per table.
+
+    With ``defer_indexes`` (PostgreSQL) the secondary indexes on animals and
+    events are dropped for the load and rebuilt once at the end, which is much
+    faster than maintaining them row by row. Queries against those tables run
+    without the indexes in the meantime.
+    """
+    started = time.perf_counter()
+    end = datetime.combine(end or datetime.utcnow().date(), datetime.min.time())
+    is_postgresql = engine.dialect.name == "postgresql"
+    if not is_postgresql:
+        workers = 1
+
+    with engine.begin() as conn:
+        first_ids = {m.__tablename__: _next_id(conn, m) for m in (User, Facility, Animal, Event)}
+        user_rows = build_users(seed, users, first_ids["users"], get_password_hash(SYNTHETIC_PASSWORD))
+        facility_rows = build_facilities(seed, facilities, first_ids["facilities"])
+        _insert(conn, User.__table__, USER_COLUMNS, user_rows)
+        _insert(conn, Facility.__table__, FACILITY_COLUMNS, facility_rows)
+        breeds = {}
+        for breed_id, specie in conn.execute(
+            select(AnimalBreed.id, AnimalBreed.specie).where(AnimalBreed.specie.in_(list(SPECIES))).order_by(AnimalBreed.id)
+        ):
+            breeds.setdefault(specie, []).append(breed_id)
+        if is_partitioned(conn):
+            ensure_partitions(conn, (end - timedelta(days=days)).date(), end.date())
+        deferred = drop_secondary_indexes(conn, ["animals", "events"]) if defer_indexes and is_postgresql else []
+    print(f"  {len(user_rows)} users, {len(facility_rows)} facilities in {time.perf_counter() - started:.1f}s")
+
+    if animals and not any(f[3] == "farm" for f in facility_rows):
+        raise SystemExit("Animals need at least one farm; increase --facilities")
+    users_by_role = {role: [u[0] for u in user_rows if u[3] == role] for role, _ in USER_ROLES}
+    if animals and not all(users_by_role[role] for role in ("farmer", "processor")):
+        raise SystemExit("Animals need farmer and processor users; increase --users")
+
+    plan = {
+        "seed": seed,
+        "database_url": engine.url.render_as_string(hide_password=False),
+        "end": end,
+        "days": days,
+        "anomaly_rate": anomaly_rate,
+        "facility_names": {f[0]: f[1] for f in facility_rows},
+        "facility_kinds": {f[0]: f[3] for f in facility_rows},
+        "facility_weights": facility_weights(seed, facility_rows),
+        "users_by_role": users_by_role,
+        "breeds": breeds,
+    }
+    chunks = plan_chunks(animals, events, chunk_events, first_ids["animals"], first_ids["events"])
+
+    totals = {"users": len(user_rows), "facilities": len(facility_rows), "animals": 0, "events": 0}
+    load_started = time.perf_counter()
+
+    def progress(done):
+        totals["animals"] += done["animals"]
+        totals["events"] += done["events"]
+        elapsed = time.perf_counter() - load_started
+        print(f"  {totals['animals']}/{animals} animals, {totals['events']}/{events} events "
+              f"({totals['events'] / max(elapsed, 1e-9):,.0f} events/s)")
+
+    if is_postgresql and workers > 1:
+        with multiprocessing.get_context("spawn").Pool(workers, _init_worker, (plan,)) as pool:
+            for done in pool.imap_unordered(_load_chunk, chunks):
+                progress(done)
+    else:
+        for chunk in chunks:
+            animal_rows, event_rows = generate_chunk(plan, chunk)
+            with engine.begin() as conn:
+                _insert(conn, Animal.__table__, ANIMAL_COLUMNS, animal_rows)
+                _insert(conn, Event.__table__, EVENT_COLUMNS, event_rows)
+            progress({"animals": len(animal_rows), "events": len(event_rows)})
+
+    finish_started = time.perf_counter()
+    with engine.begin() as conn:
+        if is_postgresql:
+            # Rows were loaded with explicit ids; move the sequences past them
+            for table in ("users", "facilities", "animals", "events"):
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"
+                ))
+        if deferred:
+            create_indexes(conn, deferred)
+        # COPY bypasses the ORM flush hooks that maintain the rollups and table versions
+        backfill(conn)
+        bump_versions(conn, [User.__tablename__, Facility.__tablename__, Animal.__tablename__, EVENT_TYPES])
+    if is_postgresql:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE users, facilities, animals, events, event_daily_rollups"))
+    print(f"  {'indexes, ' if deferred else ''}sequences, rollups and statistics refreshed in {time.perf_counter() - finish_started:.1f}s")
+    print(f"Generated {totals} in {time.perf_counter() - started:.1f}s")
+    return totals
+
+
+def main():
+    from app.db.session import engine
+
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic dataset for benchmarking")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--facilities", type=int, default=100)
+    parser.add_argument("--animals", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=730, help="Length of the event history in days")
+    parser.add_argument("--end", type=date.fromisoformat, default=None,
+                        help="Last day of the history, YYYY-MM-DD (default: today); fix it for reproducible runs")
+    parser.add_argument("--anomaly-rate", type=float, default=0.02, help="Share of events flagged invalid")
+    parser.add_argument("--workers", type=int, default=max(1, (multiprocessing.cpu_count() or 2) - 1),
+                        help="Parallel COPY workers (PostgreSQL only)")
+    parser.add_argument("--chunk-events", type=int, default=200_000, help="Approximate events per worker chunk")
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="Drop animal/event secondary indexes during the load and rebuild them afterwards (PostgreSQL)")
+    args = parser.parse_args()
+
+    print(f"Generating synthetic data (seed {args.seed}) into {engine.url.render_as_string(hide_password=True)}")
+    generate(
+        engine, seed=args.seed, users=args.users, facilities=args.facilities, animals=args.animals,
+        events=args.events, days=args.days, end=args.end, anomaly_rate=args.anomaly_rate,
+        workers=args.workers, chunk_events=args.chunk_events, defer_indexes=args.defer_indexes,
+    )
+
+
+if __name__ == "__main__":
+    main()
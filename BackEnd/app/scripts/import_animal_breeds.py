@@ -1,29 +1,170 @@
+"""
+Bulk loader for the FAO breed catalog (app/data/animal_breeds.csv).
+
+The CSV is streamed once, each row is keyed by (country, specie, breed_name)
+and hashed; on PostgreSQL the rows are COPY'd into a temporary staging table
+and a single INSERT .. ON CONFLICT writes only new or changed breeds, so a
+rerun of an unchanged catalog touches nothing. Other databases diff against
+the stored hashes in Python and upsert the changed rows.
+
+Run with:
+    python -m app.scripts.import_animal_breeds [--csv PATH] [--prune]
+"""
+import argparse
 import csv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.db.models import AnimalBreed
-from app.db.base import Base
-
-DATABASE_URL = "postgresql://postgres:postgres@db:5432/traceability"
-
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
-session = Session()
-
-with open("app/data/animal_breeds.csv", newline='', encoding='utf-8') as csvfile:
-    reader = csv.DictReader(csvfile)
-    for row in reader:
-        breed = AnimalBreed(
-            country=row.get("Country"),
-            iso3=row.get("ISO3"),
-            specie=row.get("Specie"),
-            breed_name=row.get("Breed/Most common name"),
-            language=row.get("Language"),
-            description=row.get("Description"),
-            transboundary_name=row.get("Transboundary name"),
-            other_name=row.get("Other name")
+import hashlib
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import bindparam, delete, select, text
+
+from app.db.bulk import copy_rows
+from app.db.models import Animal, AnimalBreed
+from app.db.table_versions import bump_versions
+
+DEFAULT_CSV = Path(__file__).resolve().parent.parent / "data" / "animal_breeds.csv"
+
+# CSV header -> AnimalBreed column
+CSV_COLUMNS = {
+    "Country": "country",
+    "ISO3": "iso3",
+    "Specie": "specie",
+    "Breed/Most common name": "breed_name",
+    "Language": "language",
+    "Description": "description",
+    "Transboundary name": "transboundary_name",
+    "Other name": "other_name",
+}
+FIELDS = list(CSV_COLUMNS.values())
+KEY_FIELDS = ("country", "specie", "breed_name")
+PROGRESS_EVERY = 5000
+
+
+def row_hash(row: Dict[str, str]) -> str:
+    return hashlib.md5("\x1f".join(row[f] for f in FIELDS).encode("utf-8")).hexdigest()
+
+
+def read_catalog(csv_path: Path) -> List[Dict[str, str]]:
+    """Stream the CSV into normalized, hashed rows, deduplicated on the natural key (last row wins)."""
+    rows: Dict[tuple, Dict[str, str]] = {}
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for n, record in enumerate(csv.DictReader(f), start=1):
+            row = {column: (record.get(header) or "").strip() for header, column in CSV_COLUMNS.items()}
+            if not row["breed_name"] or not row["specie"]:
+                continue
+            row["row_hash"] = row_hash(row)
+            rows[tuple(row[k] for k in KEY_FIELDS)] = row
+            if n % PROGRESS_EVERY == 0:
+                print(f"  read {n} rows...")
+    return list(rows.values())
+
+
+def _upsert_postgresql(conn, rows: List[Dict[str, str]]) -> Dict[str, int]:
+    columns = FIELDS + ["row_hash"]
+    column_list = ", ".join(columns)
+    # Same column types as animal_breeds, without the id sequence default
+    conn.execute(text(
+        f"CREATE TEMP TABLE animal_breeds_staging ON COMMIT DROP AS "
+        f"SELECT {column_list} FROM animal_breeds WITH NO DATA"
+    ))
+    started = time.perf_counter()
+    copy_rows(
+        conn.connection.dbapi_connection, "animal_breeds_staging", columns,
+        ([row[c] for c in columns] for row in rows),
+    )
+    print(f"  copied {len(rows)} rows into staging in {time.perf_counter() - started:.2f}s")
+
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c not in KEY_FIELDS)
+    # xmax = 0 marks freshly inserted tuples; unchanged rows are filtered out by the WHERE
+    result = conn.execute(text(f"""
+        INSERT INTO animal_breeds ({column_list})
+        SELECT {column_list} FROM animal_breeds_staging
+        ON CONFLICT ({", ".join(KEY_FIELDS)}) DO UPDATE SET {updates}
+        WHERE animal_breeds.row_hash IS DISTINCT FROM EXCLUDED.row_hash
+        RETURNING (xmax = 0) AS inserted
+    """)).scalars().all()
+    inserted = sum(1 for r in result if r)
+    return {"inserted": inserted, "updated": len(result) - inserted}
+
+
+def _upsert_generic(conn, rows: List[Dict[str, str]]) -> Dict[str, int]:
+    existing = {
+        tuple(r[:3]): (r[3], r[4]) for r in conn.execute(
+            select(AnimalBreed.country, AnimalBreed.specie, AnimalBreed.breed_name, AnimalBreed.id, AnimalBreed.row_hash)
         )
-        session.add(breed)
+    }
+    new_rows, changed_rows = [], []
+    for row in rows:
+        match = existing.get(tuple(row[k] for k in KEY_FIELDS))
+        if match is None:
+            new_rows.append(row)
+        elif match[1] != row["row_hash"]:
+            changed_rows.append({**row, "breed_id": match[0]})
+    if new_rows:
+        conn.execute(AnimalBreed.__table__.insert(), new_rows)
+    if changed_rows:
+        table = AnimalBreed.__table__
+        conn.execute(table.update().where(table.c.id == bindparam("breed_id")), changed_rows)
+    return {"inserted": len(new_rows), "updated": len(changed_rows)}
+
+
+def prune_missing(conn, rows: List[Dict[str, str]]) -> int:
+    """Delete breeds no longer in the catalog, keeping any an animal still references."""
+    keep = {tuple(row[k] for k in KEY_FIELDS) for row in rows}
+    referenced = select(Animal.breed_id).where(Animal.breed_id.isnot(None))
+    stale_ids = [
+        breed_id for breed_id, *key in conn.execute(
+            select(AnimalBreed.id, AnimalBreed.country, AnimalBreed.specie, AnimalBreed.breed_name)
+            .where(AnimalBreed.id.notin_(referenced))
+        )
+        if tuple(key) not in keep
+    ]
+    if stale_ids:
+        conn.execute(delete(AnimalBreed).where(AnimalBreed.id.in_(stale_ids)))
+    return len(stale_ids)
+
+
+def load_breeds(engine, csv_path: Path = DEFAULT_CSV, prune: bool = False) -> Dict[str, int]:
+    """Load the catalog in one transaction; returns row counts per outcome."""
+    started = time.perf_counter()
+    print(f"Loading breeds from: {csv_path}")
+    rows = read_catalog(csv_path)
+    print(f"  parsed {len(rows)} breeds in {time.perf_counter() - started:.2f}s")
+
+    upsert_started = time.perf_counter()
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            stats = _upsert_postgresql(conn, rows)
+        else:
+            stats = _upsert_generic(conn, rows)
+        stats["pruned"] = prune_missing(conn, rows) if prune else 0
+        if stats["inserted"] or stats["updated"] or stats["pruned"]:
+            # Written outside the ORM: new ETags for the breed catalog routes
+            bump_versions(conn, [AnimalBreed.__tablename__])
+    stats["unchanged"] = len(rows) - stats["inserted"] - stats["updated"]
+    stats["total"] = len(rows)
+    print(
+        f"  upserted in {time.perf_counter() - upsert_started:.2f}s: "
+        f"{stats['inserted']} inserted, {stats['updated']} updated, "
+        f"{stats['unchanged']} unchanged, {stats['pruned']} pruned"
+    )
+    print(f"Breed import finished in {time.perf_counter() - started:.2f}s")
+    return stats
+
+
+def main():
+    from app.db.session import engine
+
+    parser = argparse.ArgumentParser(description="Bulk load the animal breed catalog")
+    parser.add_argument("--csv", type=Path, default=DEFAULT_CSV, help="Path to animal_breeds.csv")
+    parser.add_argument("--prune", action="store_true", help="Delete unreferenced breeds missing from the CSV")
+    args = parser.parse_args()
+
+    if not args.csv.exists():
+        raise SystemExit(f"CSV file not found: {args.csv}")
+    load_breeds(engine, args.csv, prune=args.prune)
+
 
-session.commit()
-print("✅ CSV import complete!")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Production server: gunicorn managing uvicorn worker processes.
+
+    python -m app.serve [--workers N] [--bind 0.0.0.0:8000] [--no-preload]
+
+The app is imported once in the master (``preload_app``), together with the
+libraries it loads on first use (app.core.warmup), and the workers are
+forked from it so they share those pages copy-on-write. Each worker replaces
+its inherited connection pools after the fork, is recycled after
+WORKER_MAX_REQUESTS requests and drains for WORKER_GRACEFUL_TIMEOUT seconds
+on SIGTERM. With DB_MAX_CONNECTIONS set, the per-worker pool sizes are
+derived from it so all workers together stay within the database's budget.
+
+For local development keep using ``uvicorn app.main:app --reload``.
+"""
+import argparse
+import multiprocessing
+from typing import Tuple
+
+from gunicorn.app.base import BaseApplication
+
+from app.core.config import settings
+
+# A worker holds a sync and an async engine per database, each with its own pool
+ENGINES_PER_DATABASE = 2
+
+
+def default_workers() -> int:
+    return settings.WEB_WORKERS or multiprocessing.cpu_count() * 2 + 1
+
+
+def pool_sizes(max_connections: int, workers: int) -> Tuple[int, int]:
+    """
+    Split a connection budget into (pool_size, max_overflow) per engine.
+
+    The budget is shared evenly by every engine of every worker; the
+    DB_POOL_SIZE:DB_MAX_OVERFLOW ratio of the settings is kept.
+    """
+    per_engine = max_connections // (workers * ENGINES_PER_DATABASE)
+    if per_engine < 1:
+        raise SystemExit(
+            f"DB_MAX_CONNECTIONS={max_connections} leaves no connection for {workers} workers "
+            f"x {ENGINES_PER_DATABASE} engines; lower --workers or raise the budget"
+        )
+    persistent_share = settings.DB_POOL_SIZE / (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+    pool_size = max(1, round(per_engine * persistent_share))
+    return pool_size, per_engine - pool_size
+
+
+def post_fork(server, worker):
+    """Give the new worker fresh pools instead of the master's."""
+    from app.db.pool_stats import discard_inherited_connections
+
+    discard_inherited_connections()
+
+
+class FarmTrackServer(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+        from app.core.warmup import import_heavy_modules
+
+        if self.cfg.preload_app:
+            # Imported once here, shared by every forked worker
+            import_heavy_modules()
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the FarmTrack API with gunicorn and uvicorn workers")
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="Worker processes (default: WEB_WORKERS, or 2 x CPUs + 1)")
+    parser.add_argument("--bind", default=f"{settings.WEB_HOST}:{settings.WEB_PORT}")
+    parser.add_argument("--max-requests", type=int, default=settings.WORKER_MAX_REQUESTS,
+                        help="Requests before a worker is recycled (0 disables)")
+    parser.add_argument("--no-preload", action="store_true",
+                        help="Import the app in each worker instead of once in the master")
+    args = parser.parse_args()
+
+    if settings.DB_MAX_CONNECTIONS:
+        # Set before the app (and its engines) is imported
+        settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW = pool_sizes(settings.DB_MAX_CONNECTIONS, args.workers)
+    per_worker = ENGINES_PER_DATABASE * (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+    print(f"Starting {args.workers} workers on {args.bind}; pool {settings.DB_POOL_SIZE}+{settings.DB_MAX_OVERFLOW} "
+          f"per engine, up to {per_worker} connections per worker and {per_worker * args.workers} in total "
+          f"per database")
+
+    # Preloading already imports the heavy modules in the master
+    settings.PREWARM_IMPORTS = settings.PREWARM_IMPORTS and args.no_preload
+    FarmTrackServer({
+        "bind": args.bind,
+        "workers": args.workers,
+        "worker_class": "uvicorn_worker.UvicornWorker",
+        "preload_app": not args.no_preload,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": settings.WORKER_MAX_REQUESTS_JITTER,
+        "timeout": settings.WORKER_TIMEOUT,
+        "graceful_timeout": settings.WORKER_GRACEFUL_TIMEOUT,
+        "keepalive": 5,
+        "post_fork": post_fork,
+        "accesslog": "-",
+    }).run()
+
+
+if __name__ == "__main__":
+    main()
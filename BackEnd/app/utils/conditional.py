@@ -0,0 +1,114 @@
+"""
+ETags and conditional GETs for catalog and detail routes.
+
+Routes declare the tables their response is built from:
+
+    @router.get("/species", dependencies=[Depends(conditional_get("animal_breeds", cache_control=...))])
+
+(``async_conditional_get`` for routes on an AsyncSession). The dependency
+reads those tables' versions from table_versions in one query and derives a
+strong ETag from them and the URL; Last-Modified is the latest change of the
+tables. A request whose If-None-Match (or, without one, If-Modified-Since)
+still matches is answered with a 304 before the route runs its queries;
+otherwise the route runs and the headers are added to its response.
+Cache-Control is the route's entry in CACHE_CONTROL_ROUTES, else the policy
+the route declares.
+
+Versions are per table: any write to a table changes the ETags of every
+route reading it. Last-Modified has one-second resolution, so clients that
+send both validators are judged by the ETag.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Sequence, Tuple
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.middleware import etag_matches, route_template
+from app.db.session import AsyncSessionLocal, get_async_read_db, get_read_db
+from app.db.table_versions import read_versions
+
+Versions = Dict[str, Tuple[int, Optional[datetime]]]
+
+
+def make_etag(request: Request, versions: Versions) -> str:
+    """Strong ETag of the response to ``request`` at the given table versions."""
+    key = "\x1f".join([
+        request.app.version,
+        request.url.path,
+        "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items())),
+        *(f"{name}:{version}" for name, (version, _) in sorted(versions.items())),
+    ])
+    return f'"{hashlib.md5(key.encode("utf-8")).hexdigest()}"'
+
+
+def last_modified(versions: Versions) -> Optional[datetime]:
+    """Latest change of the tables, to the second (naive UTC), or None if none was ever bumped."""
+    changed = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+    return max(changed).replace(microsecond=0) if changed else None
+
+
+def _modified_since(header: str, modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return True
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return modified > since
+
+
+def check_preconditions(request: Request, response: Response, versions: Versions, cache_control: str):
+    """Raise a 304 if the client's copy is current; otherwise set the validators on ``response``."""
+    etag = make_etag(request, versions)
+    modified = last_modified(versions)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": settings.CACHE_CONTROL_ROUTES.get(route_template(request.scope), cache_control),
+    }
+    if modified:
+        headers["Last-Modified"] = format_datetime(modified.replace(tzinfo=timezone.utc), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match:
+        # Echo the client's tag: it may name the compressed representation
+        matched = etag_matches(if_none_match, etag)
+        if matched:
+            raise HTTPException(status_code=304, headers={**headers, "ETag": matched})
+    elif if_modified_since and modified and not _modified_since(if_modified_since, modified):
+        raise HTTPException(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+
+
+def conditional_get(*tables: str, cache_control: str):
+    """Dependency factory: ETag, Last-Modified and 304s for a route reading ``tables``."""
+
+    def dependency(request: Request, response: Response, db: Session = Depends(get_read_db)):
+        if settings.CONDITIONAL_GET_ENABLED:
+            check_preconditions(request, response, read_versions(db, tables), cache_control)
+
+    return dependency
+
+
+def async_conditional_get(*tables: str, cache_control: str):
+    """``conditional_get`` for routes on an AsyncSession (shares the route's get_async_read_db session)."""
+
+    async def dependency(request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+        if settings.CONDITIONAL_GET_ENABLED:
+            versions = await db.run_sync(read_versions, tables)
+            check_preconditions(request, response, versions, cache_control)
+
+    return dependency
+
+
+async def current_versions(tables: Sequence[str]) -> Tuple[int, ...]:
+    """The versions of ``tables``, in order; keys the compressed response cache on them."""
+    async with AsyncSessionLocal(info={"read_only": True}) as db:
+        versions = await db.run_sync(read_versions, tables)
+    return tuple(versions[name][0] for name in tables)
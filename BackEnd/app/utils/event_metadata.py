@@ -0,0 +1,166 @@
+"""
+Event metadata helpers.
+
+``Event.event_metadata`` is JSONB on PostgreSQL (JSON elsewhere). Structured
+payloads are stored as objects; free-text notes, such as the transfer
+descriptions, are stored as JSON strings so they read back unchanged.
+
+List endpoints filter on metadata with repeated ``meta`` parameters of the
+form ``path:op:value``, e.g. ``meta=vaccine_batch:eq:B`` or
+``meta=weight:gt:300``. Nested keys use dots (``meta=vaccine.batch:eq:B``).
+"""
+import json
+import math
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, cast, func, literal, or_
+from sqlalchemy.dialects.postgresql import JSONPATH
+
+META_FILTER_DESCRIPTION = (
+    "Metadata filter as path:op:value, repeatable. "
+    "op is one of eq, ne, gt, gte, lt, lte or exists (value omitted), "
+    "e.g. vaccine_batch:eq:B or weight:gt:300"
+)
+
+_COMPARISONS = {"eq": "==", "ne": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+_NUMERIC_OPS = ("gt", "gte", "lt", "lte")
+
+
+def normalize_metadata(value: Any) -> Any:
+    """
+    Turn an incoming metadata payload into the value stored in the JSON column.
+
+    Strings holding a JSON object or array are parsed, other strings are kept
+    as free text, and empty values become NULL.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return None
+        if text[0] in "{[":
+            try:
+                return json.loads(text)
+            except ValueError:
+                pass
+    return value
+
+
+def format_metadata(value: Any, default: str = "") -> str:
+    """Render stored metadata as display text (reports, CSV exports)."""
+    if value is None or value == "":
+        return default
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _scalar(raw: str) -> Any:
+    """Interpret a filter value as a JSON number/boolean/null when it is one, else a string."""
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        return raw
+    if isinstance(value, float) and not math.isfinite(value):
+        # NaN, Infinity and overflowing literals are not JSON numbers
+        return raw
+    return value if isinstance(value, (int, float, bool)) or value is None else raw
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def parse_meta_filter(expr: str) -> Tuple[List[str], str, Optional[str]]:
+    """Split ``path:op:value`` into its parts; the value may itself contain colons."""
+    parts = expr.split(":", 2)
+    if len(parts) == 2 and parts[1] == "exists":
+        parts.append(None)
+    if len(parts) != 3 or not parts[0] or (parts[1] not in _COMPARISONS and parts[1] != "exists"):
+        raise HTTPException(status_code=400, detail=f"Invalid metadata filter '{expr}'; expected path:op:value")
+    path, op, raw = parts
+    if op in _NUMERIC_OPS:
+        try:
+            finite = math.isfinite(float(raw))
+        except ValueError:
+            finite = False
+        if not finite:
+            raise HTTPException(status_code=400, detail=f"Metadata filter '{expr}' needs a finite numeric value")
+    return path.split("."), op, raw
+
+
+def _target(path: Sequence[str]) -> str:
+    return "$" + "".join("." + json.dumps(key) for key in path)
+
+
+def _jsonpath(path: Sequence[str], op: str = "exists", raw: Optional[str] = None) -> str:
+    target = _target(path)
+    if op == "exists":
+        return target
+    if op in _NUMERIC_OPS:
+        # .double() also accepts numeric strings; @? swallows the error for anything else
+        return f"{target} ? (@.double() {_COMPARISONS[op]} {float(raw)!r})"
+    value = _scalar(raw)
+    candidates = [json.dumps(value)]
+    if not isinstance(value, str):
+        # match numbers/booleans stored as strings too
+        candidates.append(json.dumps(raw))
+    return f"{target} ? (" + " || ".join(f"@ == {c}" for c in candidates) + ")"
+
+
+def _jsonpath_condition(column, path: Sequence[str], op: str, raw: Optional[str]):
+    def matches(jsonpath):
+        return column.op("@?")(cast(literal(jsonpath), JSONPATH))
+
+    if op == "ne":
+        # Comparisons across JSON types are "unknown" in jsonpath, so negate
+        # the equality match instead of using !=
+        return and_(matches(_jsonpath(path)), ~matches(_jsonpath(path, "eq", raw)))
+    return matches(_jsonpath(path, op, raw))
+
+
+def _generic_condition(column, path: Sequence[str], op: str, raw: Optional[str]):
+    element = column[tuple(path)]
+    if op == "exists":
+        return element.as_string().isnot(None)
+    if op in _NUMERIC_OPS:
+        comparator = element.as_float()
+        value = float(raw)
+        return {
+            "gt": comparator > value, "gte": comparator >= value,
+            "lt": comparator < value, "lte": comparator <= value,
+        }[op]
+
+    value = _scalar(raw)
+    equal = element.as_string() == raw
+    if _is_number(value):
+        # JSON numbers compare as numbers (300 matches 300.0), strings verbatim,
+        # as on PostgreSQL; the type check keeps CAST('abc' AS FLOAT) = 0 out
+        is_numeric = func.json_type(column, _target(path)).in_(("integer", "real"))
+        equal = or_(and_(is_numeric, element.as_float() == value), equal)
+    if op == "eq":
+        return equal
+    return and_(element.as_string().isnot(None), ~equal)
+
+
+def apply_metadata_filters(stmt, column, filters: Optional[List[str]], dialect_name: str):
+    """
+    Add ``meta`` filters to a Select.
+
+    On PostgreSQL each filter becomes a jsonpath ``@?`` predicate, which the
+    GIN (jsonb_path_ops) index serves for equality and which simply doesn't
+    match rows whose value has the wrong type. Other databases (SQLite) use
+    the JSON path accessors, with ``json_type`` to compare numbers by value.
+    """
+    if not filters:
+        return stmt
+    conditions = []
+    for expr in filters:
+        path, op, raw = parse_meta_filter(expr)
+        if dialect_name == "postgresql":
+            conditions.append(_jsonpath_condition(column, path, op, raw))
+        else:
+            conditions.append(_generic_condition(column, path, op, raw))
+    return stmt.where(and_(*conditions))
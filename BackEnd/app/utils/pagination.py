@@ -0,0 +1,91 @@
+"""
+Keyset (cursor) pagination helpers.
+
+List endpoints return an opaque ``next_cursor`` encoding the sort key of the
+last row on the page. Passing it back as ``cursor`` fetches the rows strictly
+after that position, so deep pages cost the same as the first one and rows
+inserted meanwhile don't shift the page boundaries. ``skip``/``limit`` keep
+working for older clients.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+
+def encode_cursor(*values) -> str:
+    """Encode sort key values (ints, strings, datetimes) as an opaque URL-safe token."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """
+    Decode a cursor produced by encode_cursor().
+
+    ``types`` gives the expected Python type of each key (int, str or datetime).
+    Raises a 400 for tampered or mismatched cursors.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("cursor has the wrong number of keys")
+        values = []
+        for value, type_ in zip(payload, types):
+            if type_ is datetime:
+                values.append(datetime.fromisoformat(value))
+            else:
+                values.append(type_(value))
+        return tuple(values)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def apply_keyset(query, columns: Sequence, cursor_values: Optional[tuple], descending: bool = False):
+    """
+    Order ``query`` (a Query or Select) by ``columns`` and, when a cursor is
+    given, keep only the rows after it.
+
+    The row-value comparison is paired with a plain bound on the leading
+    column so a single-column index on it can still drive the scan.
+    """
+    if cursor_values is not None:
+        if descending:
+            query = query.where(
+                columns[0] <= cursor_values[0],
+                tuple_(*columns) < tuple_(*cursor_values)
+            )
+        else:
+            query = query.where(
+                columns[0] >= cursor_values[0],
+                tuple_(*columns) > tuple_(*cursor_values)
+            )
+    if descending:
+        return query.order_by(*[c.desc() for c in columns])
+    return query.order_by(*columns)
+
+
+def split_page(rows: Sequence, limit: int) -> Tuple[list, bool]:
+    """
+    Trim rows fetched with ``limit + 1`` back to the page size.
+
+    Returns ``(page_rows, has_more)``; the extra row only signals that another
+    page exists, which is cheaper than counting.
+    """
+    rows = list(rows)
+    return rows[:limit], len(rows) > limit
+
+
+def next_cursor(rows: Sequence, has_more: bool, *attrs) -> Optional[str]:
+    """Cursor pointing after the last row, or None when this was the last page."""
+    if not has_more or not rows:
+        return None
+    last = rows[-1]
+    if isinstance(last, dict):
+        return encode_cursor(*[last[a] for a in attrs])
+    return encode_cursor(*[getattr(last, a) for a in attrs])
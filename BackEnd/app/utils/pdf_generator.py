@@ -1,25 +1,35 @@
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from datetime import datetime
 from io import BytesIO
+from typing import Optional
 
+# Rows shown in the report tables; callers need not load more than this
+TIMELINE_EVENTS = 20
+ANOMALY_ROWS = 15
+FACILITY_ROWS = 20
 
-def generate_animal_traceability_report(animal_data: dict, events: list, movements: list) -> BytesIO:
+
+def generate_animal_traceability_report(animal_data: dict, events: list, movements: list,
+                                        total_events: Optional[int] = None) -> BytesIO:
     """
     Generate a comprehensive PDF traceability report for an animal.
     
     Args:
         animal_data: Dictionary with animal information
-        events: List of event records
+        events: List of event records, most recent first (only TIMELINE_EVENTS are shown)
         movements: List of movement records
+        total_events: Number of events the animal has, if more than ``events`` were counted
     
     Returns:
         BytesIO object containing the PDF
     """
+    # reportlab loads on the first report rather than at worker start
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72,
                             topMargin=72, bottomMargin=18)
@@ -119,11 +129,13 @@ def generate_animal_traceability_report(animal_data: dict, events: list, movemen
         elements.append(Spacer(1, 24))
     
     # Event Timeline Section
+    if total_events is None:
+        total_events = len(events)
     if events:
         elements.append(Paragraph("Event Timeline", heading_style))
         
         event_data = [['Date', 'Type', 'Valid', 'Details']]
-        for event in events[:20]:  # Limit to 20 most recent events
+        for event in events[:TIMELINE_EVENTS]:
             event_data.append([
                 event.get('timestamp', 'N/A')[:10] if event.get('timestamp') else 'N/A',
                 event.get('event_type', 'N/A'),
@@ -146,9 +158,9 @@ def generate_animal_traceability_report(animal_data: dict, events: list, movemen
         
         elements.append(event_table)
         
-        if len(events) > 20:
+        if total_events > TIMELINE_EVENTS:
             elements.append(Spacer(1, 12))
-            note = Paragraph(f"<i>Note: Showing 20 most recent events out of {len(events)} total events.</i>", 
+            note = Paragraph(f"<i>Note: Showing {TIMELINE_EVENTS} most recent events out of {total_events} total events.</i>", 
                            styles["Normal"])
             elements.append(note)
     
@@ -178,6 +190,14 @@ def generate_compliance_report(stats: dict, anomalies: list, facilities: list) -
     Returns:
         BytesIO object containing the PDF
     """
+    # reportlab loads on the first report rather than at worker start
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72,
                             topMargin=72, bottomMargin=18)
@@ -247,7 +267,7 @@ def generate_compliance_report(stats: dict, anomalies: list, facilities: list) -
         elements.append(Paragraph("Recent Anomalies", heading_style))
         
         anomaly_data = [['Date', 'Animal ID', 'Event Type', 'Reason']]
-        for anomaly in anomalies[:15]:
+        for anomaly in anomalies[:ANOMALY_ROWS]:
             anomaly_data.append([
                 anomaly.get('timestamp', 'N/A')[:10] if anomaly.get('timestamp') else 'N/A',
                 str(anomaly.get('animal_id', 'N/A')),
@@ -276,7 +296,7 @@ def generate_compliance_report(stats: dict, anomalies: list, facilities: list) -
         elements.append(Paragraph("Registered Facilities", heading_style))
         
         facility_data = [['Name', 'Type', 'Location']]
-        for facility in facilities[:20]:
+        for facility in facilities[:FACILITY_ROWS]:
             facility_data.append([
                 facility.get('name', 'N/A'),
                 facility.get('facility_type', 'N/A'),
@@ -1,4 +1,3 @@
-import qrcode
 import io
 import os
 from fastapi.responses import StreamingResponse
@@ -17,6 +16,9 @@ def generate_qr_code(data: str, size: int = 10, border: int = 2) -> bytes:
     Returns:
         PNG image bytes
     """
+    # qrcode and PIL load on the first QR code rather than at worker start
+    import qrcode
+
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -0,0 +1,123 @@
+"""
+Selectable strategies for the ``total`` reported by list endpoints.
+
+A full ``COUNT(*)`` over the filtered query can cost as much as the page
+itself, so clients choose per request via ``total_mode``:
+
+- ``exact``: run the count (default, the historical behaviour)
+- ``estimated``: use the PostgreSQL planner's row estimate (falls back to exact elsewhere)
+- ``cached``: exact count, reused for TOTALS_CACHE_TTL seconds per filter set
+- ``none``: skip the total; rely on ``has_more`` instead
+
+Responses report which mode produced the number in ``total_mode``.
+"""
+import json
+import threading
+import time
+from typing import Hashable, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+
+TOTAL_MODE_PATTERN = "^(exact|estimated|cached|none)$"
+TOTAL_MODE_DESCRIPTION = "How to compute total: exact, estimated, cached or none"
+
+_MAX_CACHE_ENTRIES = 2048
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _count_statement(stmt):
+    return select(func.count()).select_from(stmt.order_by(None).subquery())
+
+
+def _explain_sql(stmt, dialect) -> Optional[str]:
+    """Render the statement with inlined parameters for EXPLAIN, or None if it can't be."""
+    if dialect.name != "postgresql":
+        return None
+    try:
+        compiled = stmt.order_by(None).compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+    except Exception:
+        return None
+    return "EXPLAIN (FORMAT JSON) " + str(compiled)
+
+
+def _plan_rows(explain_result) -> int:
+    plan = explain_result[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _cache_get(key: Hashable) -> Optional[int]:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+    return None
+
+
+def _cache_put(key: Hashable, total: int):
+    with _cache_lock:
+        if len(_cache) >= _MAX_CACHE_ENTRIES:
+            # Drop expired entries first, then the oldest ones
+            now = time.monotonic()
+            for k in [k for k, (expires, _) in _cache.items() if expires <= now]:
+                del _cache[k]
+            while len(_cache) >= _MAX_CACHE_ENTRIES:
+                del _cache[next(iter(_cache))]
+        _cache[key] = (time.monotonic() + settings.TOTALS_CACHE_TTL, total)
+
+
+def clear_totals_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def resolve_total(db, stmt, mode: str, cache_key: Hashable) -> Tuple[Optional[int], str]:
+    """
+    Compute the total for ``stmt`` (the filtered, unpaginated Select) on a
+    sync Session. Returns ``(total, mode_used)``.
+    """
+    if mode == "none":
+        return None, "none"
+
+    if mode == "estimated":
+        sql = _explain_sql(stmt, db.get_bind().dialect)
+        if sql is not None:
+            return _plan_rows(db.connection().exec_driver_sql(sql).fetchone()), "estimated"
+        mode = "exact"
+
+    if mode == "cached":
+        total = _cache_get(cache_key)
+        if total is not None:
+            return total, "cached"
+
+    total = db.execute(_count_statement(stmt)).scalar()
+    if mode == "cached":
+        _cache_put(cache_key, total)
+    return total, mode
+
+
+async def resolve_total_async(db, stmt, mode: str, cache_key: Hashable) -> Tuple[Optional[int], str]:
+    """AsyncSession variant of resolve_total()."""
+    if mode == "none":
+        return None, "none"
+
+    if mode == "estimated":
+        sql = _explain_sql(stmt, db.get_bind().dialect)
+        if sql is not None:
+            conn = await db.connection()
+            return _plan_rows((await conn.exec_driver_sql(sql)).fetchone()), "estimated"
+        mode = "exact"
+
+    if mode == "cached":
+        total = _cache_get(cache_key)
+        if total is not None:
+            return total, "cached"
+
+    total = (await db.execute(_count_statement(stmt))).scalar()
+    if mode == "cached":
+        _cache_put(cache_key, total)
+    return total, mode
@@ -0,0 +1,6 @@
+"""
+HTTP benchmarks for the FarmTrack API.
+
+    python -m benchmarks.run --scale small --seed-database
+    python -m benchmarks.compare benchmarks/results/before.json benchmarks/results/after.json
+"""
@@ -0,0 +1,73 @@
+"""
+Compare two benchmark result files.
+
+Prints each scenario's change in latency and throughput. Exits with status 1
+when any scenario's latency metric (p95 by default) got worse by more than
+--threshold, or when a scenario started failing, so it can gate CI.
+
+Run with:
+    python -m benchmarks.compare baseline.json candidate.json [--metric p95_ms] [--threshold 0.10]
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List
+
+LATENCY_METRICS = ("p50_ms", "p90_ms", "p95_ms", "p99_ms", "mean_ms", "max_ms")
+
+
+def _change(before: float, after: float) -> float:
+    return (after - before) / before if before else 0.0
+
+
+def compare(baseline: Dict, candidate: Dict, metric: str = "p95_ms", threshold: float = 0.10) -> List[Dict]:
+    """One row per scenario present in both runs; ``regression`` marks the ones over the threshold."""
+    rows = []
+    for name, before in baseline["results"].items():
+        after = candidate["results"].get(name)
+        if after is None:
+            continue
+        change = _change(before[metric], after[metric])
+        rows.append({
+            "scenario": name,
+            "before": before[metric],
+            "after": after[metric],
+            "change": change,
+            "throughput_change": _change(before["throughput_rps"], after["throughput_rps"]),
+            "new_errors": after["errors"] > 0 and before["errors"] == 0,
+            "regression": change > threshold or (after["errors"] > 0 and before["errors"] == 0),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--metric", choices=LATENCY_METRICS, default="p95_ms")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative slowdown (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())
+    candidate = json.loads(args.candidate.read_text())
+    for key in ("scale", "database", "concurrency", "server_workers"):
+        if baseline["meta"].get(key) != candidate["meta"].get(key):
+            print(f"Warning: runs differ in {key}: {baseline['meta'].get(key)} vs {candidate['meta'].get(key)}")
+
+    rows = compare(baseline, candidate, args.metric, args.threshold)
+    print(f"{'scenario':<26} {args.metric + ' before':>14} {'after':>10} {'change':>8} {'req/s':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        if row["new_errors"]:
+            flag += " (new errors)"
+        print(f"{row['scenario']:<26} {row['before']:>14.1f} {row['after']:>10.1f} "
+              f"{row['change']:>+8.1%} {row['throughput_change']:>+8.1%}{flag}")
+
+    regressions = [row["scenario"] for row in rows if row["regression"]]
+    if regressions:
+        raise SystemExit(f"{len(regressions)} scenario(s) regressed: {', '.join(regressions)}")
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
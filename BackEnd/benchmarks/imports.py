@@ -0,0 +1,123 @@
+"""
+Import-time profile of the application.
+
+Imports a module (``app.main`` by default) in fresh interpreters with
+``python -X importtime`` and reports the median wall time, the slowest
+top-level packages (self time summed over their submodules) and whether any
+of app.core.warmup.HEAVY_MODULES was loaded eagerly. Those are meant to load
+on first use, so a regression shows up here before it shows up as slower
+worker starts. ``--first-use`` also times importing each heavy module after
+the app, which is what the first report, QR code or Google login pays when
+prewarming is disabled.
+
+Run with:
+    python -m benchmarks.imports [--runs 5] [--top 15] [--module app.main] [--first-use]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from app.core.warmup import HEAVY_MODULES
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+_PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+print("WALL", (time.perf_counter() - started) * 1000)
+print("LOADED", ",".join(sorted(m for m in {heavy!r} if m in sys.modules)))
+"""
+
+_FIRST_USE = """
+import importlib, time
+import {module}
+for name in {heavy!r}:
+    started = time.perf_counter()
+    importlib.import_module(name)
+    print("FIRST_USE", name, (time.perf_counter() - started) * 1000)
+"""
+
+
+def _run(code: str, importtime: bool = False) -> Tuple[str, str]:
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    result = subprocess.run(command, cwd=BACKEND_DIR, env=os.environ.copy(), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"Import failed:\n{result.stderr[-2000:]}")
+    return result.stdout, result.stderr
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Self time in milliseconds per top-level package from ``-X importtime`` output."""
+    packages: Dict[str, float] = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|")
+        packages[name.strip().split(".")[0]] += int(self_us) / 1000
+    return packages
+
+
+def profile(module: str, runs: int) -> Tuple[List[float], Dict[str, float], List[str]]:
+    walls = []
+    packages: Dict[str, List[float]] = defaultdict(list)
+    loaded: List[str] = []
+    for _ in range(runs):
+        stdout, stderr = _run(_PROBE.format(module=module, heavy=HEAVY_MODULES), importtime=True)
+        for line in stdout.splitlines():
+            if line.startswith("WALL "):
+                walls.append(float(line.split()[1]))
+            elif line.startswith("LOADED "):
+                loaded = [m for m in line[len("LOADED "):].split(",") if m]
+        for package, ms in parse_importtime(stderr).items():
+            packages[package].append(ms)
+    medians = {package: statistics.median(times) for package, times in packages.items()}
+    return walls, medians, loaded
+
+
+def first_use(module: str) -> Dict[str, float]:
+    stdout, _ = _run(_FIRST_USE.format(module=module, heavy=HEAVY_MODULES))
+    timings = {}
+    for line in stdout.splitlines():
+        if line.startswith("FIRST_USE "):
+            _, name, ms = line.split()
+            timings[name] = float(ms)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the import time of the application")
+    parser.add_argument("--module", default="app.main", help="Module to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to sample")
+    parser.add_argument("--top", type=int, default=15, help="Slowest packages to list")
+    parser.add_argument("--first-use", action="store_true", help="Also time the heavy modules after the app")
+    args = parser.parse_args()
+
+    walls, packages, loaded = profile(args.module, args.runs)
+    print(f"import {args.module}: median {statistics.median(walls):.0f} ms, "
+          f"min {min(walls):.0f} ms over {args.runs} runs (-X importtime adds overhead)")
+    print(f"{'package':<24} {'self ms':>8}")
+    for package, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{package:<24} {ms:>8.1f}")
+
+    if loaded:
+        print(f"Heavy modules loaded at import (should load on first use): {', '.join(loaded)}")
+    else:
+        print("Heavy modules loaded at import: none")
+
+    if args.first_use:
+        print(f"{'first use':<32} {'ms':>8}")
+        for name, ms in first_use(args.module).items():
+            print(f"{name:<32} {ms:>8.1f}")
+
+    if loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Run the API benchmark suite and save the results as JSON.
+
+By default the app is started with uvicorn against DATABASE_URL. Pass
+--base-url to measure a server that is already running; the fixtures are
+still sampled from DATABASE_URL, which must be the same database.
+--seed-database first loads the breed catalog and a synthetic dataset of
+the chosen scale (see app.scripts.generate_data) into that database; use an
+empty database so results of the same scale stay comparable.
+
+create_event writes to the database, so repeated runs grow the events table
+slightly.
+
+Run with:
+    python -m benchmarks.run --scale small [--seed-database] [--requests 200] [--concurrency 8]
+    python -m benchmarks.run --only get_animal,list_events --base-url http://localhost:8000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+from sqlalchemy import func, select
+
+from app.db.models import Animal, Event, Facility, User
+from benchmarks.scenarios import SCENARIOS, load_fixtures
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Dataset sizes for --seed-database (passed to app.scripts.generate_data.generate)
+SCALES = {
+    "small": {"users": 200, "facilities": 100, "animals": 10_000, "events": 200_000},
+    "medium": {"users": 1_000, "facilities": 1_000, "animals": 200_000, "events": 5_000_000},
+    "large": {"users": 5_000, "facilities": 10_000, "animals": 5_000_000, "events": 200_000_000},
+}
+# Fixed end of the synthetic history, so the same scale always produces the same data
+DATASET_END = date(2026, 1, 1)
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, statuses: Dict[str, int], wall_seconds: float) -> Dict:
+    ordered = sorted(latencies)
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_codes": statuses,
+        "throughput_rps": round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+        "mean_ms": round(statistics.fmean(ordered), 2) if ordered else 0.0,
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+    }
+    for pct in PERCENTILES:
+        result[f"p{pct}_ms"] = round(percentile(ordered, pct), 2)
+    return result
+
+
+async def _send(client: httpx.AsyncClient, scenario: Dict, fixtures: Dict, rng: random.Random):
+    spec = scenario["request"](fixtures, rng)
+    started = time.perf_counter()
+    response = await client.request(scenario["method"], spec["path"], params=spec.get("params"), json=spec.get("json"))
+    await response.aread()
+    return (time.perf_counter() - started) * 1000, response.status_code
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Dict, fixtures: Dict, requests: int,
+                       concurrency: int, warmup: int, seed: int) -> Dict:
+    """Send ``requests`` requests with at most ``concurrency`` in flight; warmup requests are not measured."""
+    rng = random.Random(f"{seed}:{scenario['name']}")
+    for _ in range(warmup):
+        await _send(client, scenario, fixtures, rng)
+
+    latencies, statuses = [], {}
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            try:
+                elapsed_ms, status = await _send(client, scenario, fixtures, rng)
+            except httpx.HTTPError as e:
+                errors += 1
+                statuses[type(e).__name__] = statuses.get(type(e).__name__, 0) + 1
+                continue
+            latencies.append(elapsed_ms)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    return summarize(latencies, errors, statuses, time.perf_counter() - started)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+               "--port", str(port), "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=os.environ.copy())
+
+
+def wait_until_healthy(base_url: str, timeout: float = 120.0, server: Optional[subprocess.Popen] = None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server is not None and server.poll() is not None:
+            raise SystemExit(f"The API server exited with code {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"The API at {base_url} did not become healthy within {timeout:.0f}s")
+
+
+def login(base_url: str, username: str, password: str) -> str:
+    response = httpx.post(f"{base_url}/api/v1/auth/login", data={"username": username, "password": password}, timeout=30)
+    if response.status_code != 200:
+        raise SystemExit(f"Login as {username} failed ({response.status_code}): {response.text}")
+    return response.json()["access_token"]
+
+
+def default_regulator(engine) -> str:
+    """A synthetic regulator if the data was generated, else the seeded one."""
+    with engine.connect() as conn:
+        username = conn.execute(
+            select(User.username).where(User.role == "regulator", User.username.like("synth_user_%"))
+            .order_by(User.id).limit(1)
+        ).scalar()
+    return username or "alice_regulator"
+
+
+def dataset_counts(engine) -> Dict[str, int]:
+    with engine.connect() as conn:
+        return {
+            model.__tablename__: conn.execute(select(func.count()).select_from(model)).scalar()
+            for model in (User, Facility, Animal, Event)
+        }
+
+
+def seed_database(engine, scale: str, seed: int):
+    from app.db.init_db import init_db
+    from app.scripts.generate_data import generate
+    from app.scripts.import_animal_breeds import load_breeds
+
+    init_db()
+    load_breeds(engine)
+    generate(engine, seed=seed, end=DATASET_END, workers=max(1, (os.cpu_count() or 2) - 1),
+             defer_indexes=True, **SCALES[scale])
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_all(base_url: str, token: str, scenarios: List[Dict], fixtures: Dict, args) -> Dict:
+    results = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers={"Authorization": f"Bearer {token}"},
+                                 limits=limits, timeout=args.timeout) as client:
+        for scenario in scenarios:
+            requests = min(args.requests, scenario.get("requests", args.requests))
+            result = await run_scenario(client, scenario, fixtures, requests, args.concurrency, args.warmup, args.seed)
+            results[scenario["name"]] = result
+            print(f"  {scenario['name']:<26} p50 {result['p50_ms']:>9.1f} ms  p95 {result['p95_ms']:>9.1f} ms  "
+                  f"p99 {result['p99_ms']:>9.1f} ms  {result['throughput_rps']:>8.1f} req/s  "
+                  f"{result['errors']} errors")
+    return results
+
+
+def main():
+    from app.db.session import engine
+
+    parser = argparse.ArgumentParser(description="Benchmark the FarmTrack API")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small",
+                        help="Dataset size; recorded in the results and used by --seed-database")
+    parser.add_argument("--seed-database", action="store_true", help="Load breeds and a synthetic dataset first")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the dataset and the request mix")
+    parser.add_argument("--base-url", default=None, help="Benchmark a running server instead of starting one")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn workers for the started server")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per scenario")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--only", default=None, help="Comma-separated scenario names")
+    parser.add_argument("--username", default=None, help="Regulator to log in as (default: first synthetic regulator)")
+    parser.add_argument("--password", default="pass123")
+    parser.add_argument("--output", type=Path, default=None, help="Results file (default: benchmarks/results/<time>-<scale>.json)")
+    args = parser.parse_args()
+
+    scenarios = SCENARIOS
+    if args.only:
+        names = set(args.only.split(","))
+        unknown = names - {s["name"] for s in SCENARIOS}
+        if unknown:
+            raise SystemExit(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+        scenarios = [s for s in SCENARIOS if s["name"] in names]
+
+    if args.seed_database:
+        print(f"Seeding a {args.scale} dataset...")
+        seed_database(engine, args.scale, args.seed)
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        print(f"Starting the API on {base_url} ({args.server_workers} worker(s))...")
+        server = start_server(port, args.server_workers)
+    try:
+        wait_until_healthy(base_url, server=server)
+        fixtures = load_fixtures(engine, args.seed)
+        token = login(base_url, args.username or default_regulator(engine), args.password)
+        counts = dataset_counts(engine)
+        print(f"Dataset: {counts}")
+        started_at = datetime.utcnow()
+        results = asyncio.run(run_all(base_url, token, scenarios, fixtures, args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = {
+        "meta": {
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "scale": args.scale,
+            "dataset": counts,
+            "database": engine.dialect.name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "base_url": args.base_url,
+            "server_workers": None if args.base_url else args.server_workers,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"{started_at:%Y%m%dT%H%M%S}-{args.scale}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+The benchmarked requests.
+
+Each scenario is a plain dict: ``name``, ``method``, and a ``request``
+callable that takes the sampled fixtures and a seeded RNG and returns
+the path plus optional ``params``/``json``. Requests are built per call,
+so consecutive requests hit different animals and filters instead of one
+cached row.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import func, select
+
+from app.db.models import Animal, Event, Facility, User
+
+BREED_SEARCH_TERMS = ["angus", "merino", "duroc", "saanen", "leghorn", "holstein", "jersey", "boer"]
+EVENT_TYPES = ["weighing", "vaccination", "movement", "health_check", "feeding"]
+SAMPLE_SIZE = 50
+
+
+def _sample_ids(conn, model, count: int, rng: random.Random) -> List[int]:
+    """Ids of ``count`` rows picked at random offsets (ids may have gaps)."""
+    total = conn.execute(select(func.count(model.id))).scalar() or 0
+    if total == 0:
+        return []
+    offsets = sorted({rng.randrange(total) for _ in range(count)})
+    return [
+        conn.execute(select(model.id).order_by(model.id).offset(offset).limit(1)).scalar()
+        for offset in offsets
+    ]
+
+
+def load_fixtures(engine, seed: int = 0) -> Dict:
+    """Sample the ids the scenarios use from the benchmark database."""
+    rng = random.Random(seed)
+    with engine.connect() as conn:
+        fixtures = {
+            "animal_ids": _sample_ids(conn, Animal, SAMPLE_SIZE, rng),
+            "facility_ids": _sample_ids(conn, Facility, SAMPLE_SIZE, rng),
+            "actor_ids": _sample_ids(conn, User, SAMPLE_SIZE, rng),
+            "latest_event": conn.execute(select(func.max(Event.timestamp))).scalar() or datetime.utcnow(),
+        }
+    if not fixtures["animal_ids"] or not fixtures["facility_ids"]:
+        raise SystemExit("The benchmark database has no animals or facilities; run with --seed-database")
+    return fixtures
+
+
+def _animal(fixtures, rng) -> int:
+    return rng.choice(fixtures["animal_ids"])
+
+
+SCENARIOS = [
+    {
+        "name": "list_events",
+        "method": "GET",
+        "request": lambda f, rng: {"path": "/api/v1/events/", "params": {"limit": 100}},
+    },
+    {
+        "name": "list_events_filtered",
+        "method": "GET",
+        "request": lambda f, rng: {"path": "/api/v1/events/", "params": {
+            "limit": 100, "event_type": rng.choice(EVENT_TYPES), "facility_id": rng.choice(f["facility_ids"]),
+        }},
+    },
+    {
+        "name": "get_animal",
+        "method": "GET",
+        "request": lambda f, rng: {"path": f"/api/v1/animals/{_animal(f, rng)}"},
+    },
+    {
+        "name": "get_animal_events",
+        "method": "GET",
+        "request": lambda f, rng: {"path": f"/api/v1/animals/{_animal(f, rng)}/events"},
+    },
+    {
+        "name": "animal_movement_history",
+        "method": "GET",
+        "request": lambda f, rng: {"path": f"/api/v1/animals/{_animal(f, rng)}/movement-history"},
+    },
+    {
+        "name": "dashboard_overview",
+        "method": "GET",
+        "request": lambda f, rng: {"path": "/api/v1/dashboard/overview"},
+    },
+    {
+        "name": "dashboard_timeline",
+        "method": "GET",
+        "request": lambda f, rng: {"path": "/api/v1/dashboard/timeline", "params": {"days": 30}},
+    },
+    {
+        "name": "dashboard_recent_events",
+        "method": "GET",
+        "request": lambda f, rng: {"path": "/api/v1/dashboard/recent-events"},
+    },
+    {
+        "name": "breed_search",
+        "method": "GET",
+        "request": lambda f, rng: {"path": "/api/v1/breeds/breeds", "params": {
+            "search": rng.choice(BREED_SEARCH_TERMS), "limit": 50,
+        }},
+    },
+    {
+        "name": "breed_picker",
+        "method": "GET",
+        "request": lambda f, rng: {"path": "/api/v1/animals/breeds", "params": {
+            "limit": 1000, "fields": "id,breed_name,specie", "total_mode": "none",
+        }},
+    },
+    {
+        "name": "animal_qr",
+        "method": "GET",
+        "request": lambda f, rng: {"path": f"/api/v1/animals/{_animal(f, rng)}/qr"},
+    },
+    {
+        "name": "animal_report_pdf",
+        "method": "GET",
+        "request": lambda f, rng: {"path": f"/api/v1/reports/animals/{_animal(f, rng)}/pdf"},
+    },
+    {
+        "name": "compliance_report_pdf",
+        "method": "GET",
+        "request": lambda f, rng: {"path": "/api/v1/reports/compliance/pdf"},
+        # Full-history report; a few samples are enough
+        "requests": 5,
+    },
+    {
+        "name": "audit_logs_pdf",
+        "method": "GET",
+        # One facility's last week of data; the unfiltered log grows with the whole history
+        "request": lambda f, rng: {"path": "/api/v1/reports/audit-logs/pdf", "params": {
+            "facility_id": rng.choice(f["facility_ids"]),
+            "start_date": (f["latest_event"] - timedelta(days=7)).isoformat(timespec="seconds"),
+        }},
+        "requests": 20,
+    },
+    {
+        "name": "create_event",
+        "method": "POST",
+        "request": lambda f, rng: {"path": "/api/v1/events/", "json": {
+            "animal_id": _animal(f, rng),
+            "event_type": "weighing",
+            "facility_id": rng.choice(f["facility_ids"]),
+            "actor_id": rng.choice(f["actor_ids"]) if f["actor_ids"] else None,
+            "metadata": {"weight": round(rng.uniform(40, 700), 1), "unit": "kg", "source": "benchmark"},
+        }},
+    },
+]
@@ -0,0 +1,133 @@
+"""
+Benchmark of JSON response serialization: FastAPI's default versus orjson.
+
+Builds payloads shaped like the list_events and breeds responses and times
+(1) the serialization step alone, FastAPI's ``jsonable_encoder`` +
+``JSONResponse`` against ``FastJSONResponse``, and (2) whole requests
+through two otherwise identical in-process apps, one on the default
+APIRoute and one on ``FastJSONRoute``. No database is involved.
+
+Run with:
+    python -m benchmarks.serialization [--rows 500,10000] [--iterations 20]
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from fastapi import APIRouter, FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from app.core.responses import FastJSONResponse, FastJSONRoute
+
+EVENT_TYPES = ["birth", "vaccination", "weight_check", "movement", "feeding", "health_check"]
+
+
+def events_payload(rows: int, rng: random.Random) -> Dict:
+    start = datetime(2024, 1, 1)
+    return {
+        "events": [
+            {
+                "id": i,
+                "animal_id": rng.randint(1, 10_000),
+                "event_type": rng.choice(EVENT_TYPES),
+                "timestamp": start + timedelta(minutes=i * 7),
+                "is_valid": rng.random() > 0.05,
+                "anomaly_reason": None,
+                "actor_id": rng.randint(1, 500),
+                "facility_id": rng.randint(1, 2_000),
+                "metadata": {"weight_kg": round(rng.uniform(30, 900), 1), "notes": "routine check"},
+            }
+            for i in range(rows)
+        ],
+        "total": rows,
+        "has_more": False,
+        "next_cursor": None,
+    }
+
+
+def breeds_payload(rows: int, rng: random.Random) -> Dict:
+    return {
+        "breeds": [
+            {
+                "id": i,
+                "breed_name": f"Breed {i}",
+                "specie": rng.choice(["Cattle", "Sheep", "Goat", "Pig", "Chicken"]),
+                "country": "Somewhere",
+                "iso3": "SMW",
+                "description": "Local breed kept for milk and meat production in upland areas",
+                "transboundary_name": None,
+                "other_name": f"Alt {i}",
+                "language": "English",
+            }
+            for i in range(rows)
+        ],
+        "total": rows,
+        "total_mode": "exact",
+        "has_more": False,
+        "skip": 0,
+        "limit": rows,
+    }
+
+
+PAYLOADS: Dict[str, Callable[[int, random.Random], Dict]] = {
+    "list_events": events_payload,
+    "breeds": breeds_payload,
+}
+
+
+def time_ms(fn: Callable, iterations: int) -> float:
+    samples: List[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def build_client(payload: Dict, route_class) -> TestClient:
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/payload")
+    def get_payload():
+        return payload
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FastAPI's default JSON serialization with orjson")
+    parser.add_argument("--rows", default="500,10000", help="Comma-separated payload sizes")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'payload':<12} {'rows':>6} {'step':<10} {'default':>9} {'orjson':>9} {'speedup':>8}")
+    for name, build in PAYLOADS.items():
+        for rows in (int(r) for r in args.rows.split(",")):
+            payload = build(rows, rng)
+            # FastJSONResponse must produce the same document as the default path
+            assert FastJSONResponse(payload).body == FastJSONResponse(jsonable_encoder(payload)).body
+
+            default_ms = time_ms(lambda: JSONResponse(jsonable_encoder(payload)), args.iterations)
+            orjson_ms = time_ms(lambda: FastJSONResponse(payload), args.iterations)
+            print(f"{name:<12} {rows:>6} {'serialize':<10} {default_ms:>7.2f}ms {orjson_ms:>7.2f}ms "
+                  f"{default_ms / orjson_ms:>7.1f}x")
+
+            with build_client(payload, APIRoute) as default_client, build_client(payload, FastJSONRoute) as fast_client:
+                default_ms = time_ms(lambda: default_client.get("/payload"), args.iterations)
+                orjson_ms = time_ms(lambda: fast_client.get("/payload"), args.iterations)
+            print(f"{name:<12} {rows:>6} {'request':<10} {default_ms:>7.2f}ms {orjson_ms:>7.2f}ms "
+                  f"{default_ms / orjson_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()